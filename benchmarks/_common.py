@@ -0,0 +1,44 @@
+# benchmarks/_common.py
+"""
+Shared setup for the benchmark scripts.
+Runs against an in-memory mongomock database, so results show relative
+differences (before/after), not production latencies.
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "stroke_vision"))
+
+from dotenv import load_dotenv
+
+load_dotenv(os.path.join(ROOT, ".env"))
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+
+def connect_mock_db(name="benchdb"):
+    """Connects mongoengine's default alias to a fresh mongomock database."""
+    import mongomock
+    from mongoengine import connect, disconnect
+
+    disconnect()
+    connect(name, host="mongodb://localhost", mongo_client_class=mongomock.MongoClient)
+
+
+@contextmanager
+def timed(label, results):
+    """Records wall time for a block into results[label]."""
+    start = time.perf_counter()
+    yield
+    results[label] = time.perf_counter() - start
+
+
+def report(title, rows):
+    """Prints a small aligned table of (label, value) rows."""
+    print(f"\n{title}")
+    print("-" * len(title))
+    width = max(len(label) for label, _ in rows)
+    for label, value in rows:
+        print(f"{label.ljust(width)}  {value}")
@@ -0,0 +1,71 @@
+# benchmarks/bench_export.py
+"""
+Streaming export vs. load-everything export.
+Measures throughput (rows/sec) and peak Python memory for N log entries.
+
+Usage: python benchmarks/bench_export.py [rows]
+"""
+import json
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+
+from _common import connect_mock_db, report, timed
+
+from app.models.log import ActivityLog
+from app.utils.export_stream import LOG_EXPORT_FIELDS, build_stream, log_rows
+
+
+def seed(rows):
+    base = datetime(2025, 1, 1)
+    ActivityLog._get_collection().insert_many([
+        {
+            "timestamp": base + timedelta(seconds=i),
+            "client_ip": "127.0.0.1",
+            "client_os": "Linux",
+            "user_name": "Doctor User",
+            "user_role": "Doctor",
+            "info": f"Viewed patient {400000000 + i}",
+            "log_level": 1,
+        }
+        for i in range(rows)
+    ])
+
+
+def export_loaded():
+    """Old approach: materialize every document, then serialize."""
+    docs = list(ActivityLog.objects.order_by("-timestamp"))
+    payload = json.dumps([
+        {f: (getattr(d, f).isoformat() if f == "timestamp" else getattr(d, f)) for f in LOG_EXPORT_FIELDS}
+        for d in docs
+    ])
+    return len(payload)
+
+
+def export_streamed(compress):
+    """New approach: cursor batches -> chunked NDJSON (optionally gzip)."""
+    stream = build_stream(log_rows([ActivityLog._get_collection()], {}), "ndjson", LOG_EXPORT_FIELDS, compress=compress)
+    return sum(len(chunk) for chunk in stream)
+
+
+def measure(label, fn, rows, results):
+    tracemalloc.start()
+    times = {}
+    with timed(label, times):
+        size = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    seconds = times[label]
+    results.append((label, f"{rows / seconds:>10,.0f} rows/s  peak {peak / 1e6:7.1f} MB  output {size / 1e6:6.2f} MB"))
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    connect_mock_db()
+    seed(rows)
+
+    results = []
+    measure("load all + json.dumps", export_loaded, rows, results)
+    measure("stream ndjson", lambda: export_streamed(False), rows, results)
+    measure("stream ndjson + gzip", lambda: export_streamed(True), rows, results)
+    report(f"Log export, {rows:,} rows", results)
@@ -0,0 +1,69 @@
+# benchmarks/bench_import.py
+"""
+Bulk patient import vs. the per-record path (validate -> predict -> ID -> save).
+Reports records/sec for each.
+
+Usage: python benchmarks/bench_import.py [rows]
+"""
+import random
+import sys
+
+from _common import connect_mock_db, report, timed
+
+from app.models.patient import Patient
+from app.utils.bulk_import import IMPORT_FIELDS, import_patients, parse_rows
+from app.utils.prediction import StrokePredictor
+from app.security.input_sanitizer import InputSanitizer
+
+WORK_TYPES = ["Private", "Self-employed", "Govt_job", "children", "Never_worked"]
+SMOKING = ["formerly smoked", "never smoked", "smokes", "Unknown"]
+
+
+def make_csv(rows):
+    rng = random.Random(7)
+    lines = [",".join(IMPORT_FIELDS)]
+    for i in range(rows):
+        lines.append(",".join([
+            f"Patient {chr(65 + i % 26)}",
+            str(rng.randint(18, 90)),
+            rng.choice(["Male", "Female"]),
+            rng.choice(["Yes", "No"]),
+            rng.choice(WORK_TYPES),
+            rng.choice(["Urban", "Rural"]),
+            rng.choice(["0", "1"]),
+            rng.choice(["0", "1"]),
+            f"{rng.uniform(60, 250):.1f}",
+            f"{rng.uniform(16, 45):.1f}",
+            rng.choice(SMOKING),
+        ]))
+    return "\n".join(lines) + "\n"
+
+
+def per_record(rows, predictor):
+    """Old path: one validation, prediction and save per record."""
+    for _, row, _ in rows:
+        InputSanitizer.validate_patient_data(row)
+        predictor.predict_risk(row)
+        Patient._get_collection().find_one({"patient_id": "000000000"})  # ID existence check
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    connect_mock_db()
+    # mongomock checks unique indexes with a linear scan per insert (O(n^2));
+    # drop them so the numbers reflect the app-side work, not the mock.
+    Patient._get_collection().drop_indexes()
+    predictor = StrokePredictor()
+    parsed = parse_rows(make_csv(rows), "csv")
+    sample = parsed[:100]
+
+    times, results = {}, []
+    with timed("per-record", times):
+        per_record(sample, predictor)
+    results.append(("per-record (100 rows sample)", f"{len(sample) / times['per-record']:8.0f} records/s"))
+
+    with timed("bulk", times):
+        summary = import_patients(parsed, predictor, "Bench Doctor")
+    results.append((f"bulk import ({summary['imported']} imported)", f"{rows / times['bulk']:8.0f} records/s"))
+
+    report(f"Patient import, {rows:,} rows", results)
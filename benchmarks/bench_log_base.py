@@ -0,0 +1,54 @@
+# benchmarks/bench_log_base.py
+"""
+Per-call overhead of the logging helpers inside one request.
+Compares the uncached context extraction (headers + UA parsing + user proxy
+on every call) with the per-request cache on flask.g, and times _log_base end to end.
+
+Usage: python benchmarks/bench_log_base.py [calls]
+"""
+import sys
+
+from _common import connect_mock_db, report, timed
+
+from app import create_app
+from app.utils import log_utils
+
+UA = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+HEADERS = {"User-Agent": UA, "X-Forwarded-For": "203.0.113.7, 10.0.0.1"}
+
+
+def context_uncached():
+    """Old behaviour: re-read headers and re-parse the UA on every call."""
+    log_utils.g.pop("_log_client_context", None)
+    log_utils.g.pop("_log_user_details", None)
+    log_utils._parse_os_from_user_agent.cache_clear()
+    log_utils._get_client_context()
+    log_utils._get_user_details()
+
+
+def context_cached():
+    log_utils._get_client_context()
+    log_utils._get_user_details()
+
+
+def per_call(label, fn, calls, results):
+    times = {}
+    with timed(label, times):
+        for _ in range(calls):
+            fn()
+    results.append((label, f"{times[label] / calls * 1e6:8.2f} us/call"))
+
+
+if __name__ == "__main__":
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    app = create_app()
+    connect_mock_db()  # after create_app, which registers the real MONGO_URI connection
+    app.config["LOG_SAMPLE_LIMIT"] = 0
+
+    results = []
+    with app.test_request_context("/", headers=HEADERS):
+        per_call("context, uncached", context_uncached, calls, results)
+        per_call("context, cached on g", context_cached, calls, results)
+        per_call("_log_base (activity)", lambda: log_utils.log_activity("Viewed patient list"), calls, results)
+
+    report(f"Logging overhead, {calls:,} calls in one request", results)
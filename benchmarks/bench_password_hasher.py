@@ -0,0 +1,55 @@
+# benchmarks/bench_password_hasher.py
+"""
+A burst of concurrent logins: every request thread running bcrypt itself
+(old behaviour) vs. the bounded PasswordHasher pool, which keeps at most
+BCRYPT_WORKERS hashes on the CPU and sheds calls that wait too long.
+
+Usage: python benchmarks/bench_password_hasher.py [concurrent logins] [log rounds]
+"""
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from _common import report, timed
+
+from flask import Flask
+from flask_bcrypt import Bcrypt
+
+from app.utils.password_hasher import PasswordHasherBusy, password_hasher
+
+
+def burst(verify, hashed, logins):
+    """Runs `logins` verifications from as many request threads; returns (ok, shed)."""
+    def login(_):
+        try:
+            return verify(hashed, "BenchPass123!")
+        except PasswordHasherBusy:
+            return None
+
+    with ThreadPoolExecutor(max_workers=logins) as requests:
+        results = list(requests.map(login, range(logins)))
+    return sum(1 for r in results if r), sum(1 for r in results if r is None)
+
+
+if __name__ == "__main__":
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    app = Flask("bench")
+    app.config.update({"BCRYPT_LOG_ROUNDS": rounds, "BCRYPT_QUEUE_TIMEOUT_SECONDS": 1.0})
+    bcrypt = Bcrypt(app)
+    password_hasher.init_app(app, bcrypt)
+    hashed = password_hasher.hash("BenchPass123!")
+
+    results = {}
+    with timed("direct", results):
+        direct_ok, _ = burst(bcrypt.check_password_hash, hashed, logins)
+    with timed("pool", results):
+        pool_ok, shed = burst(password_hasher.verify, hashed, logins)
+    stats = password_hasher.stats()
+
+    report(f"{logins} concurrent logins, bcrypt cost {rounds}", [
+        ("request threads (direct)", f"{results['direct']:6.2f} s, {direct_ok} verified"),
+        (f"pool ({stats['workers']} workers)", f"{results['pool']:6.2f} s, {pool_ok} verified, {shed} shed (503)"),
+        ("pool queue wait p50 / p95", f"{stats['queue_ms']['p50']:.1f} / {stats['queue_ms']['p95']:.1f} ms"),
+        ("pool bcrypt run p50 / p95", f"{stats['run_ms']['p50']:.1f} / {stats['run_ms']['p95']:.1f} ms"),
+    ])
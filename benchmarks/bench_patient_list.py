@@ -0,0 +1,100 @@
+# benchmarks/bench_patient_list.py
+"""
+Load test for /patient/api/data: requests/sec for the old behaviour
+(1.2s simulated delay, skip/limit, full count per request) vs. the new one
+(no delay, keyset cursor, cached total count).
+
+Usage: python benchmarks/bench_patient_list.py [patients] [requests]
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+os.environ.setdefault("SQLITE_DATABASE_URI", "sqlite:///:memory:")
+
+from _common import connect_mock_db, report, timed
+
+from app import create_app, db
+from app.models.patient import Patient
+from app.models.user import User
+from app.utils.patient_cache import patient_count_cache
+
+AJAX = {"X-Requested-With": "XMLHttpRequest"}
+
+
+def seed(patients):
+    base = datetime(2025, 1, 1)
+    Patient._get_collection().insert_many([
+        Patient(
+            patient_id=f"5{i:08d}",
+            name=f"Patient {i}",
+            age=50,
+            gender="Female",
+            ever_married="Yes",
+            work_type="Private",
+            residence_type="Urban",
+            heart_disease="No",
+            hypertension="No",
+            avg_glucose_level=100.0,
+            bmi=26.0,
+            smoking_status="Never Smoked",
+            stroke_risk=float(i % 100),
+            record_entry_date=base + timedelta(minutes=i),
+            created_by="Bench Doctor",
+        ).to_mongo()
+        for i in range(patients)
+    ])
+
+
+def login(app):
+    with app.app_context():
+        db.create_all()
+        user = User(name="Bench Doctor", email="bench@example.com",
+                    email_hash=User.hash_email("bench@example.com"), role="Doctor")
+        user.set_password("BenchPass123!")
+        db.session.add(user)
+        db.session.commit()
+
+    client = app.test_client()
+    client.post("/auth/login", data={"email": "bench@example.com", "password": "BenchPass123!"})
+    return client
+
+
+def run_pages(client, requests, use_cursor, uncached_count):
+    """Walks the list page by page (wrapping around), one request per page."""
+    token, page = None, 1
+    for _ in range(requests):
+        if uncached_count:
+            patient_count_cache.invalidate()
+        url = f"/patient/api/data?cursor={token}" if use_cursor and token else f"/patient/api/data?page={page}"
+        data = client.get(url, headers=AJAX).get_json()
+        token = data["next_cursor"] if data["has_next"] else None
+        page = page + 1 if data["has_next"] else 1
+
+
+if __name__ == "__main__":
+    patients = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    app = create_app()
+    app.config.update({"WTF_CSRF_ENABLED": False, "LOG_SAMPLE_LIMIT": 0})
+    connect_mock_db()  # after create_app, which registers the real MONGO_URI connection
+    seed(patients)
+    client = login(app)
+
+    scenarios = [
+        # (label, simulate delay, cursor, uncached count, requests)
+        ("before: 1.2s delay + skip + count", True, False, True, 3),
+        ("no delay, skip + count", False, False, True, requests),
+        ("after: cursor + cached count", False, True, False, requests),
+    ]
+
+    results = []
+    for label, simulate, use_cursor, uncached_count, n in scenarios:
+        app.config["PATIENT_LIST_SIMULATE_LOADING"] = simulate
+        times = {}
+        with timed(label, times):
+            run_pages(client, n, use_cursor, uncached_count)
+        results.append((label, f"{n / times[label]:8.1f} req/s  ({n} requests)"))
+
+    report(f"Patient list API, {patients:,} patients", results)
@@ -0,0 +1,107 @@
+# benchmarks/bench_response.py
+"""
+JSON serialization time and payload size for dashboard/list-shaped responses.
+Compares Flask's default provider (standard json, as jsonify used to) with
+FastJSONProvider, and the raw body size with gzip/brotli as the compression
+layer would send it.
+
+Usage: python benchmarks/bench_response.py [repeats]
+"""
+import gzip
+import random
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from _common import report, timed
+
+from app.utils import compression
+from app.utils.json_provider import FastJSONProvider, orjson
+
+COMPRESS_CONFIG = {"COMPRESS_GZIP_LEVEL": 6, "COMPRESS_BROTLI_QUALITY": 4}
+
+
+class NumpyDefaultProvider(DefaultJSONProvider):
+    """The old path: standard json with a NumPy-aware default."""
+
+    default = staticmethod(lambda obj: obj.item() if isinstance(obj, np.generic) else DefaultJSONProvider.default(obj))
+
+
+def dashboard_payload(points=2000):
+    rng = random.Random(1)
+    return {
+        "success": True,
+        "kpis": {"total": 50000, "high_risk": 9000, "avg_glucose": 106.2, "smokers": 14000},
+        "charts": {
+            "scatter": [
+                {
+                    "x": round(rng.uniform(15, 45), 2),
+                    "y": round(rng.uniform(60, 250), 2),
+                    "r": 4,
+                    "risk": np.float32(rng.uniform(0, 100)),
+                    "count": 1,
+                }
+                for _ in range(points)
+            ],
+            "work_distribution": {"Private": 28000, "Self-Employed": 8000, "Govt Job": 6000},
+        },
+    }
+
+
+def log_page_payload(rows=200):
+    start = datetime(2025, 1, 1)
+    return {
+        "logs": [
+            {
+                "timestamp": (start + timedelta(minutes=i)).isoformat(),
+                "user_name": f"User {i % 7}",
+                "user_role": "Doctor",
+                "client_ip": "203.0.113.7",
+                "client_os": "Windows",
+                "log_level": i % 5,
+                "description": f"Viewed patient 2025010{i % 10}{i:04d} details.",
+            }
+            for i in range(rows)
+        ],
+        "has_next": True,
+    }
+
+
+def serialize(provider, payload, repeats):
+    times = {}
+    with timed("t", times):
+        for _ in range(repeats):
+            body = provider.dumps(payload)
+    return body.encode("utf-8"), times["t"] / repeats
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    app = Flask("bench")
+    old, new = NumpyDefaultProvider(app), FastJSONProvider(app)
+
+    rows = [("orjson installed", orjson is not None), ("brotli installed", compression.brotli is not None)]
+    for name, payload in (("dashboard (2000 points)", dashboard_payload()), ("log page (200 rows)", log_page_payload())):
+        body, old_time = serialize(old, payload, repeats)
+        fast_body, new_time = serialize(new, payload, repeats)
+        rows.append((f"{name}: serialize, default provider", f"{old_time * 1e3:8.3f} ms"))
+        rows.append((f"{name}: serialize, FastJSONProvider", f"{new_time * 1e3:8.3f} ms ({old_time / new_time:.1f}x)"))
+        rows.append((f"{name}: bytes raw", f"{len(body):>8,} / {len(fast_body):,} (compact)"))
+
+        encodings = ["gzip"] + (["br"] if compression.brotli is not None else [])
+        for encoding in encodings:
+            times = {}
+            with timed(encoding, times):
+                for _ in range(repeats):
+                    encoded = compression._encode(fast_body, encoding, COMPRESS_CONFIG)
+            ratio = len(fast_body) / len(encoded)
+            rows.append((
+                f"{name}: bytes {encoding}",
+                f"{len(encoded):>8,} ({ratio:.1f}x smaller, {times[encoding] / repeats * 1e3:.3f} ms)",
+            ))
+        assert gzip.decompress(compression._encode(fast_body, "gzip", COMPRESS_CONFIG)) == fast_body
+
+    report(f"Response serialization and compression, {repeats} repeats", rows)
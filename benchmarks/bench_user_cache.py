@@ -0,0 +1,61 @@
+# benchmarks/bench_user_cache.py
+"""
+Cost of the Flask-Login user loader per request: a SQLite query plus Fernet
+decryption of the encrypted columns (cache off) vs. rebuilding the user from
+the per-process cache (cache on).
+
+Usage: python benchmarks/bench_user_cache.py [loads]
+"""
+import os
+import sys
+
+os.environ.setdefault("SQLITE_DATABASE_URI", "sqlite:///:memory:")
+
+from _common import connect_mock_db, report, timed
+
+from app import create_app, db
+from app.models.user import User
+from app.utils.user_cache import user_cache
+
+
+def seed(app):
+    with app.app_context():
+        db.create_all()
+        user = User(name="Bench Doctor", email="bench@example.com",
+                    email_hash=User.hash_email("bench@example.com"), role="Doctor")
+        user.set_password("BenchPass123!")
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+def load_per_request(app, user_id, loads):
+    """Each load runs in a fresh session, like the first access to current_user in a request."""
+    with app.test_request_context():
+        for _ in range(loads):
+            db.session.remove()
+            user = user_cache.load(user_id)
+            assert user.role == "Doctor"
+
+
+if __name__ == "__main__":
+    loads = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    app = create_app()
+    connect_mock_db()  # after create_app, which registers the real MONGO_URI connection
+    user_id = seed(app)
+
+    results = {}
+    user_cache.ttl = 0
+    with timed("off", results):
+        load_per_request(app, user_id, loads)
+
+    user_cache.ttl = 30
+    user_cache.clear()
+    with timed("on", results):
+        load_per_request(app, user_id, loads)
+
+    off, on = results["off"] / loads, results["on"] / loads
+    report(f"User loader, {loads} loads", [
+        ("cache off (query + decrypt)", f"{off * 1e6:8.1f} us/load"),
+        ("cache on", f"{on * 1e6:8.1f} us/load ({off / on:.1f}x)"),
+    ])
@@ -0,0 +1,42 @@
+# Archive_Logs.py
+import os
+import sys
+from mongoengine import connect, disconnect
+from dotenv import load_dotenv
+
+# Ensure we can import from app
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.models.log import ActivityLog, SecurityLog
+from app.utils.log_retention import archive_expired_logs, parse_retention_days
+
+# Load environment variables
+load_dotenv()
+
+
+def archive_logs():
+    """
+    Streams expired Activity/Security logs into gzip JSONL files, then deletes them.
+    Meant to run periodically (e.g. a daily cron) inside the TTL grace period.
+    """
+    mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/StrokeDB")
+    archive_dir = os.getenv("LOG_ARCHIVE_DIR")
+    retention_days = parse_retention_days(os.getenv("LOG_RETENTION_DAYS"))
+
+    if not archive_dir:
+        print("LOG_ARCHIVE_DIR is not set. Nothing to do.")
+        return
+
+    print(f"Connecting to database at: {mongo_uri}")
+    connect(host=mongo_uri)
+
+    print(f"Retention (days per level 0-4): {[retention_days[level] for level in range(5)]}")
+    for LogModel in (ActivityLog, SecurityLog):
+        archived = archive_expired_logs(LogModel, retention_days, archive_dir)
+        print(f"{LogModel._get_collection_name()}: archived {archived} entries to {archive_dir}")
+
+    disconnect()
+
+
+if __name__ == "__main__":
+    archive_logs()
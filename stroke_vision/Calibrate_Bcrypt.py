@@ -0,0 +1,49 @@
+# Calibrate_Bcrypt.py
+import os
+import statistics
+import sys
+import time
+import bcrypt
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+MIN_ROUNDS = 10  # Anything lower is too cheap to brute force against
+MAX_ROUNDS = 16
+SAMPLES = 5
+
+
+def time_rounds(rounds, samples=SAMPLES):
+    """Median seconds to verify one password hashed with `rounds`."""
+    hashed = bcrypt.hashpw(b"Calibration-Password1!", bcrypt.gensalt(rounds))
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.checkpw(b"Calibration-Password1!", hashed)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def calibrate(target_ms):
+    """
+    Times bcrypt verification on this machine and prints the highest log rounds
+    whose verification stays within `target_ms`. Run it on the deployment
+    hardware and set BCRYPT_LOG_ROUNDS; existing hashes are upgraded on login.
+    """
+    print(f"Target verification time: {target_ms:.0f} ms (current BCRYPT_LOG_ROUNDS={os.getenv('BCRYPT_LOG_ROUNDS', 12)})")
+    chosen = MIN_ROUNDS
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        elapsed_ms = time_rounds(rounds) * 1000
+        print(f"  rounds {rounds:2d}: {elapsed_ms:8.1f} ms")
+        if elapsed_ms > target_ms:
+            break
+        chosen = rounds  # Each extra round doubles the cost
+
+    print(f"Recommended: BCRYPT_LOG_ROUNDS={chosen}")
+    return chosen
+
+
+if __name__ == "__main__":
+    target = float(sys.argv[1]) if len(sys.argv) > 1 else float(os.getenv("BCRYPT_TARGET_MS", 250))
+    calibrate(target)
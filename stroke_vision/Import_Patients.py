@@ -0,0 +1,57 @@
+# Import_Patients.py
+import os
+import sys
+import json
+from mongoengine import connect, disconnect
+from dotenv import load_dotenv
+
+# Ensure we can import from app
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.bulk_import import detect_format, import_patients, parse_rows
+from app.utils.prediction import StrokePredictor
+
+# Load environment variables
+load_dotenv()
+
+
+def import_file(path, created_by, fmt=None):
+    """
+    Imports a CSV or NDJSON file of patient records (same columns/values as the patient form).
+    Prints a summary and writes the per-row report next to the input file.
+    """
+    fmt = fmt or detect_format(path)
+    if not fmt:
+        print("Could not tell the format from the file name. Pass csv or ndjson as the third argument.")
+        return
+
+    mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/StrokeDB")
+    print(f"Connecting to database at: {mongo_uri}")
+    connect(host=mongo_uri)
+
+    with open(path, encoding="utf-8-sig") as f:
+        rows = parse_rows(f.read(), fmt)
+
+    print(f"Importing {len(rows)} rows from {path} as '{created_by}'...")
+    try:
+        report = import_patients(rows, StrokePredictor(), created_by)
+    except ValueError as e:
+        print(f"Import rejected: {e}")
+        disconnect()
+        return
+
+    report_path = f"{path}.report.json"
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Imported {report['imported']}/{report['total']} rows, {report['failed']} rejected.")
+    print(f"Per-row report written to: {report_path}")
+    disconnect()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python Import_Patients.py <file.csv|file.ndjson> <created_by> [csv|ndjson]")
+        sys.exit(1)
+
+    import_file(sys.argv[1], sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
@@ -12,6 +12,8 @@ from dotenv import load_dotenv
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app.models.patient import Patient
+from app.utils.dashboard_stats import reconcile_stats
+from app.utils.id_generator import IDGenerator
 from app.utils.prediction import StrokePredictor
 
 # Load environment variables
@@ -205,7 +207,7 @@ def customize_name():
     return f"{name[0]} {name[-1]}"
 
 
-def generate_patient_data():
+def generate_patient_data(patient_id):
     age = sample_age()
     gender = random.choice(["Male", "Female"])
     bmi = sample_bmi(age, gender)
@@ -235,7 +237,7 @@ def generate_patient_data():
     risk = predictor.predict_risk(data_for_predictor)
 
     return Patient(
-        patient_id=str(random.randint(400000000, 499999999)),
+        patient_id=patient_id,
         name=customize_name(),
         age=age,
         gender=gender,
@@ -260,10 +262,13 @@ def generate_database(num_records=5000):
     
     saved = 0
     print(f"Starting population of {num_records} records...")
+
+    # Reserve every ID up front in one atomic operation (no collisions with the unique index)
+    patient_ids = IDGenerator.reserve_ids(num_records)
     
-    for i in range(num_records):
+    for i, patient_id in enumerate(patient_ids):
         try:
-            patient = generate_patient_data()
+            patient = generate_patient_data(patient_id)
             patient.save()
             saved += 1
             
@@ -295,6 +300,13 @@ def generate_database(num_records=5000):
             break
 
     print(f"Successfully generated {saved} patient records.")
+
+    # Rebuild the dashboard aggregates in one pass
+    stats = reconcile_stats()
+    if stats is None:
+        print("Dashboard stats are being rebuilt by another process.")
+    else:
+        print(f"Dashboard stats rebuilt (total: {stats['total']}).")
     disconnect()
 
 
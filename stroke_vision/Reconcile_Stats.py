@@ -0,0 +1,41 @@
+# Reconcile_Stats.py
+import os
+import sys
+from mongoengine import connect, disconnect
+from dotenv import load_dotenv
+
+# Ensure we can import from app
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.dashboard_stats import reconcile_stats
+
+# Load environment variables
+load_dotenv()
+
+
+def reconcile():
+    """
+    Rebuilds the materialized dashboard stats from a full pass over patients.
+    Meant to run periodically (e.g. a nightly cron) to correct any drift from
+    writes made outside the app (direct DB edits, failed increments).
+    """
+    mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/StrokeDB")
+
+    print(f"Connecting to database at: {mongo_uri}")
+    connect(host=mongo_uri)
+
+    stats = reconcile_stats()
+    if stats is None:
+        print("Another rebuild is running; nothing to do.")
+        disconnect()
+        return
+    print(
+        f"Stats reconciled: {stats['total']} patients, {stats['high_risk']} high risk, "
+        f"{len(stats['scatter_bins'])} scatter cells (version {stats['version']})."
+    )
+
+    disconnect()
+
+
+if __name__ == "__main__":
+    reconcile()
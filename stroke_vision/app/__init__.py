@@ -1,4 +1,5 @@
 # app/__init__.py
+import atexit
 import os
 from dotenv import load_dotenv
 from flask import Flask, render_template, jsonify
@@ -14,6 +15,20 @@ from flask_limiter.util import get_remote_address
 
 # Logging
 from app.utils.log_utils import log_security
+from app.utils.log_retention import parse_retention_days
+from app.utils.log_rollup import security_rollups
+from app.utils.http_cache import compute_asset_version, precompile_templates
+from app.utils.compression import init_compression
+from app.utils.json_provider import FastJSONProvider
+from app.utils.shared_state import DEFAULT_SHARED_STATE_URI, failed_login_tracker
+from app.utils.mongo_metrics import mongo_client_options
+from app.utils.sql_engine import init_sqlite_engine, sqlite_engine_options
+from app.utils.password_hasher import (
+    DEFAULT_BCRYPT_MAX_PENDING,
+    DEFAULT_BCRYPT_WORKERS,
+    PasswordHasherBusy,
+    password_hasher,
+)
 
 # Initialize extensions
 db = SQLAlchemy()
@@ -27,20 +42,114 @@ limiter = Limiter(key_func=get_remote_address)
 load_dotenv()
 
 
+_exit_flush_app = None  # Latest app, used to flush queued failed-login counters on shutdown
+
+
+@atexit.register
+def _flush_failed_logins_at_exit():
+    if _exit_flush_app is None:
+        return
+    from app.models.user import User
+
+    try:
+        with _exit_flush_app.app_context():
+            failed_login_tracker.flush(db.session, User)
+    except Exception:
+        pass
+
+
+@atexit.register
+def _flush_security_rollups_at_exit():
+    try:
+        security_rollups.flush()
+    except Exception:
+        pass
+
+
 def create_app():
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
 
     # Configurations
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY")
     app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("SQLITE_DATABASE_URI")
     app.config["MONGO_URI"] = os.getenv("MONGO_URI")
 
+    # SQLite Configurations (file databases only: WAL journal, pooled connections, ms a writer waits for the lock)
+    app.config["SQLITE_SYNCHRONOUS"] = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    app.config["SQLITE_BUSY_TIMEOUT_MS"] = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    app.config["SQLITE_POOL_SIZE"] = int(os.getenv("SQLITE_POOL_SIZE", 5))
+    app.config["SQLITE_POOL_MAX_OVERFLOW"] = int(os.getenv("SQLITE_POOL_MAX_OVERFLOW", 10))
+    app.config["SQLITE_POOL_TIMEOUT_SECONDS"] = float(os.getenv("SQLITE_POOL_TIMEOUT_SECONDS", 10))
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = sqlite_engine_options(app.config)
+
     # Security Configurations
     app.config["ADMIN_INVITE_CODE"] = os.getenv("ADMIN_INVITE_CODE")
     app.config["ACCOUNT_LOCKOUT_ATTEMPTS"] = int(os.getenv("ACCOUNT_LOCKOUT_ATTEMPTS", 5))
     app.config["ACCOUNT_LOCKOUT_PERIOD_SECONDS"] = int(os.getenv("ACCOUNT_LOCKOUT_PERIOD_SECONDS", 900))
-    app.config["RATELIMIT_STRATEGY"] = "fixed-window"
-    app.config["RATELIMIT_STORAGE_URI"] = "memory://"
+    app.config["ACCOUNT_LOCKOUT_WINDOW_SECONDS"] = int(os.getenv("ACCOUNT_LOCKOUT_WINDOW_SECONDS", 900))
+
+    # Shared State Configurations (rate-limit counters and failed logins shared by every worker)
+    app.config["SHARED_STATE_URI"] = os.getenv("SHARED_STATE_URI") or DEFAULT_SHARED_STATE_URI
+    app.config["RATELIMIT_STRATEGY"] = os.getenv("RATELIMIT_STRATEGY", "sliding-window-counter")
+    app.config["RATELIMIT_STORAGE_URI"] = os.getenv("RATELIMIT_STORAGE_URI") or app.config["SHARED_STATE_URI"]
+    app.config["LOCKOUT_FLUSH_BATCH_SIZE"] = int(os.getenv("LOCKOUT_FLUSH_BATCH_SIZE", 20))
+    app.config["LOCKOUT_FLUSH_INTERVAL_SECONDS"] = float(os.getenv("LOCKOUT_FLUSH_INTERVAL_SECONDS", 30))
+
+    # Password Hashing Configurations (bcrypt cost, pool size, admitted calls, seconds to wait for a slot before 503)
+    app.config["BCRYPT_LOG_ROUNDS"] = int(os.getenv("BCRYPT_LOG_ROUNDS", 12))
+    app.config["BCRYPT_WORKERS"] = int(os.getenv("BCRYPT_WORKERS", DEFAULT_BCRYPT_WORKERS))
+    app.config["BCRYPT_MAX_PENDING"] = int(os.getenv("BCRYPT_MAX_PENDING", DEFAULT_BCRYPT_MAX_PENDING))
+    app.config["BCRYPT_QUEUE_TIMEOUT_SECONDS"] = float(os.getenv("BCRYPT_QUEUE_TIMEOUT_SECONDS", 2))
+
+    # MongoDB Client Configurations (pool bounds, timeouts in ms, wire compressors used when their package is installed)
+    app.config["MONGO_MAX_POOL_SIZE"] = int(os.getenv("MONGO_MAX_POOL_SIZE", 50))
+    app.config["MONGO_MIN_POOL_SIZE"] = int(os.getenv("MONGO_MIN_POOL_SIZE", 2))
+    app.config["MONGO_MAX_IDLE_TIME_MS"] = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 300000))
+    app.config["MONGO_SERVER_SELECTION_TIMEOUT_MS"] = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000))
+    app.config["MONGO_CONNECT_TIMEOUT_MS"] = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 5000))
+    app.config["MONGO_READ_PREFERENCE"] = os.getenv("MONGO_READ_PREFERENCE", "primary")
+    app.config["MONGO_COMPRESSORS"] = os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib")
+    app.config["MONGO_COMMAND_METRICS"] = os.getenv("MONGO_COMMAND_METRICS", "true").lower() == "true"
+
+    # Dashboard Stats Configurations (rebuild a missing/outdated stats document off the request thread)
+    app.config["STATS_RECONCILE_IN_BACKGROUND"] = os.getenv("STATS_RECONCILE_IN_BACKGROUND", "true").lower() == "true"
+
+    # User Cache Configurations (seconds a loaded session user is reused per process, 0 disables)
+    app.config["USER_CACHE_TTL_SECONDS"] = float(os.getenv("USER_CACHE_TTL_SECONDS", 30))
+
+    # Logging Configurations (minimum level per collection, rate sampling of low-level entries)
+    app.config["LOG_MIN_LEVELS"] = {
+        "activity_logs": int(os.getenv("LOG_MIN_LEVEL_ACTIVITY", 0)),
+        "security_logs": int(os.getenv("LOG_MIN_LEVEL_SECURITY", 0)),
+    }
+    app.config["LOG_SAMPLE_LIMIT"] = int(os.getenv("LOG_SAMPLE_LIMIT", 5))
+    app.config["LOG_SAMPLE_WINDOW_SECONDS"] = float(os.getenv("LOG_SAMPLE_WINDOW_SECONDS", 1))
+    app.config["LOG_SAMPLE_MAX_LEVEL"] = int(os.getenv("LOG_SAMPLE_MAX_LEVEL", 1))
+    # Seconds security rollup increments are buffered per process before one bulk write (0 writes at once)
+    app.config["LOG_ROLLUP_FLUSH_SECONDS"] = float(os.getenv("LOG_ROLLUP_FLUSH_SECONDS", 5))
+
+    # Log Retention Configurations (TTL per level, archive before deletion, monthly partitions)
+    app.config["LOG_RETENTION_DAYS"] = parse_retention_days(os.getenv("LOG_RETENTION_DAYS"))
+    app.config["LOG_ARCHIVE_DIR"] = os.getenv("LOG_ARCHIVE_DIR") or None
+    app.config["LOG_ARCHIVE_GRACE_DAYS"] = int(os.getenv("LOG_ARCHIVE_GRACE_DAYS", 7))
+    app.config["LOG_MONTHLY_COLLECTIONS"] = os.getenv("LOG_MONTHLY_COLLECTIONS", "false").lower() == "true"
+
+    # Patient List Configurations (artificial loading delay for UI demos, off by default)
+    app.config["PATIENT_LIST_SIMULATE_LOADING"] = os.getenv("PATIENT_LIST_SIMULATE_LOADING", "false").lower() == "true"
+    app.config["PATIENT_LIST_SIMULATED_DELAY"] = float(os.getenv("PATIENT_LIST_SIMULATED_DELAY", 1.2))
+
+    # Fragment Cache Configurations (ASSET_VERSION defaults to a hash of static/template mtimes)
+    app.config["ASSET_VERSION"] = os.getenv("ASSET_VERSION") or compute_asset_version(
+        app.static_folder, os.path.join(app.root_path, app.template_folder)
+    )
+    app.config["FRAGMENT_CACHE_MAX_AGE"] = int(os.getenv("FRAGMENT_CACHE_MAX_AGE", 0))
+
+    # Response Compression (gzip, or brotli when installed, for bodies above COMPRESS_MIN_SIZE bytes)
+    app.config["RESPONSE_COMPRESSION"] = os.getenv("RESPONSE_COMPRESSION", "true").lower() == "true"
+    app.config["COMPRESS_MIN_SIZE"] = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+    app.config["COMPRESS_GZIP_LEVEL"] = int(os.getenv("COMPRESS_GZIP_LEVEL", 6))
+    app.config["COMPRESS_BROTLI_QUALITY"] = int(os.getenv("COMPRESS_BROTLI_QUALITY", 4))
 
     # CSRF specific configurations
     app.config["WTF_CSRF_ENABLED"] = True
@@ -50,18 +159,31 @@ def create_app():
 
     # Initialize extensions with app
     db.init_app(app)
+    init_sqlite_engine(app, db)
     bcrypt.init_app(app)
+    password_hasher.init_app(app, bcrypt)
     jwt.init_app(app)
     login_manager.init_app(app)
     csrf.init_app(app)
     limiter.init_app(app)
+    failed_login_tracker.init_app(app)
+
+    # SQLite user store: create missing tables and add columns newer than an existing database (idempotent)
+    from app.models.user import upgrade_user_table
+
+    with app.app_context():
+        db.create_all()
+        upgrade_user_table()
+
+    # Registered first so it runs after every other after_request hook
+    init_compression(app)
 
     # Login Manager
     login_manager.login_view = "auth.login"
     login_manager.login_message_category = "info"
 
     # Database (connect before importing blueprints that require indexes)
-    connect(host=app.config["MONGO_URI"])
+    connect(host=app.config["MONGO_URI"], **mongo_client_options(app.config))
 
     # Blueprints
     from app.views.auth import auth
@@ -92,6 +214,9 @@ def create_app():
 
     app.register_blueprint(admin_dashboard_bp)
 
+    from app.views.export_manager import export_bp
+
+    app.register_blueprint(export_bp)
 
 
     # Error Handlers
@@ -115,6 +240,17 @@ def create_app():
 
         return jsonify({"error": "Bad Request", "message": str(e)}), 400
 
+    @app.errorhandler(PasswordHasherBusy)
+    def handle_hasher_busy(e):
+        try:
+            log_security(f"Password hashing pool saturated - request shed ({password_hasher.stats()['rejected']} so far)", level=2)
+        except Exception:
+            pass
+
+        response = jsonify({"error": "Service Unavailable", "message": str(e)})
+        response.headers["Retry-After"] = str(e.retry_after)
+        return response, 503
+
     @app.errorhandler(500)
     def handle_server_error(e):
         try:
@@ -133,6 +269,25 @@ def create_app():
             }
         ), 500
 
+    # Failed-login counters queued by this worker reach the users table once a batch or the interval is due
+    @app.teardown_request
+    def flush_failed_logins(exc):
+        if not failed_login_tracker.flush_due():
+            return
+        from app.models.user import User
+
+        try:
+            failed_login_tracker.flush(db.session, User)
+        except Exception as e:
+            db.session.rollback()
+            try:
+                log_security(f"Could not flush failed login counters: {e}", level=3)
+            except Exception:
+                pass
+
+    global _exit_flush_app
+    _exit_flush_app = app
+
     # CSRF Header
     @app.after_request
     def add_csrf_header(response):
@@ -152,11 +307,14 @@ def create_app():
     def check_session_security():
         return AuthShield.validate_session()
 
+    # Per-process cache of the session user (skips the query and decryption on most requests)
+    from app.utils.user_cache import user_cache
+
+    user_cache.init_app(app)
+
     @login_manager.user_loader
     def load_user(user_id):
-        from app.models.user import User
-
-        user = User.query.get(int(user_id))
+        user = user_cache.load(user_id)
         if user is None:
             try:
                 log_security(
@@ -170,4 +328,7 @@ def create_app():
     def home():
         return render_template("home.html")
 
+    # Compile every template now so first hits don't pay for it
+    precompile_templates(app)
+
     return app
@@ -22,11 +22,19 @@ class ActivityLog(Document):
     info = StringField(required=True)
     log_level = IntField(required=True, min_value=0, max_value=4)
 
+    # Retention (TTL index removes the entry once this passes; None keeps it)
+    expire_at = DateTimeField()
+
     meta = {
         "collection": "activity_logs",
         "ordering": ["-timestamp"],
         "indexes": [
             ("log_level", "timestamp"),
+            ("-timestamp", "-_id"),  # Keyset pagination
+            ("user_name", "-timestamp", "-_id"),  # Filters
+            ("client_ip", "-timestamp", "-_id"),
+            {"fields": ["$info"], "default_language": "english"},
+            {"fields": ["expire_at"], "expireAfterSeconds": 0},
         ],
     }
 
@@ -47,10 +55,46 @@ class SecurityLog(Document):
     info = StringField(required=True)
     log_level = IntField(required=True, min_value=0, max_value=4)
 
+    # Retention (TTL index removes the entry once this passes; None keeps it)
+    expire_at = DateTimeField()
+
     meta = {
         "collection": "security_logs",
         "ordering": ["-timestamp"],
         "indexes": [
             ("log_level", "timestamp"),
+            ("-timestamp", "-_id"),  # Keyset pagination
+            ("user_name", "-timestamp", "-_id"),  # Filters
+            ("client_ip", "-timestamp", "-_id"),
+            {"fields": ["$info"], "default_language": "english"},
+            {"fields": ["expire_at"], "expireAfterSeconds": 0},
+        ],
+    }
+
+
+class SecurityLogRollup(Document):
+    """
+    Pre-aggregated SecurityLog counts per time bucket, level, client IP and user.
+    Maintained incrementally by the logging path so dashboards never scan security_logs.
+    """
+
+    granularity = StringField(required=True, choices=["minute", "hour"])
+    bucket = DateTimeField(required=True)
+    log_level = IntField(required=True, min_value=0, max_value=4)
+    client_ip = StringField()
+    user_name = StringField()
+    count = IntField(default=0)
+
+    # Retention (minute buckets are short-lived, hour buckets kept longer)
+    expire_at = DateTimeField()
+
+    meta = {
+        "collection": "security_log_rollups",
+        "indexes": [
+            {
+                "fields": ["granularity", "bucket", "log_level", "client_ip", "user_name"],
+                "unique": True,
+            },
+            {"fields": ["expire_at"], "expireAfterSeconds": 0},
         ],
     }
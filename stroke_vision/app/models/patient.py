@@ -107,5 +107,22 @@ class Patient(Document):
         "indexes": [
             {"fields": ["patient_id"], "unique": True},
             {"fields": ["$name"], "default_language": "english"},
+            {"fields": ["-record_entry_date", "-_id"]}, # Default ordering + keyset pagination
+            {"fields": ["-stroke_risk"]}, # Dashboard top-N and risk aggregations
+            {"fields": ["avg_glucose_level"]}, # Dashboard glucose aggregations
+            {"fields": ["created_by", "-record_entry_date"]}, # Dashboard creator + date window filters
+            {"fields": ["created_by", "-stroke_risk"]}, # Dashboard top-N per creator
         ],
     }
+
+
+class PatientIDCounter(Document):
+    """
+    Atomic sequence per patient ID date prefix (e.g. "51018").
+    Workers reserve ranges with a single $inc, so IDs never collide.
+    """
+
+    prefix = StringField(primary_key=True)
+    seq = IntField(default=0) # Next unreserved suffix
+
+    meta = {"collection": "patient_id_counters"}
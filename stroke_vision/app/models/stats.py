@@ -0,0 +1,85 @@
+# app/models/stats.py
+from mongoengine import (
+    Document,
+    StringField,
+    IntField,
+    FloatField,
+    DateTimeField,
+    DictField,
+    ListField,
+)
+
+
+class PatientStats(Document):
+    """
+    Materialized dashboard aggregates (a single document, key "global").
+    Kept current by $inc on patient create/update/delete and rebuilt by the
+    reconciliation job (Reconcile_Stats.py), so the dashboard never scans patients.
+    The collection also holds the "rebuild_lock" document of a running rebuild.
+    """
+
+    key = StringField(primary_key=True)
+
+    # KPIs
+    total = IntField(default=0)
+    high_risk = IntField(default=0)
+    smokers = IntField(default=0)
+    glucose_sum = FloatField(default=0)
+    risk_sum = FloatField(default=0)
+
+    # Histograms
+    risk_levels = DictField() # get_risk_level() label -> count
+    work_counts = DictField() # work type -> count
+    scatter_bins = DictField() # "bmi_bin:glucose_bin" -> {"n": count, "risk_sum": sum}
+    hex_bins = DictField() # "q:r" (axial hex coordinates) -> {"n": count, "risk_sum": sum}
+
+    # Bookkeeping
+    schema = IntField(default=0) # Layout of this document; older layouts are rebuilt on read
+    version = IntField(default=0) # Bumped on every change (cache key for derived data)
+    updated_at = DateTimeField()
+    reconciled_at = DateTimeField()
+
+    meta = {"collection": "patient_stats"}
+
+
+class PatientDailyRollup(Document):
+    """
+    Pre-aggregated patient counters per entry day, creator and risk band.
+    Maintained next to PatientStats so any date window or creator filter is
+    answered by summing a few rollups instead of rescanning patients.
+    """
+
+    day = DateTimeField(required=True) # record_entry_date truncated to midnight
+    created_by = StringField()
+    risk_band = StringField(required=True) # get_risk_level() label
+
+    count = IntField(default=0)
+    high_risk = IntField(default=0)
+    smokers = IntField(default=0)
+    glucose_sum = FloatField(default=0)
+    risk_sum = FloatField(default=0)
+    work_counts = DictField() # work type -> count
+    scatter_bins = DictField() # Same cells as PatientStats.scatter_bins
+    hex_bins = DictField() # Same cells as PatientStats.hex_bins
+
+    meta = {
+        "collection": "patient_daily_rollups",
+        "indexes": [
+            {"fields": ["day", "created_by", "risk_band"], "unique": True},
+            {"fields": ["created_by", "day"]},
+        ],
+    }
+
+
+class PatientScatterSample(Document):
+    """
+    Cached dashboard scatter sample for one of the fixed SAMPLE_SIZES (kept out
+    of PatientStats so the stats document read on every request stays small).
+    """
+
+    size = IntField(primary_key=True)
+    points = ListField(DictField()) # Shuffled, so any prefix is itself a uniform sample
+    version = IntField() # PatientStats.version the sample was drawn from
+    built_at = DateTimeField()
+
+    meta = {"collection": "patient_scatter_samples"}
@@ -1,11 +1,14 @@
 import datetime
 import hashlib
-from app import db, bcrypt
+from app import db
 from flask_login import UserMixin
 from flask import current_app
 from itsdangerous import URLSafeTimedSerializer
 from app.security.AES_Encryptor import cipher_suite
-from sqlalchemy import TypeDecorator, String
+from app.utils.password_hasher import password_hasher
+from sqlalchemy import TypeDecorator, String, event, inspect, text
+
+ROLES = ("Admin", "Doctor", "Nurse")
 
 class EncryptedType(TypeDecorator):
     """Custom SQLAlchemy type for AES encryption."""
@@ -29,6 +32,7 @@ class User(db.Model, UserMixin):
     email_hash = db.Column(db.String(64), unique=True, nullable=False, index=True) # Blind index for login
     password = db.Column(db.String(255), nullable=False)  # store hashed password
     role = db.Column(EncryptedType(20), nullable=False, default="Doctor")
+    role_hash = db.Column(db.String(64), nullable=True, index=True) # Blind index for role filters/aggregates (kept in sync on assignment)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
 
     # Lockout related fields
@@ -38,12 +42,16 @@ class User(db.Model, UserMixin):
     locked_at = db.Column(db.DateTime, nullable=True)
 
     def set_password(self, password: str):
-        """Hash and store password."""
-        self.password = bcrypt.generate_password_hash(password).decode("utf-8")
+        """Hash and store password (bcrypt pool, raises PasswordHasherBusy when saturated)."""
+        self.password = password_hasher.hash(password)
 
     def check_password(self, password: str) -> bool:
-        """Verify password against stored hash."""
-        return bcrypt.check_password_hash(self.password, password)
+        """Verify password against stored hash (bcrypt pool, raises PasswordHasherBusy when saturated)."""
+        return password_hasher.verify(self.password, password)
+
+    def password_needs_rehash(self) -> bool:
+        """True when the stored hash was made with a different BCRYPT_LOG_ROUNDS."""
+        return password_hasher.needs_rehash(self.password)
 
     @staticmethod
     def hash_email(email: str) -> str:
@@ -52,6 +60,11 @@ class User(db.Model, UserMixin):
             return ""
         return hashlib.sha256(email.lower().strip().encode()).hexdigest()
 
+    @staticmethod
+    def hash_role(role: str) -> str:
+        """Generate a SHA256 hash of the role for lookups and GROUP BY (the role column is encrypted)."""
+        return hashlib.sha256(f"role:{role}".encode()).hexdigest()
+
     # ---------- Lockout helpers ----------
     def increment_failed_attempts(self, commit: bool = True):
         """Increase failed attempt counter and set last_failed_login timestamp."""
@@ -117,3 +130,34 @@ class User(db.Model, UserMixin):
             return None
         user_id = data.get("user_id")
         return User.query.get(user_id)
+
+
+@event.listens_for(User.role, "set")
+def _sync_role_hash(target, value, oldvalue, initiator):
+    target.role_hash = User.hash_role(value) if value is not None else None
+
+
+@event.listens_for(User, "before_insert")
+def _default_role_hash(mapper, connection, target):
+    # role left to its column default is never "set" in Python
+    if target.role_hash is None:
+        target.role_hash = User.hash_role(target.role or User.__table__.c.role.default.arg)
+
+
+def upgrade_user_table():
+    """
+    Adds columns introduced after a database was created (db.create_all() never
+    alters existing tables) and backfills them. Safe to run on every start.
+    """
+    columns = {column["name"] for column in inspect(db.engine).get_columns("users")}
+    if "role_hash" in columns:
+        return False
+
+    with db.engine.begin() as connection:
+        connection.execute(text("ALTER TABLE users ADD COLUMN role_hash VARCHAR(64)"))
+        connection.execute(text("CREATE INDEX IF NOT EXISTS ix_users_role_hash ON users (role_hash)"))
+
+    for user in User.query.all():
+        user.role_hash = User.hash_role(user.role)
+    db.session.commit()
+    return True
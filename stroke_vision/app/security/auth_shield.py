@@ -1,8 +1,11 @@
 from functools import wraps
 from flask import abort, request, jsonify
 from flask_login import current_user, logout_user
+from werkzeug.exceptions import HTTPException
 from app import db
 from app.utils.log_utils import log_security, log_activity
+from app.utils.sql_engine import has_pending_writes
+from app.utils.password_hasher import PasswordHasherBusy
 
 class AuthShield:
     """
@@ -44,14 +47,19 @@ class AuthShield:
     def secure_transaction(f):
         """
         Decorator for safe DB transactions. 
-        Auto-commits on success, auto-rollbacks on error.
+        Auto-commits on success (skipped when nothing was written), auto-rollbacks on error.
         """
         @wraps(f)
         def decorated_function(*args, **kwargs):
             try:
                 result = f(*args, **kwargs)
-                db.session.commit()
+                if has_pending_writes(db.session):
+                    db.session.commit()
                 return result
+            except (HTTPException, PasswordHasherBusy):
+                # Deliberate responses (abort(), 503 overload): roll back, keep their status
+                db.session.rollback()
+                raise
             except Exception as e:
                 db.session.rollback()
                 # Log critical DB failure
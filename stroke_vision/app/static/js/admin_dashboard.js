@@ -26,6 +26,94 @@
     }
   }
 
+  async function fetchSecurityStats() {
+    try {
+      const response = await fetch("/admin/dashboard/api/security-stats?window=24h", {
+        headers: { "X-Requested-With": "XMLHttpRequest" },
+      });
+      if (!response.ok) throw new Error("Failed to fetch security stats");
+      return await response.json();
+    } catch (error) {
+      console.error("Security Stats Error:", error);
+      return null;
+    }
+  }
+
+  function renderSecurityStats(data) {
+    const colorTextMain = getThemeColor('--text-main');
+    const colorBorder = getThemeColor('--border-light');
+
+    // 1. Events per hour stacked by level (Bar)
+    const ctxSecurity = document.getElementById("adminSecurityChart");
+    if (ctxSecurity) {
+      if (charts.security) charts.security.destroy();
+
+      const levelStyles = [
+        { label: "Debug", color: getThemeColor('--status-neutral-text') },
+        { label: "Info", color: getThemeColor('--status-success-text') },
+        { label: "Warning", color: getThemeColor('--status-warning-text') },
+        { label: "Error", color: getThemeColor('--status-danger-text') },
+        { label: "Critical", color: getThemeColor('--status-critical-text') },
+      ];
+
+      charts.security = new Chart(ctxSecurity, {
+        type: "bar",
+        data: {
+          labels: data.labels.map((iso) =>
+            new Date(iso).toLocaleTimeString(undefined, { hour: "2-digit", minute: "2-digit" })
+          ),
+          datasets: levelStyles.map((style, level) => ({
+            label: style.label,
+            data: data.levels[level],
+            backgroundColor: style.color,
+            borderRadius: 2,
+          })),
+        },
+        options: {
+          responsive: true,
+          maintainAspectRatio: false,
+          plugins: {
+            legend: {
+              position: 'bottom',
+              labels: { color: colorTextMain, usePointStyle: true, padding: 16 }
+            }
+          },
+          scales: {
+            x: { stacked: true, grid: { display: false }, ticks: { color: colorTextMain } },
+            y: {
+              stacked: true,
+              beginAtZero: true,
+              grid: { borderDash: [5, 5], color: colorBorder },
+              ticks: { precision: 0, color: colorTextMain }
+            }
+          }
+        }
+      });
+    }
+
+    // 2. Top failure IPs (List)
+    const list = document.getElementById("adminTopIpList");
+    if (list) {
+      list.innerHTML = "";
+      if (!data.top_ips.length) {
+        const li = document.createElement("li");
+        li.className = "security-source-empty";
+        li.textContent = "No failures recorded.";
+        list.appendChild(li);
+      }
+      data.top_ips.forEach((item) => {
+        const li = document.createElement("li");
+        const ip = document.createElement("span");
+        const count = document.createElement("span");
+        ip.textContent = item.client_ip;
+        count.className = "security-source-count";
+        count.textContent = item.count;
+        li.append(ip, count);
+        list.appendChild(li);
+      });
+    }
+  }
+
   function renderCharts(data) {
     // Get dynamic colors
     const colorTextMain = getThemeColor('--text-main');
@@ -140,6 +228,11 @@
       // Render Charts
       renderCharts(data.charts);
     }
+
+    const securityData = await fetchSecurityStats();
+    if (securityData && securityData.success) {
+      renderSecurityStats(securityData);
+    }
   }
 
   // --- Observer to refresh stats when dashboard reappears ---
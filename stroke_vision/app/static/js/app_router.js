@@ -6,6 +6,18 @@
 
   let previousView = null;
 
+  // Fragments keyed by URL with their ETag, replayed when the server answers 304
+  const fragmentCache = new Map();
+  const FRAGMENT_CACHE_LIMIT = 50;
+
+  function rememberFragment(url, etag, html) {
+    fragmentCache.delete(url);
+    fragmentCache.set(url, { etag, html });
+    if (fragmentCache.size > FRAGMENT_CACHE_LIMIT) {
+      fragmentCache.delete(fragmentCache.keys().next().value);
+    }
+  }
+
   function toggleViewActive(isActive) {
     if (!homeContainer) {
         // Try to re-fetch if lazy loaded or changed
@@ -35,19 +47,28 @@
     if (window.updateShellHeader) window.updateShellHeader(viewId, previousView);
 
     try {
+      const cached = fragmentCache.get(url);
+      const headers = { "X-Requested-With": "XMLHttpRequest" };
+      if (cached) headers["If-None-Match"] = cached.etag;
+
       const resp = await fetch(url, {
         credentials: "same-origin",
-        headers: {
-          "X-Requested-With": "XMLHttpRequest",
-        },
+        headers,
       });
 
-      if (!resp.ok) {
+      let htmlContent;
+      if (resp.status === 304 && cached) {
+        htmlContent = cached.html;
+      } else if (!resp.ok) {
+        fragmentCache.delete(url);
         throw new Error(`Failed to load view: ${resp.status}`);
+      } else {
+        htmlContent = await resp.text();
+        const etag = resp.headers.get("ETag");
+        if (etag) rememberFragment(url, etag, htmlContent);
+        else fragmentCache.delete(url);
       }
 
-      const htmlContent = await resp.text();
-
       contentArea.innerHTML = `
   <div class="view-scroll-container animate-slide-in-right">
     ${htmlContent}
@@ -12,7 +12,7 @@
         datasets: [
           {
             label: "Patient Risk",
-            data: data.scatter, // Expects {x, y, r}
+            data: data.scatter, // Expects {x, y, r, risk, count} (a binned cell or a sampled patient)
             backgroundColor: (context) => {
               const raw = context.raw;
               return raw && raw.risk > 20
@@ -26,7 +26,20 @@
       options: {
         responsive: true,
         maintainAspectRatio: false,
-        plugins: { legend: { display: false } },
+        plugins: {
+          legend: { display: false },
+          tooltip: {
+            callbacks: {
+              label: (context) => {
+                const raw = context.raw;
+                if (raw.count > 1) {
+                  return `BMI ~${raw.x}, glucose ~${raw.y}: ${raw.count} patients, mean risk ${raw.risk}%`;
+                }
+                return `BMI ${raw.x}, glucose ${raw.y}: risk ${raw.risk}%`;
+              },
+            },
+          },
+        },
         scales: {
           x: {
             title: { display: true, text: "BMI" },
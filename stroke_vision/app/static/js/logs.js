@@ -3,8 +3,8 @@
 (function () {
   // State for each log type
   const logState = {
-    activity: { page: 0, hasMore: true, isFetching: false, observer: null },
-    changelog: { page: 0, hasMore: true, isFetching: false, observer: null },
+    activity: { page: 0, cursor: null, hasMore: true, isFetching: false, observer: null },
+    changelog: { page: 0, cursor: null, hasMore: true, isFetching: false, observer: null },
   };
 
   const LogManager = {
@@ -17,6 +17,7 @@
         scrollContainerId: "activityScrollContainer",
         sentinelId: "activityScrollSentinel",
         loadMoreId: "activityLoadMoreSpinner",
+        filterFormId: "activityFilterForm",
         apiUrl: "/logs/api/activity",
       });
     },
@@ -43,11 +44,22 @@
       const scrollContainer = document.getElementById(config.scrollContainerId);
       const sentinel = document.getElementById(config.sentinelId);
       const loadMoreSpinner = document.getElementById(config.loadMoreId);
+      const filterForm = config.filterFormId ? document.getElementById(config.filterFormId) : null;
 
       if (!tableBody) return;
 
+      // Re-run the whole scroll from the top when filters change (filtering is server-side)
+      if (filterForm && !filterForm.dataset.bound) {
+        filterForm.dataset.bound = "true";
+        filterForm.addEventListener("submit", (e) => {
+          e.preventDefault();
+          this._initScrollableLog(logType, config);
+        });
+      }
+
       // Reset state
       state.page = 0;
+      state.cursor = null;
       state.hasMore = true;
       state.isFetching = false;
 
@@ -74,12 +86,17 @@
         }
 
         try {
-          const response = await fetch(`${config.apiUrl}?page=${state.page}`);
+          // Keyset pagination: follow the cursor returned by the previous page
+          const params = this._filterParams(filterForm);
+          if (state.cursor) params.set("cursor", state.cursor);
+          const query = params.toString();
+          const response = await fetch(query ? `${config.apiUrl}?${query}` : config.apiUrl);
           if (!response.ok) throw new Error("Failed to fetch logs");
 
           const data = await response.json();
           const logs = data.logs || [];
-          state.hasMore = data.has_more;
+          state.cursor = data.next_cursor || null;
+          state.hasMore = data.has_more && !!state.cursor;
 
           if (state.page === 1) {
             if (loader) loader.style.display = "none";
@@ -129,6 +146,18 @@
       fetchLogs();
     },
 
+    // --- Collect non-empty filter values from the filter form ---
+    _filterParams(form) {
+      const params = new URLSearchParams();
+      if (!form) return params;
+
+      new FormData(form).forEach((value, key) => {
+        const trimmed = String(value).trim();
+        if (trimmed) params.set(key, trimmed);
+      });
+      return params;
+    },
+
     // --- Render logs to table ---
     _renderLogs(tableId, tbody, logs) {
       const fragment = document.createDocumentFragment();
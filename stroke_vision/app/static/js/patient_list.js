@@ -3,6 +3,7 @@
 // =======================================================
 
 let currentPage = 0;
+let nextCursor = null; // Keyset cursor returned by the API (preferred over ?page=)
 let hasMore = true;
 let isFetching = false;
 let observer = null;
@@ -53,7 +54,10 @@ async function fetchAndRenderPatients(
     loadMoreSpinner.classList.remove("hidden");
 
   try {
-    const response = await fetch(`/patient/api/data?page=${currentPage}`, {
+    const query = nextCursor
+      ? `cursor=${encodeURIComponent(nextCursor)}`
+      : `page=${currentPage}`;
+    const response = await fetch(`/patient/api/data?${query}`, {
       headers: { "X-Requested-With": "XMLHttpRequest" },
     });
 
@@ -62,6 +66,7 @@ async function fetchAndRenderPatients(
     const data = await response.json();
     const patients = data.patients || [];
     hasMore = data.has_next;
+    nextCursor = data.next_cursor || null;
 
     if (currentPage === 1) {
       if (initialLoader) initialLoader.remove();
@@ -100,6 +105,7 @@ window.loadPatientListAndAttachScroll = function (
     : null;
 
   currentPage = startPage - 1;
+  nextCursor = null;
   hasMore = true;
   isFetching = false;
 
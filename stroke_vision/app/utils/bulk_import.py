@@ -0,0 +1,202 @@
+# app/utils/bulk_import.py
+import csv
+import io
+import json
+from datetime import datetime
+from mongoengine import ValidationError as DocumentValidationError
+from pymongo.errors import BulkWriteError
+from app.models.patient import Patient
+from app.security.input_sanitizer import InputSanitizer, ValidationError
+from app.utils.dashboard_stats import record_patients_added
+from app.utils.id_generator import IDS_PER_DAY, IDGenerator
+from app.utils.log_utils import log_activity
+from app.utils.patient_cache import patient_count_cache
+from app.utils.patient_fields import (
+    map_binary_to_yes_no,
+    map_gender,
+    map_residence_type,
+    map_smoking_status,
+    map_work_type,
+)
+
+IMPORT_FORMATS = ("csv", "ndjson")
+MAX_IMPORT_ROWS = IDS_PER_DAY  # Every imported row takes one of today's patient IDs
+INSERT_BATCH_SIZE = 1000
+
+# Columns read from each row (same names and raw values as the patient form)
+IMPORT_FIELDS = [
+    "name",
+    "age",
+    "gender",
+    "ever_married",
+    "work_type",
+    "residence_type",
+    "heart_disease",
+    "hypertension",
+    "avg_glucose_level",
+    "bmi",
+    "smoking_status",
+]
+
+
+def detect_format(filename=None, content_type=None):
+    """Guesses csv/ndjson from a file name or content type. Returns None if unknown."""
+    name = (filename or "").lower()
+    content_type = (content_type or "").lower()
+    if name.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    return None
+
+
+def parse_rows(text, fmt):
+    """
+    Parses CSV (with a header row) or NDJSON text into (row_number, dict|None, error) tuples.
+    Row numbers are 1-based data rows; unparsable NDJSON lines carry an error instead of a dict.
+    Raises ValueError for unknown formats or too many rows.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}'. Use one of: {', '.join(IMPORT_FORMATS)}.")
+
+    rows = []
+    if fmt == "csv":
+        for number, row in enumerate(csv.DictReader(io.StringIO(text)), start=1):
+            rows.append((number, row, None))
+    else:
+        number = 0
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError("each line must be a JSON object")
+                rows.append((number, row, None))
+            except ValueError as e:
+                rows.append((number, None, f"Invalid JSON: {e}"))
+
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise ValueError(f"Too many rows ({len(rows)}). The limit is {MAX_IMPORT_ROWS} per import.")
+    return rows
+
+
+def _normalize(row):
+    """Keeps the known columns as sanitized strings (NDJSON may carry numbers)."""
+    clean = {}
+    for field in IMPORT_FIELDS:
+        value = row.get(field)
+        if value is not None and not isinstance(value, str):
+            value = str(int(value)) if isinstance(value, bool) else str(value)
+        clean[field] = InputSanitizer.sanitize_text(value) if value is not None else None
+    return clean
+
+
+def _build_patient(row, patient_id, risk, created_by, now):
+    """Maps a validated raw row to a validated (unsaved) Patient."""
+    patient = Patient(
+        patient_id=patient_id,
+        name=row["name"],
+        age=int(row["age"]),
+        gender=map_gender(row["gender"]),
+        ever_married=row["ever_married"],
+        work_type=map_work_type(row["work_type"]),
+        residence_type=map_residence_type(row["residence_type"]),
+        heart_disease=map_binary_to_yes_no(row["heart_disease"]),
+        hypertension=map_binary_to_yes_no(row["hypertension"]),
+        avg_glucose_level=float(row["avg_glucose_level"]),
+        bmi=float(row["bmi"]),
+        smoking_status=map_smoking_status(row["smoking_status"]),
+        stroke_risk=risk,
+        record_entry_date=now,
+        created_by=created_by,
+    )
+    patient.validate()
+    return patient
+
+
+def import_patients(rows, predictor, created_by):
+    """
+    Validates, scores and inserts parsed rows.
+    - Every row is checked with InputSanitizer.validate_patient_data and the model's input limits.
+    - Valid rows are scored in one batched model call and get IDs from IDGenerator.reserve_ids().
+      The import is rejected (ValueError) before scoring if today has fewer IDs left than valid rows.
+    - Documents are written with insert_many(ordered=False), so one bad row never aborts the rest.
+    Returns a report with per-row errors and the IDs given to imported rows.
+    """
+    errors = []
+    valid = []  # (row_number, normalized row)
+
+    for number, row, parse_error in rows:
+        if parse_error:
+            errors.append({"row": number, "message": parse_error})
+            continue
+        clean = _normalize(row)
+        try:
+            InputSanitizer.validate_patient_data(clean)
+            predictor.validate_input(clean)
+        except (ValidationError, ValueError) as e:
+            errors.append({"row": number, "message": str(e)})
+            continue
+        valid.append((number, clean))
+
+    if valid:
+        left = IDGenerator.remaining_ids()
+        if len(valid) > left:
+            raise ValueError(
+                f"Only {left} patient IDs are left today, but the file has {len(valid)} valid rows. "
+                "Split the import and submit the rest tomorrow."
+            )
+
+    imported = []
+    if valid:
+        risks = predictor.predict_risks([clean for _, clean in valid])
+        patient_ids = IDGenerator.reserve_ids(len(valid))
+        now = datetime.now()
+
+        documents = []  # (row_number, patient, son)
+        for (number, clean), patient_id, risk in zip(valid, patient_ids, risks):
+            try:
+                patient = _build_patient(clean, patient_id, risk, created_by, now)
+                documents.append((number, patient, patient.to_mongo()))
+            except DocumentValidationError as e:
+                errors.append({"row": number, "message": str(e)})
+
+        collection = Patient._get_collection()
+        for start in range(0, len(documents), INSERT_BATCH_SIZE):
+            batch = documents[start:start + INSERT_BATCH_SIZE]
+            failed = {}
+            try:
+                collection.insert_many([son for _, _, son in batch], ordered=False)
+            except BulkWriteError as e:
+                for write_error in e.details.get("writeErrors", []):
+                    failed[write_error["index"]] = write_error.get("errmsg", "Insert failed.")
+
+            inserted = []
+            for index, (number, patient, _) in enumerate(batch):
+                if index in failed:
+                    errors.append({"row": number, "message": failed[index]})
+                else:
+                    imported.append({"row": number, "patient_id": patient.patient_id})
+                    inserted.append(patient)
+
+            # insert_many bypasses the document signals
+            record_patients_added(inserted)
+
+        if imported:
+            patient_count_cache.invalidate()
+
+    errors.sort(key=lambda error: error["row"])
+    log_activity(
+        f"Bulk imported {len(imported)} patients ({len(errors)} rows rejected).",
+        level=2 if errors else 1,
+    )
+
+    return {
+        "total": len(rows),
+        "imported": len(imported),
+        "failed": len(errors),
+        "patients": imported,
+        "errors": errors,
+    }
@@ -0,0 +1,73 @@
+# app/utils/compression.py
+import gzip
+from flask import request
+
+# brotli is optional: without it only gzip is offered
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# HTML is left out on purpose: pages carry the session CSRF token next to echoed
+# user input, and compressing both together leaks the token through the size (BREACH)
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "text/css",
+    "text/plain",
+    "text/javascript",
+    "application/javascript",
+}
+
+# Appended to strong ETags of compressed bodies (each encoding is a different representation)
+ETAG_ENCODING_SUFFIXES = {"br": "-br", "gzip": "-gzip"}
+
+
+def _encode(data, encoding, config):
+    if encoding == "br":
+        return brotli.compress(data, quality=config["COMPRESS_BROTLI_QUALITY"])
+    return gzip.compress(data, compresslevel=config["COMPRESS_GZIP_LEVEL"])
+
+
+def compress_response(response, config):
+    """
+    Compresses a finished response with brotli or gzip when the client accepts it
+    and the body is at least COMPRESS_MIN_SIZE bytes. Streamed and already
+    encoded responses are left alone.
+    """
+    if (
+        response.status_code < 200
+        or response.status_code in (204, 304)
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    encoding = request.accept_encodings.best_match(offered)
+    if encoding is None:
+        return response
+
+    data = response.get_data()
+    if len(data) < config["COMPRESS_MIN_SIZE"]:
+        return response
+
+    response.set_data(_encode(data, encoding, config))
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag + ETAG_ENCODING_SUFFIXES[encoding])
+    return response
+
+
+def init_compression(app):
+    """Registers response compression for every blueprint (no-op when RESPONSE_COMPRESSION is off)."""
+    if not app.config.get("RESPONSE_COMPRESSION", True):
+        return
+
+    @app.after_request
+    def compress(response):
+        return compress_response(response, app.config)
@@ -0,0 +1,681 @@
+# app/utils/dashboard_stats.py
+import math
+import random
+import threading
+from datetime import datetime, timedelta
+from bson import ObjectId
+from mongoengine import signals
+from pymongo.errors import DuplicateKeyError
+from app.models.patient import Patient
+from app.models.stats import PatientDailyRollup, PatientScatterSample, PatientStats
+from app.utils.patient_fields import get_risk_level
+
+STATS_KEY = "global"
+
+# Lock document (in the stats collection) held by the one worker running a full rebuild
+REBUILD_LOCK_KEY = "rebuild_lock"
+REBUILD_LOCK_SECONDS = 600  # A crashed rebuild frees the lock after this long
+
+# Bump when the document layout changes; older documents are rebuilt on read
+STATS_SCHEMA = 6
+
+HIGH_RISK_THRESHOLD = 20  # stroke_risk above this counts as high risk
+SMOKER_STATUSES = ("Smokes", "Formerly Smoked")
+
+# Risk-level histogram: lower bounds of each get_risk_level() band
+RISK_LEVEL_BOUNDARIES = (0, 20, 40, 60, 80)
+RISK_LEVELS = ("Low", "Moderate", "High", "Very High", "Critical")
+
+# Scatter grid cell size (BMI x glucose)
+SCATTER_BMI_BIN = 2.0
+SCATTER_GLUCOSE_BIN = 10.0
+
+# Hexagon radius, in grid-cell units
+SCATTER_HEX_SIZE = 0.6
+
+# Scatter reduction modes for the dashboard (?scatter=)
+SCATTER_MODES = ("grid", "hex", "sample")
+DEFAULT_SCATTER_MODE = "grid"
+DEFAULT_SAMPLE_POINTS = 500
+MAX_SAMPLE_POINTS = 2000
+SAMPLE_SEED = 7033  # Fixed seed: the same data always yields the same sample
+SAMPLE_REFRESH_SECONDS = 300  # A cached sample is reused this long even if patients changed
+# Samples are only drawn (and cached) at these sizes; a request is served from the next size up
+SAMPLE_SIZES = (50, 100, 250, 500, 1000, 2000)
+
+# Patient fields the aggregates depend on
+STATS_FIELDS = (
+    "stroke_risk",
+    "smoking_status",
+    "avg_glucose_level",
+    "work_type",
+    "bmi",
+    "record_entry_date",
+    "created_by",
+)
+
+# Trend series span this many days when no window is given
+TREND_DEFAULT_DAYS = 90
+# Longest date window (days) and earliest date a dashboard filter accepts
+MAX_WINDOW_DAYS = 3 * 366
+MIN_WINDOW_DATE = datetime(2000, 1, 1)
+# Patients read at most to draw a sample for a filtered cohort
+FILTERED_SAMPLE_SCAN_LIMIT = 20000
+
+
+def scatter_bin_key(bmi, glucose):
+    """Grid cell of a (BMI, glucose) point, e.g. "12:9"."""
+    return f"{int(math.floor(bmi / SCATTER_BMI_BIN))}:{int(math.floor(glucose / SCATTER_GLUCOSE_BIN))}"
+
+
+def hex_bin_key(bmi, glucose):
+    """Pointy-top hexagon (axial q:r) containing a (BMI, glucose) point."""
+    x = bmi / SCATTER_BMI_BIN / SCATTER_HEX_SIZE
+    y = glucose / SCATTER_GLUCOSE_BIN / SCATTER_HEX_SIZE
+    q = math.sqrt(3) / 3 * x - y / 3
+    r = 2 / 3 * y
+
+    # Cube rounding: round all three coordinates, then fix the one that moved most
+    cube_x, cube_z = q, r
+    cube_y = -cube_x - cube_z
+    rx, ry, rz = round(cube_x), round(cube_y), round(cube_z)
+    dx, dy, dz = abs(rx - cube_x), abs(ry - cube_y), abs(rz - cube_z)
+    if dx > dy and dx > dz:
+        rx = -ry - rz
+    elif dy <= dz:
+        rz = -rx - ry
+    return f"{int(rx)}:{int(rz)}"
+
+
+def _grid_centre(cell):
+    bmi_bin, glucose_bin = (int(part) for part in cell.split(":"))
+    return (bmi_bin + 0.5) * SCATTER_BMI_BIN, (glucose_bin + 0.5) * SCATTER_GLUCOSE_BIN
+
+
+def _hex_centre(cell):
+    q, r = (int(part) for part in cell.split(":"))
+    x = SCATTER_HEX_SIZE * (math.sqrt(3) * q + math.sqrt(3) / 2 * r)
+    y = SCATTER_HEX_SIZE * 1.5 * r
+    return x * SCATTER_BMI_BIN, y * SCATTER_GLUCOSE_BIN
+
+
+def plaintext_contribution(patient):
+    """The part of a patient's contribution that only uses plaintext fields."""
+    risk = patient.stroke_risk or 0
+    return {
+        "total": 1,
+        "high_risk": 1 if risk > HIGH_RISK_THRESHOLD else 0,
+        "glucose_sum": patient.avg_glucose_level or 0,
+        "risk_sum": risk,
+        f"risk_levels.{get_risk_level(risk)}": 1,
+    }
+
+
+def encrypted_contribution(patient):
+    """The part of a patient's contribution that needs decrypted fields (smoking, work type, BMI)."""
+    risk = patient.stroke_risk or 0
+    glucose = patient.avg_glucose_level or 0
+    contribution = {
+        "smokers": 1 if patient.smoking_status in SMOKER_STATUSES else 0,
+        f"work_counts.{patient.work_type}": 1,
+    }
+    if patient.bmi is not None:
+        cell = scatter_bin_key(patient.bmi, glucose)
+        contribution[f"scatter_bins.{cell}.n"] = 1
+        contribution[f"scatter_bins.{cell}.risk_sum"] = risk
+        hexagon = hex_bin_key(patient.bmi, glucose)
+        contribution[f"hex_bins.{hexagon}.n"] = 1
+        contribution[f"hex_bins.{hexagon}.risk_sum"] = risk
+    return contribution
+
+
+def patient_contribution(patient):
+    """
+    What one patient adds to the aggregates, as {dotted path: amount}.
+    Works on a Patient document (decrypted values).
+    """
+    return {**plaintext_contribution(patient), **encrypted_contribution(patient)}
+
+
+def _combine(target, contribution, sign=1):
+    for path, amount in contribution.items():
+        target[path] = target.get(path, 0) + sign * amount
+    return target
+
+
+def apply_increments(increments):
+    """
+    Applies {path: amount} to the stats document with one atomic $inc.
+    Nothing is written before the first full build (get_stats() starts one on first use).
+    """
+    increments = {path: amount for path, amount in increments.items() if amount}
+    if not increments:
+        return
+    increments["version"] = 1
+    PatientStats._get_collection().update_one(
+        {"_id": STATS_KEY},
+        {"$inc": increments, "$set": {"updated_at": datetime.now()}},
+    )
+
+
+def record_patients_added(patients):
+    """Adds many new patients at once (bulk import bypasses document signals)."""
+    increments = {}
+    rollups = {}
+    for patient in patients:
+        _combine(increments, patient_contribution(patient))
+        _combine_rollup(rollups, patient)
+    apply_increments(increments)
+    apply_rollup_increments(rollups)
+
+
+# =======================================================
+# DAILY ROLLUPS (per entry day, creator and risk band)
+# =======================================================
+
+def truncate_day(timestamp):
+    """Rounds a timestamp down to midnight."""
+    return datetime(timestamp.year, timestamp.month, timestamp.day)
+
+
+def _combine_rollup(target, patient, sign=1):
+    """Adds (or subtracts) one patient to {(day, created_by, risk_band): {path: amount}}."""
+    risk = patient.stroke_risk or 0
+    glucose = patient.avg_glucose_level or 0
+    key = (truncate_day(patient.record_entry_date), patient.created_by, get_risk_level(risk))
+    contribution = {
+        "count": 1,
+        "high_risk": 1 if risk > HIGH_RISK_THRESHOLD else 0,
+        "smokers": 1 if patient.smoking_status in SMOKER_STATUSES else 0,
+        "glucose_sum": glucose,
+        "risk_sum": risk,
+        f"work_counts.{patient.work_type}": 1,
+    }
+    if patient.bmi is not None:
+        # Scatter cells per rollup, so a filtered scatter is summed like the KPIs
+        cell = scatter_bin_key(patient.bmi, glucose)
+        contribution[f"scatter_bins.{cell}.n"] = 1
+        contribution[f"scatter_bins.{cell}.risk_sum"] = risk
+        hexagon = hex_bin_key(patient.bmi, glucose)
+        contribution[f"hex_bins.{hexagon}.n"] = 1
+        contribution[f"hex_bins.{hexagon}.risk_sum"] = risk
+    _combine(target.setdefault(key, {}), contribution, sign)
+    return target
+
+
+def apply_rollup_increments(rollups):
+    """One atomic upsert per touched (day, created_by, risk_band) rollup."""
+    collection = PatientDailyRollup._get_collection()
+    for (day, created_by, risk_band), increments in rollups.items():
+        increments = {path: amount for path, amount in increments.items() if amount}
+        if increments:
+            collection.update_one(
+                {"day": day, "created_by": created_by, "risk_band": risk_band},
+                {"$inc": increments},
+                upsert=True,
+            )
+
+
+def _rebuild_rollups(rollups):
+    """
+    Replaces every rollup with freshly computed ones (used by reconcile_stats).
+    They are written to a scratch collection of their own (with the same indexes)
+    that is then renamed over the live one, so readers never see a half-built set.
+    Only called while holding the rebuild lock.
+    """
+    documents = []
+    for (day, created_by, risk_band), values in rollups.items():
+        doc = {"day": day, "created_by": created_by, "risk_band": risk_band, "work_counts": {}}
+        for path, amount in values.items():
+            parts = path.split(".")
+            node = doc
+            for part in parts[:-1]:
+                node = node.setdefault(part, {})
+            node[parts[-1]] = amount
+        documents.append(doc)
+
+    live = PatientDailyRollup._get_collection()
+    # Scratch collections left by a crashed rebuild (no other rebuild runs while the lock is held)
+    for name in live.database.list_collection_names():
+        if name.startswith(f"{live.name}_rebuild_"):
+            live.database.drop_collection(name)
+    scratch = live.database[f"{live.name}_rebuild_{ObjectId()}"]
+    for spec in PatientDailyRollup._meta["index_specs"]:
+        spec = dict(spec)
+        scratch.create_index(spec.pop("fields"), **spec)
+    if documents:
+        scratch.insert_many(documents)
+    scratch.rename(live.name, dropTarget=True)  # create_index() above always created it
+
+
+def _rollup_match(since=None, until=None, created_by=None):
+    match = {}
+    if since or until:
+        match["day"] = {}
+        if since:
+            match["day"]["$gte"] = truncate_day(since)
+        if until:
+            match["day"]["$lte"] = truncate_day(until)
+    if created_by:
+        match["created_by"] = created_by
+    return match
+
+
+def window_stats(since=None, until=None, created_by=None):
+    """
+    Sums the daily rollups for a date window (whole days, `until` inclusive)
+    and/or creator. Returns the same counters and scatter cells as the stats document.
+    """
+    stats = {
+        "total": 0,
+        "high_risk": 0,
+        "smokers": 0,
+        "glucose_sum": 0.0,
+        "risk_sum": 0.0,
+        "risk_levels": {},
+        "work_counts": {},
+        "scatter_bins": {},
+        "hex_bins": {},
+    }
+    for doc in PatientDailyRollup._get_collection().find(_rollup_match(since, until, created_by)):
+        stats["total"] += doc.get("count", 0)
+        stats["high_risk"] += doc.get("high_risk", 0)
+        stats["smokers"] += doc.get("smokers", 0)
+        stats["glucose_sum"] += doc.get("glucose_sum", 0)
+        stats["risk_sum"] += doc.get("risk_sum", 0)
+        band = doc["risk_band"]
+        stats["risk_levels"][band] = stats["risk_levels"].get(band, 0) + doc.get("count", 0)
+        for work_type, count in doc.get("work_counts", {}).items():
+            stats["work_counts"][work_type] = stats["work_counts"].get(work_type, 0) + count
+        for field in ("scatter_bins", "hex_bins"):
+            for cell, values in doc.get(field, {}).items():
+                total = stats[field].setdefault(cell, {"n": 0, "risk_sum": 0})
+                total["n"] += values.get("n", 0)
+                total["risk_sum"] += values.get("risk_sum", 0)
+    return stats
+
+
+def trend_series(since=None, until=None, created_by=None, now=None):
+    """
+    Chart-ready trends from the rollups: new patients per day and mean risk per
+    (Monday-based) week. Without `since`, the last TREND_DEFAULT_DAYS days are used;
+    never more than MAX_WINDOW_DAYS.
+    """
+    last_day = truncate_day(until or now or datetime.now())
+    first_day = truncate_day(since) if since else last_day - timedelta(days=TREND_DEFAULT_DAYS - 1)
+    first_day = max(first_day, last_day - timedelta(days=MAX_WINDOW_DAYS - 1))  # Bounded response size
+    days = [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+    day_index = {day: i for i, day in enumerate(days)}
+
+    weeks = sorted({day - timedelta(days=day.weekday()) for day in days})
+    week_index = {week: i for i, week in enumerate(weeks)}
+
+    daily_counts = [0] * len(days)
+    week_counts = [0] * len(weeks)
+    week_risk = [0.0] * len(weeks)
+
+    rollups = PatientDailyRollup._get_collection().find(
+        _rollup_match(first_day, last_day, created_by),
+        {"_id": 0, "day": 1, "count": 1, "risk_sum": 1},
+    )
+    for doc in rollups:
+        i = day_index.get(doc["day"])
+        if i is None:
+            continue
+        daily_counts[i] += doc.get("count", 0)
+        w = week_index[doc["day"] - timedelta(days=doc["day"].weekday())]
+        week_counts[w] += doc.get("count", 0)
+        week_risk[w] += doc.get("risk_sum", 0)
+
+    return {
+        "daily_new": {
+            "labels": [day.date().isoformat() for day in days],
+            "counts": daily_counts,
+        },
+        "weekly_risk": {
+            "labels": [week.date().isoformat() for week in weeks],
+            "mean_risk": [
+                round(risk / count, 2) if count else None
+                for risk, count in zip(week_risk, week_counts)
+            ],
+        },
+    }
+
+
+def patient_filter(since=None, until=None, created_by=None):
+    """The Patient query matching a window_stats() filter (same whole-day bounds)."""
+    match = {}
+    if since or until:
+        match["record_entry_date"] = {}
+        if since:
+            match["record_entry_date"]["$gte"] = truncate_day(since)
+        if until:
+            match["record_entry_date"]["$lt"] = truncate_day(until) + timedelta(days=1)
+    if created_by:
+        match["created_by"] = created_by
+    return match
+
+
+def kpi_pipeline(match=None):
+    """
+    One $facet aggregation over the plaintext fields: totals, glucose/risk sums
+    and the risk-level histogram.
+    """
+    totals = [{"$group": {
+        "_id": None,
+        "total": {"$sum": 1},
+        "high_risk": {"$sum": {"$cond": [{"$gt": ["$stroke_risk", HIGH_RISK_THRESHOLD]}, 1, 0]}},
+        "glucose_sum": {"$sum": "$avg_glucose_level"},
+        "risk_sum": {"$sum": "$stroke_risk"},
+    }}]
+    risk_levels = [{"$bucket": {
+        "groupBy": {"$ifNull": ["$stroke_risk", 0]},  # Missing risk counts as Low, as in plaintext_contribution()
+        "boundaries": list(RISK_LEVEL_BOUNDARIES),
+        "default": RISK_LEVELS[-1],  # 80 and above
+        "output": {"n": {"$sum": 1}},
+    }}]
+    pipeline = [{"$match": match}] if match else []
+    pipeline.append({"$facet": {"totals": totals, "risk_levels": risk_levels}})
+    return pipeline
+
+
+def plaintext_kpis(match=None):
+    """Runs kpi_pipeline() and flattens the result; no document is decrypted."""
+    result = next(Patient._get_collection().aggregate(kpi_pipeline(match)), {})
+    totals = (result.get("totals") or [{}])[0]
+    total = totals.get("total", 0)
+
+    labels = dict(zip(RISK_LEVEL_BOUNDARIES, RISK_LEVELS))
+    risk_levels = {}
+    for bucket in result.get("risk_levels", []):
+        label = labels.get(bucket["_id"], bucket["_id"])
+        risk_levels[label] = bucket["n"]
+
+    glucose_sum = totals.get("glucose_sum") or 0
+    return {
+        "total": total,
+        "high_risk": totals.get("high_risk", 0),
+        "glucose_sum": glucose_sum,
+        "risk_sum": totals.get("risk_sum") or 0,
+        "avg_glucose": round(glucose_sum / total, 2) if total else 0,
+        "risk_levels": risk_levels,
+    }
+
+
+def _empty_stats():
+    return {
+        "total": 0,
+        "high_risk": 0,
+        "smokers": 0,
+        "glucose_sum": 0.0,
+        "risk_sum": 0.0,
+        "risk_levels": {},
+        "work_counts": {},
+        "scatter_bins": {},
+        "hex_bins": {},
+    }
+
+
+def _acquire_rebuild_lock(owner, now=None):
+    """True when `owner` now holds the rebuild lock (one atomic upsert; a held lock raises DuplicateKeyError)."""
+    now = now or datetime.now()
+    try:
+        PatientStats._get_collection().find_one_and_update(
+            {"_id": REBUILD_LOCK_KEY, "locked_until": {"$lt": now}},
+            {"$set": {"owner": owner, "locked_until": now + timedelta(seconds=REBUILD_LOCK_SECONDS)}},
+            upsert=True,
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+def _release_rebuild_lock(owner):
+    PatientStats._get_collection().delete_one({"_id": REBUILD_LOCK_KEY, "owner": owner})
+
+
+def reconcile_stats():
+    """
+    Rebuilds the stats document and the daily rollups. Plaintext KPIs come from
+    one $facet aggregation run by the server; the Python pass only reads and
+    decrypts the fields the remaining aggregates need. Writes racing with the
+    rebuild can be off by one until the next run.
+    Returns the new stats, or None when another rebuild holds the lock.
+    """
+    owner = str(ObjectId())
+    if not _acquire_rebuild_lock(owner):
+        return None
+    try:
+        return _reconcile_locked()
+    finally:
+        _release_rebuild_lock(owner)
+
+
+def _reconcile_locked():
+    kpis = plaintext_kpis()
+    totals = {
+        "total": kpis["total"],
+        "high_risk": kpis["high_risk"],
+        "glucose_sum": kpis["glucose_sum"],
+        "risk_sum": kpis["risk_sum"],
+    }
+    for level, count in kpis["risk_levels"].items():
+        totals[f"risk_levels.{level}"] = count
+
+    rollups = {}
+    projection = {field: 1 for field in STATS_FIELDS}
+    for doc in Patient._get_collection().find({}, projection).batch_size(1000):
+        patient = Patient._from_son(doc)
+        _combine(totals, encrypted_contribution(patient))
+        _combine_rollup(rollups, patient)
+    _rebuild_rollups(rollups)
+
+    stats = _empty_stats()
+    for path, amount in totals.items():
+        parts = path.split(".")
+        node = stats
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = amount
+
+    collection = PatientStats._get_collection()
+    previous = collection.find_one({"_id": STATS_KEY}, {"version": 1}) or {}
+    now = datetime.now()
+    stats.update({
+        "schema": STATS_SCHEMA,
+        "version": previous.get("version", 0) + 1,
+        "updated_at": now,
+        "reconciled_at": now,
+    })
+    collection.replace_one({"_id": STATS_KEY}, stats, upsert=True)
+    return stats
+
+
+_reconcile_thread = None
+_reconcile_thread_lock = threading.Lock()
+
+
+def _reconcile_in_background():
+    try:
+        reconcile_stats()
+    except Exception as e:
+        print(f"--- STATS RECONCILE FAILED ---: {e}")
+
+
+def start_background_reconcile():
+    """Runs reconcile_stats() on a daemon thread unless this process already has one running."""
+    global _reconcile_thread
+    with _reconcile_thread_lock:
+        if _reconcile_thread is None or not _reconcile_thread.is_alive():
+            _reconcile_thread = threading.Thread(target=_reconcile_in_background, name="stats-reconcile", daemon=True)
+            _reconcile_thread.start()
+        return _reconcile_thread
+
+
+def get_stats(background=True):
+    """
+    Returns the stats document (as a dict). When it is missing or has an older
+    layout a rebuild is started (on a background thread unless `background` is
+    False) and the last stats, or empty ones, are returned until it is done.
+    """
+    stats = PatientStats._get_collection().find_one({"_id": STATS_KEY}, {"scatter_samples": 0})
+    if stats is None or stats.get("schema") != STATS_SCHEMA:
+        if background:
+            start_background_reconcile()
+            return stats or _empty_stats()
+        return reconcile_stats() or stats or _empty_stats()
+    return stats
+
+
+def scatter_from_bins(bins, mode="grid"):
+    """Turns grid or hex cells into bubble points: cell centre, size by count, mean risk."""
+    centre = _hex_centre if mode == "hex" else _grid_centre
+    points = []
+    for cell, values in bins.items():
+        count = values.get("n", 0)
+        if count <= 0:
+            continue
+        x, y = centre(cell)
+        mean_risk = values.get("risk_sum", 0) / count
+        points.append({
+            "x": round(x, 2),
+            "y": round(y, 2),
+            "r": round(min(3 + math.sqrt(count), 18), 2),
+            "risk": round(mean_risk, 2),
+            "count": count,
+        })
+    return points
+
+
+def reservoir_sample(items, size, seed=SAMPLE_SEED):
+    """Algorithm R with a seeded generator: a uniform, repeatable sample of at most `size` items."""
+    rng = random.Random(seed)
+    reservoir = []
+    for seen, item in enumerate(items):
+        if seen < size:
+            reservoir.append(item)
+        else:
+            slot = rng.randint(0, seen)
+            if slot < size:
+                reservoir[slot] = item
+    return reservoir
+
+
+def sample_scatter_points(max_points, match=None, scan_limit=0):
+    """
+    Picks up to `max_points` individual patients (walked in _id order, so the
+    sample is deterministic) and returns them as small bubbles. Raw documents are
+    sampled first, so only the chosen patients are decrypted. A `scan_limit`
+    samples from that many first matches only.
+    """
+    cursor = (
+        Patient._get_collection()
+        .find(match or {}, {"bmi": 1, "avg_glucose_level": 1, "stroke_risk": 1})
+        .sort("_id", 1)
+        .limit(scan_limit)
+        .batch_size(1000)
+    )
+    points = []
+    for doc in reservoir_sample(cursor, max_points):
+        patient = Patient._from_son(doc)
+        if patient.bmi is None:
+            continue
+        points.append({
+            "x": round(patient.bmi, 2),
+            "y": round(patient.avg_glucose_level or 0, 2),
+            "r": 4,
+            "risk": round(patient.stroke_risk or 0, 2),
+            "count": 1,
+        })
+    return points
+
+
+def sample_size(max_points):
+    """The fixed SAMPLE_SIZES entry a request for `max_points` is served from."""
+    return next((size for size in SAMPLE_SIZES if size >= max_points), SAMPLE_SIZES[-1])
+
+
+def get_sampled_scatter(stats, max_points):
+    """
+    Returns up to `max_points` sampled points. Samples are drawn at one of the
+    fixed SAMPLE_SIZES, shuffled with the fixed seed (so every prefix is a uniform
+    sample) and cached in their own collection. A cached sample is reused while
+    the stats are unchanged, or for SAMPLE_REFRESH_SECONDS after it was built.
+    """
+    size = sample_size(max_points)
+    cached = PatientScatterSample._get_collection().find_one({"_id": size})
+    if cached:
+        age = (datetime.now() - cached["built_at"]).total_seconds()
+        if cached.get("version") == stats.get("version") or age < SAMPLE_REFRESH_SECONDS:
+            return cached["points"][:max_points]
+
+    points = sample_scatter_points(size)
+    random.Random(SAMPLE_SEED).shuffle(points)
+    PatientScatterSample._get_collection().replace_one(
+        {"_id": size},
+        {"points": points, "version": stats.get("version"), "built_at": datetime.now()},
+        upsert=True,
+    )
+    return points[:max_points]
+
+
+def get_scatter(stats, mode=DEFAULT_SCATTER_MODE, max_points=DEFAULT_SAMPLE_POINTS):
+    """Scatter points for the dashboard in the requested reduction mode."""
+    if mode == "hex":
+        return scatter_from_bins(stats.get("hex_bins", {}), mode="hex")
+    if mode == "sample":
+        return get_sampled_scatter(stats, max_points)
+    return scatter_from_bins(stats.get("scatter_bins", {}))
+
+
+def filtered_scatter(match, window, mode=DEFAULT_SCATTER_MODE, max_points=DEFAULT_SAMPLE_POINTS):
+    """
+    Scatter for a filtered cohort. Grid and hex cells come from `window`
+    (window_stats() of the same filter); a sample reads at most
+    FILTERED_SAMPLE_SCAN_LIMIT matching patients through the filter indexes.
+    """
+    if mode == "sample":
+        return sample_scatter_points(max_points, match, scan_limit=FILTERED_SAMPLE_SCAN_LIMIT)
+    return scatter_from_bins(window.get("hex_bins" if mode == "hex" else "scatter_bins", {}), mode)
+
+
+# =======================================================
+# INCREMENTAL MAINTENANCE (document signals)
+# =======================================================
+
+def _on_patient_pre_save(sender, document, **kwargs):
+    # Existing record: remember its previous values so an update applies a delta
+    document._stats_before = None
+    if document.pk is None:
+        return
+    try:
+        document._stats_before = Patient.objects(pk=document.pk).only(*STATS_FIELDS).first()
+    except Exception as e:
+        print(f"--- STATS UPDATE FAILED ---: Could not read previous patient values: {e}")
+
+
+def _on_patient_saved(sender, document, **kwargs):
+    try:
+        increments = patient_contribution(document)
+        rollups = _combine_rollup({}, document)
+        before = getattr(document, "_stats_before", None)
+        if before:
+            _combine(increments, patient_contribution(before), sign=-1)
+            _combine_rollup(rollups, before, sign=-1)
+        apply_increments(increments)
+        apply_rollup_increments(rollups)
+    except Exception as e:
+        print(f"--- STATS UPDATE FAILED ---: {e}")
+
+
+def _on_patient_deleted(sender, document, **kwargs):
+    try:
+        apply_increments(_combine({}, patient_contribution(document), sign=-1))
+        apply_rollup_increments(_combine_rollup({}, document, sign=-1))
+    except Exception as e:
+        print(f"--- STATS UPDATE FAILED ---: {e}")
+
+
+signals.pre_save.connect(_on_patient_pre_save, sender=Patient)
+signals.post_save.connect(_on_patient_saved, sender=Patient)
+signals.post_delete.connect(_on_patient_deleted, sender=Patient)
@@ -0,0 +1,130 @@
+# app/utils/export_stream.py
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+
+# Rows pulled from Mongo per round trip and serialized per yielded chunk
+EXPORT_BATCH_SIZE = 500
+
+# Leading characters that make spreadsheet apps evaluate a CSV cell as a formula
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+LOG_EXPORT_FIELDS = [
+    "timestamp",
+    "log_level",
+    "user_name",
+    "user_role",
+    "client_ip",
+    "client_os",
+    "info",
+]
+
+PATIENT_EXPORT_FIELDS = [
+    "patient_id",
+    "name",
+    "age",
+    "gender",
+    "ever_married",
+    "work_type",
+    "residence_type",
+    "heart_disease",
+    "hypertension",
+    "avg_glucose_level",
+    "bmi",
+    "smoking_status",
+    "stroke_risk",
+    "record_entry_date",
+    "created_by",
+    "updated_at",
+    "updated_by",
+]
+
+
+def _plain(value):
+    """Converts values that JSON/CSV cannot take directly."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _csv_safe(value):
+    """Prefixes text cells that a spreadsheet would run as a formula with a quote."""
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_chunks(cursor, batch_size=EXPORT_BATCH_SIZE):
+    """Groups a cursor into lists of at most batch_size documents."""
+    chunk = []
+    for doc in cursor:
+        chunk.append(doc)
+        if len(chunk) >= batch_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def log_rows(collections, query, batch_size=EXPORT_BATCH_SIZE):
+    """Yields chunks of log rows (dicts) from each collection, newest first."""
+    projection = {field: 1 for field in LOG_EXPORT_FIELDS}
+    for collection in collections:
+        cursor = collection.find(query, projection).sort([("timestamp", -1), ("_id", -1)]).batch_size(batch_size)
+        for chunk in iter_chunks(cursor, batch_size):
+            yield [{field: _plain(doc.get(field)) for field in LOG_EXPORT_FIELDS} for doc in chunk]
+
+
+def patient_rows(PatientModel, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yields chunks of decrypted patient rows.
+    Raw documents are read in batches and only decrypted one chunk at a time.
+    """
+    cursor = PatientModel._get_collection().find({}).sort("record_entry_date", -1).batch_size(batch_size)
+    for chunk in iter_chunks(cursor, batch_size):
+        rows = []
+        for doc in chunk:
+            patient = PatientModel._from_son(doc)
+            rows.append({field: _plain(getattr(patient, field, None)) for field in PATIENT_EXPORT_FIELDS})
+        yield rows
+
+
+def encode_chunks(row_chunks, fmt, fields):
+    """Serializes row chunks to NDJSON or CSV text, one string per chunk."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        yield buffer.getvalue()
+
+        for rows in row_chunks:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows({field: _csv_safe(value) for field, value in row.items()} for row in rows)
+            yield buffer.getvalue()
+    else:
+        for rows in row_chunks:
+            yield "".join(json.dumps(row, default=str) + "\n" for row in rows)
+
+
+def gzip_stream(text_chunks, level=6):
+    """Compresses a text stream into gzip bytes on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for text in text_chunks:
+        data = compressor.compress(text.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def build_stream(row_chunks, fmt, fields, compress=False):
+    """Returns the byte/text generator for a streaming export response."""
+    stream = encode_chunks(row_chunks, fmt, fields)
+    return gzip_stream(stream) if compress else stream
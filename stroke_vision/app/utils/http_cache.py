@@ -0,0 +1,112 @@
+# app/utils/http_cache.py
+import hashlib
+import os
+import threading
+from flask import current_app, make_response, render_template, request
+from flask_login import current_user
+from app.utils.compression import ETAG_ENCODING_SUFFIXES
+
+# Bump when a fragment's template or the shape of its data changes,
+# so ETags issued by older code are no longer matched.
+FRAGMENT_VERSION = "1"
+
+# Browsers may keep the fragment but must revalidate it (and never share it)
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts):
+    """Builds a strong ETag value from the given parts (datetimes, ids, versions)."""
+    raw = "|".join(str(part) for part in (FRAGMENT_VERSION, *parts))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def not_modified(etag):
+    """Returns a 304 response if the client already holds `etag` (in any encoding), else None."""
+    held = (etag, *(etag + suffix for suffix in ETAG_ENCODING_SUFFIXES.values()))
+    if any(request.if_none_match.contains(tag) for tag in held):
+        response = make_response("", 304)
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+        return response
+    return None
+
+
+def with_etag(body, etag):
+    """Wraps a rendered body into a response carrying the ETag and revalidation headers."""
+    response = make_response(body)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+    return response
+
+
+# =======================================================
+# ROLE-AWARE FRAGMENT CACHE (static partials without per-user data)
+# =======================================================
+
+_fragment_lock = threading.Lock()
+_fragments = {}  # (template, role, asset_version) -> rendered html
+
+
+def compute_asset_version(*folders):
+    """Short hash of the newest file mtime under the given folders (changes on deploy/edit)."""
+    newest = 0.0
+    for folder in folders:
+        for root, _, files in os.walk(folder):
+            for name in files:
+                newest = max(newest, os.path.getmtime(os.path.join(root, name)))
+    return hashlib.sha256(str(newest).encode("utf-8")).hexdigest()[:12]
+
+
+def render_fragment(template_name):
+    """
+    Renders a static fragment once per (template, role, asset version) and serves it
+    with an ETag; a matching If-None-Match gets a 304 without touching the template.
+    """
+    role = current_user.role if current_user.is_authenticated else "Anonymous"
+    asset_version = current_app.config.get("ASSET_VERSION", "")
+    key = (template_name, role, asset_version)
+
+    etag = make_etag("fragment", *key)
+    cached = not_modified(etag)
+    if cached:
+        return _fragment_headers(cached)
+
+    with _fragment_lock:
+        html = _fragments.get(key)
+
+    if html is None:
+        html = render_template(template_name)
+        # Keep re-reading templates while developing
+        if not current_app.jinja_env.auto_reload:
+            with _fragment_lock:
+                _fragments[key] = html
+
+    return _fragment_headers(with_etag(html, etag))
+
+
+def _fragment_headers(response):
+    """Adds the optional max-age and varies on the session cookie (fragments are per role)."""
+    max_age = current_app.config.get("FRAGMENT_CACHE_MAX_AGE", 0)
+    if max_age:
+        response.headers["Cache-Control"] = f"private, max-age={max_age}"
+    response.headers["Vary"] = "Cookie"
+    return response
+
+
+def clear_fragment_cache():
+    """Drops every rendered fragment (e.g. after templates change at runtime)."""
+    with _fragment_lock:
+        _fragments.clear()
+
+
+def precompile_templates(app):
+    """Compiles every Jinja template up front so first requests skip compilation."""
+    env = app.jinja_env
+    names = env.list_templates(extensions=["html"])
+
+    for name in names:
+        try:
+            env.get_template(name)
+        except Exception as e:
+            print(f"--- TEMPLATES ---: Could not precompile {name}: {e}")
+    return len(names)
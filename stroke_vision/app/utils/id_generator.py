@@ -1,57 +1,155 @@
 from datetime import datetime
-import random
-from app.models.patient import Patient
+import threading
+from pymongo import ReturnDocument
+from app.models.patient import Patient, PatientIDCounter
 from app.utils.log_utils import (
     log_activity,
 )  # patient-related events (visible to doctors/admin)
 
 
-class IDGenerator:
-    @staticmethod
-    def generate_patient_id():
-        max_attempts = 5
+# Suffixes per date prefix (4 digits)
+IDS_PER_DAY = 10000
+# IDs a worker reserves per round trip for single-record creation
+ID_BLOCK_SIZE = 10
 
-        for attempt in range(max_attempts):
-            now = datetime.now()
-            year_digit = str(now.year)[-1]
-            month_digits = str(now.month).zfill(2)
-            day_digits = str(now.day).zfill(2)
 
-            date_portion = f"{year_digit}{month_digits}{day_digits}"
-            random_sequence = str(random.randint(0, 9999)).zfill(4)
-            patient_id = f"{date_portion}{random_sequence}"
+def _date_prefix(now=None):
+    now = now or datetime.now()
+    return f"{str(now.year)[-1]}{str(now.month).zfill(2)}{str(now.day).zfill(2)}"
 
-            # Log attempt
-            if attempt == 0:
-                log_activity(
-                    f"Generating new patient ID attempt 1: {patient_id}", level=1
-                )
-            else:
-                log_activity(
-                    f"Retry attempt {attempt + 1} generating patient ID: {patient_id}",
-                    level=2,
-                )
 
-            if IDGenerator.validate_patient_id(patient_id):
-                log_activity(
-                    f"Successfully generated valid patient ID: {patient_id}", level=1
-                )
-                return str(patient_id)
-            else:
-                print(
-                    f"Attempt {attempt + 1}: Generated invalid ID {patient_id}. Retrying..."
-                )
-                log_activity(
-                    f"Generated invalid patient ID (will retry): {patient_id}", level=2
-                )
+class PatientIDAllocator:
+    """
+    Hands out patient IDs from blocks reserved on an atomic per-day counter.
+    Each process reserves ID_BLOCK_SIZE suffixes with one find_one_and_update($inc)
+    and serves them locally, so there are no retries and no existence queries.
+    """
+
+    def __init__(self, block_size=ID_BLOCK_SIZE):
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._prefix = None
+        self._next = 0
+        self._end = 0
+        self._seeded = set()  # Prefixes whose counter was checked by this process
+
+    def allocate(self, count=1):
+        """Returns `count` unused IDs for today. Raises ValueError when the day is exhausted."""
+        prefix = _date_prefix()
+        ids = []
+
+        with self._lock:
+            if prefix != self._prefix:
+                self._prefix, self._next, self._end = prefix, 0, 0
+                self._seeded.clear()
+
+            while len(ids) < count:
+                if self._next >= self._end:
+                    wanted = max(self.block_size, count - len(ids))
+                    self._next, self._end = self._reserve(prefix, wanted)
+
+                take = min(count - len(ids), self._end - self._next)
+                ids.extend(f"{prefix}{str(n).zfill(4)}" for n in range(self._next, self._next + take))
+                self._next += take
+
+        return ids
+
+    def reserve(self, count):
+        """
+        Reserves `count` consecutive IDs for today with a single $inc (bypasses the local block).
+        Raises ValueError if fewer than `count` IDs are left today (nothing is consumed then).
+        """
+        if count < 1:
+            return []
+        prefix = _date_prefix()
+
+        with self._lock:
+            start, end = self._reserve(prefix, count, partial=False)
+        return [f"{prefix}{str(n).zfill(4)}" for n in range(start, end)]
+
+    def remaining(self):
+        """IDs still free today on the shared counter (blocks already held by workers count as used)."""
+        prefix = _date_prefix()
+        with self._lock:
+            self._seed(prefix)
+            counter = PatientIDCounter._get_collection().find_one({"_id": prefix}, {"seq": 1})
+        return max(0, IDS_PER_DAY - (counter["seq"] if counter else 0))
+
+    def reset(self):
+        """Forgets the local block (the unused part is simply skipped)."""
+        with self._lock:
+            self._prefix, self._next, self._end = None, 0, 0
+            self._seeded.clear()
+
+    def _seed(self, prefix):
+        """First use of a prefix: start after any IDs created before the counter existed."""
+        collection = PatientIDCounter._get_collection()
+        if prefix not in self._seeded and not collection.find_one({"_id": prefix}, {"_id": 1}):
+            last = Patient._get_collection().find_one(
+                {"patient_id": {"$regex": f"^{prefix}"}},
+                {"patient_id": 1, "_id": 0},
+                sort=[("patient_id", -1)],
+            )
+            floor = int(last["patient_id"][-4:]) + 1 if last else 0
+            collection.update_one({"_id": prefix}, {"$max": {"seq": floor}}, upsert=True)
+        self._seeded.add(prefix)
+
+    def _reserve(self, prefix, count, partial=True):
+        """
+        Atomically reserves [start, end) suffixes for `prefix`. The day's limit is part of
+        the update filter, so a reservation that does not fit consumes nothing. With
+        `partial`, whatever is left of the day is taken instead of failing.
+        """
+        collection = PatientIDCounter._get_collection()
+        self._seed(prefix)
+
+        while True:
+            counter = collection.find_one_and_update(
+                {"_id": prefix, "seq": {"$lte": IDS_PER_DAY - count}},
+                {"$inc": {"seq": count}},
+                return_document=ReturnDocument.AFTER,
+            )
+            if counter:
+                return counter["seq"] - count, counter["seq"]
+
+            current = collection.find_one({"_id": prefix}, {"seq": 1})
+            if current is None:
+                # Counter removed since this process seeded it
+                self._seeded.discard(prefix)
+                self._seed(prefix)
+                continue
+
+            left = IDS_PER_DAY - current["seq"]
+            if left <= 0:
+                log_activity(f"Patient IDs exhausted for date prefix {prefix}.", level=4)
+                raise ValueError("No patient IDs left for today.")
+            if not partial:
+                log_activity(f"Could not reserve {count} patient IDs for {prefix}: only {left} left.", level=3)
+                raise ValueError(f"Not enough patient IDs left for today ({left} remaining).")
+            count = left  # Another worker may take them first; the filter re-checks
+
+
+patient_id_allocator = PatientIDAllocator()
 
-        log_activity(
-            f"Failed to generate a valid patient ID after {max_attempts} attempts.",
-            level=3,
-        )
-        raise ValueError(
-            "Failed to generate a valid patient ID after maximum attempts."
-        )
+
+class IDGenerator:
+    @staticmethod
+    def generate_patient_id():
+        """Returns a new, unused patient ID for today (no database lookup per ID)."""
+        return patient_id_allocator.allocate(1)[0]
+
+    @staticmethod
+    def reserve_ids(n):
+        """
+        Returns n unique, format-valid patient IDs for today, reserved in one atomic
+        operation. Meant for batch ingest (bulk import, populate scripts).
+        """
+        return patient_id_allocator.reserve(n)
+
+    @staticmethod
+    def remaining_ids():
+        """Patient IDs still available today (check before a large batch)."""
+        return patient_id_allocator.remaining()
 
     @staticmethod
     def check_patient_id(patient_id):
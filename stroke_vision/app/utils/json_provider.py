@@ -0,0 +1,44 @@
+# app/utils/json_provider.py
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+
+# orjson is optional: without it the standard library encoder is used
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _numpy_default(obj):
+    """NumPy scalars and arrays as plain Python values (model outputs end up in responses)."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return DefaultJSONProvider.default(obj)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider used by jsonify() across every blueprint.
+    Serializes with orjson when installed (keys sorted and datetimes rendered
+    exactly like Flask's default provider), and handles NumPy types either way.
+    """
+
+    default = staticmethod(_numpy_default)
+
+    if orjson is not None:
+        OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, obj, **kwargs):
+        # Extra options (indent, separators...) go through the standard encoder
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.OPTIONS).decode("utf-8")
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self.OPTIONS)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
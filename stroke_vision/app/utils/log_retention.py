@@ -0,0 +1,182 @@
+# app/utils/log_retention.py
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+
+# Retention (days) per log level 0-4. 0 means "keep forever".
+DEFAULT_RETENTION_DAYS = {0: 7, 1: 30, 2: 90, 3: 365, 4: 365}
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def parse_retention_days(value):
+    """
+    Parses a comma separated list of 5 day counts (levels 0-4), e.g. "7,30,90,365,365".
+    Falls back to DEFAULT_RETENTION_DAYS for missing/invalid input.
+    """
+    if not value:
+        return dict(DEFAULT_RETENTION_DAYS)
+
+    try:
+        days = [int(part.strip()) for part in str(value).split(",")]
+    except ValueError:
+        return dict(DEFAULT_RETENTION_DAYS)
+
+    if len(days) != 5 or any(d < 0 for d in days):
+        return dict(DEFAULT_RETENTION_DAYS)
+
+    return {level: d for level, d in enumerate(days)}
+
+
+def compute_expire_at(timestamp, level, retention_days, grace_days=0):
+    """
+    Returns the datetime at which the TTL index may remove an entry, or None to keep it.
+    The grace period gives the archival job a chance to export entries first.
+    """
+    days = retention_days.get(level, 0)
+    if not days:
+        return None
+    return timestamp + timedelta(days=days + grace_days)
+
+
+# =======================================================
+# MONTHLY PARTITIONS
+# =======================================================
+
+_initialized_partitions = set()
+
+
+def partition_name(LogModel, when):
+    """Collection name of the monthly partition for `when` (e.g. activity_logs_2025_01)."""
+    return f"{LogModel._get_collection_name()}_{when:%Y_%m}"
+
+
+def get_partition_collection(LogModel, when):
+    """Returns the pymongo collection for the month of `when`, creating its indexes once."""
+    name = partition_name(LogModel, when)
+    collection = LogModel._get_db()[name]
+
+    if name not in _initialized_partitions:
+        for spec in LogModel._meta["index_specs"]:
+            spec = spec.copy()
+            fields = spec.pop("fields")
+            spec.pop("cls", None)
+            collection.create_index(fields, **spec)
+        _initialized_partitions.add(name)
+
+    return collection
+
+
+def _newest_timestamp(collection):
+    """Timestamp of the newest entry in a collection (datetime.min when empty)."""
+    doc = collection.find_one({}, {"timestamp": 1}, sort=[("timestamp", -1), ("_id", -1)])
+    return (doc or {}).get("timestamp") or datetime.min
+
+
+def log_collections(LogModel, include_partitions=False):
+    """
+    Returns the collections holding LogModel entries, newest first.
+    With partitions they are ranked by their newest entry rather than by name,
+    so the base collection comes first again once monthly collections are turned off.
+    """
+    db = LogModel._get_db()
+    base = LogModel._get_collection_name()
+    collections = [LogModel._get_collection()]
+
+    if include_partitions:
+        prefix = f"{base}_"
+        names = sorted(
+            (n for n in db.list_collection_names() if n.startswith(prefix) and n[len(prefix):].replace("_", "").isdigit()),
+            reverse=True,
+        )
+        collections = [db[n] for n in names] + collections
+        # Stable sort: ties (e.g. empty collections) keep the partitions-then-base order
+        collections.sort(key=_newest_timestamp, reverse=True)
+
+    return collections
+
+
+# =======================================================
+# ARCHIVAL
+# =======================================================
+
+def _serialize_log(doc):
+    """Converts a raw log document into a JSON-safe dict."""
+    out = {}
+    for key, value in doc.items():
+        if isinstance(value, datetime):
+            out[key] = value.isoformat()
+        else:
+            out[key] = str(value) if key == "_id" else value
+    return out
+
+
+def _expired_filters(retention_days, now):
+    """One filter per level so each query uses the (log_level, timestamp) index."""
+    return [
+        {"log_level": level, "timestamp": {"$lt": now - timedelta(days=days)}}
+        for level, days in sorted(retention_days.items())
+        if days
+    ]
+
+
+def archive_collection(collection, retention_days, archive_dir, now=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Streams expired entries of a single collection into a gzip JSONL file and deletes them.
+    Entries are only deleted after their batch has been written and flushed.
+    Returns the number of archived entries.
+    """
+    now = now or datetime.now()
+    archived = 0
+    out = None
+    path = None
+
+    try:
+        for query in _expired_filters(retention_days, now):
+            cursor = collection.find(query).sort("timestamp", 1).batch_size(batch_size)
+            batch_ids = []
+
+            for doc in cursor:
+                if out is None:
+                    os.makedirs(archive_dir, exist_ok=True)
+                    path = os.path.join(archive_dir, f"{collection.name}_{now:%Y%m%d_%H%M%S}.jsonl.gz")
+                    out = gzip.open(path, "at", encoding="utf-8")
+
+                out.write(json.dumps(_serialize_log(doc), default=str) + "\n")
+                batch_ids.append(doc["_id"])
+
+                if len(batch_ids) >= batch_size:
+                    out.flush()
+                    collection.delete_many({"_id": {"$in": batch_ids}})
+                    archived += len(batch_ids)
+                    batch_ids = []
+
+            if batch_ids:
+                out.flush()
+                collection.delete_many({"_id": {"$in": batch_ids}})
+                archived += len(batch_ids)
+    finally:
+        if out is not None:
+            out.close()
+
+    return archived
+
+
+def archive_expired_logs(LogModel, retention_days, archive_dir, now=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Archives expired entries from the base collection and every monthly partition.
+    Past-month partitions left empty afterwards are dropped.
+    Returns the total number of archived entries.
+    """
+    now = now or datetime.now()
+    keep = {LogModel._get_collection_name(), partition_name(LogModel, now)}
+    total = 0
+
+    for collection in log_collections(LogModel, include_partitions=True):
+        total += archive_collection(collection, retention_days, archive_dir, now=now, batch_size=batch_size)
+
+        if collection.name not in keep and collection.estimated_document_count() == 0:
+            collection.drop()
+            _initialized_partitions.discard(collection.name)
+
+    return total
@@ -0,0 +1,170 @@
+# app/utils/log_rollup.py
+import threading
+import time
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.models.log import SecurityLogRollup
+
+# How long each granularity is kept
+ROLLUP_RETENTION = {
+    "minute": timedelta(days=2),
+    "hour": timedelta(days=90),
+}
+
+# Supported stats windows -> (granularity, bucket count)
+STATS_WINDOWS = {
+    "1h": ("minute", 60),
+    "24h": ("hour", 24),
+    "7d": ("hour", 24 * 7),
+}
+
+TOP_N = 5
+FAILURE_MIN_LEVEL = 3  # Errors and critical entries (e.g. "Login failure")
+
+
+def truncate_bucket(timestamp, granularity):
+    """Rounds a timestamp down to the start of its minute/hour bucket."""
+    if granularity == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+class RollupBuffer:
+    """
+    Per-process buffer of security rollup increments. Events are summed per
+    rollup key and written with one unordered bulk upsert once the oldest is
+    `flush_seconds` old, so a burst of events costs one round trip, not two per event.
+    """
+
+    MAX_KEYS = 1024
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}  # (granularity, bucket, level, ip, user) -> count
+        self._started = None
+
+    def add(self, timestamp, level, client_ip, user_name, count=1, flush_seconds=0, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            for granularity in ROLLUP_RETENTION:
+                key = (granularity, truncate_bucket(timestamp, granularity), level, client_ip, user_name)
+                self._pending[key] = self._pending.get(key, 0) + count
+            if self._started is None:
+                self._started = now
+            due = now - self._started >= flush_seconds or len(self._pending) >= self.MAX_KEYS
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Writes all pending increments; returns the number of rollup keys written."""
+        with self._lock:
+            pending, self._pending, self._started = self._pending, {}, None
+        if not pending:
+            return 0
+
+        items = list(pending.items())
+        operations = [
+            UpdateOne(
+                {
+                    "granularity": granularity,
+                    "bucket": bucket,
+                    "log_level": level,
+                    "client_ip": client_ip,
+                    "user_name": user_name,
+                },
+                {
+                    "$inc": {"count": count},
+                    "$setOnInsert": {"expire_at": bucket + ROLLUP_RETENTION[granularity]},
+                },
+                upsert=True,
+            )
+            for (granularity, bucket, level, client_ip, user_name), count in items
+        ]
+        try:
+            SecurityLogRollup._get_collection().bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # The other operations were applied; keep only the failed ones for the next flush
+            self._restore(items[error["index"]] for error in e.details.get("writeErrors", []))
+            raise
+        except Exception:
+            self._restore(items)
+            raise
+        return len(items)
+
+    def _restore(self, items):
+        """Puts unwritten increments back into the buffer."""
+        with self._lock:
+            for key, count in items:
+                self._pending[key] = self._pending.get(key, 0) + count
+            if self._pending and self._started is None:
+                self._started = time.monotonic()
+
+    def reset(self):
+        with self._lock:
+            self._pending.clear()
+            self._started = None
+
+
+security_rollups = RollupBuffer()
+
+
+def record_security_event(timestamp, level, client_ip, user_name, count=1, flush_seconds=0):
+    """
+    Adds one SecurityLog write to the minute and hour rollups. With the default
+    flush_seconds=0 it is written at once; otherwise it is buffered (see RollupBuffer).
+    """
+    security_rollups.add(timestamp, level, client_ip, user_name, count, flush_seconds)
+
+
+def get_security_stats(window="24h", now=None):
+    """
+    Builds chart-ready security stats from the rollups only.
+    Returns per-bucket counts by level plus the top IPs/users by failure count.
+    Raises ValueError for unknown windows.
+    """
+    if window not in STATS_WINDOWS:
+        raise ValueError(f"Unsupported window '{window}'. Use one of: {', '.join(STATS_WINDOWS)}.")
+
+    # Include this worker's buffered events (other workers catch up within their flush interval)
+    security_rollups.flush()
+
+    granularity, size = STATS_WINDOWS[window]
+    step = timedelta(minutes=1) if granularity == "minute" else timedelta(hours=1)
+    last_bucket = truncate_bucket(now or datetime.now(), granularity)
+    buckets = [last_bucket - step * i for i in range(size - 1, -1, -1)]
+    index = {b: i for i, b in enumerate(buckets)}
+
+    levels = {level: [0] * size for level in range(5)}
+    failures_by_ip = {}
+    failures_by_user = {}
+
+    rollups = SecurityLogRollup._get_collection().find(
+        {"granularity": granularity, "bucket": {"$gte": buckets[0]}},
+        {"_id": 0, "bucket": 1, "log_level": 1, "client_ip": 1, "user_name": 1, "count": 1},
+    )
+
+    for doc in rollups:
+        i = index.get(doc["bucket"])
+        if i is None:
+            continue
+        levels[doc["log_level"]][i] += doc["count"]
+
+        if doc["log_level"] >= FAILURE_MIN_LEVEL:
+            ip = doc.get("client_ip") or "Unknown IP"
+            user = doc.get("user_name") or "Anonymous"
+            failures_by_ip[ip] = failures_by_ip.get(ip, 0) + doc["count"]
+            failures_by_user[user] = failures_by_user.get(user, 0) + doc["count"]
+
+    def top(counter, key):
+        ranked = sorted(counter.items(), key=lambda item: item[1], reverse=True)[:TOP_N]
+        return [{key: name, "count": count} for name, count in ranked]
+
+    return {
+        "window": window,
+        "granularity": granularity,
+        "labels": [b.isoformat() for b in buckets],
+        "levels": {str(level): counts for level, counts in levels.items()},
+        "top_ips": top(failures_by_ip, "client_ip"),
+        "top_users": top(failures_by_user, "user_name"),
+    }
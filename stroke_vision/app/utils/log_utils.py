@@ -1,15 +1,182 @@
 # app/utils/log_utils.py
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
 from typing import Union
-from flask import request
+from flask import request, current_app, g, has_app_context, has_request_context
 from flask_login import current_user
 from app.models.log import (
     ActivityLog,
     SecurityLog,
 )
+from app.utils.log_retention import (
+    DEFAULT_RETENTION_DAYS,
+    compute_expire_at,
+    get_partition_collection,
+)
+from app.utils.log_rollup import record_security_event
+
+# Defaults used when no app config is available (e.g. scripts outside a request)
+DEFAULT_MIN_LEVELS = {"activity_logs": 0, "security_logs": 0}
+DEFAULT_SAMPLE_LIMIT = 0  # 0 disables sampling
+DEFAULT_SAMPLE_WINDOW_SECONDS = 1.0
+DEFAULT_SAMPLE_MAX_LEVEL = 1  # Only levels <= this are ever sampled (warnings+ always kept)
+DEFAULT_ROLLUP_FLUSH_SECONDS = 0  # Write security rollups immediately
+
+
+class LogSampler:
+    """
+    Per-process rate sampler keyed on (collection, level, message, client IP, user).
+    Allows at most `limit` identical messages per window and counts the rest,
+    so the next emitted entry for that key can report how many were suppressed.
+    Counts for keys that are never logged again are handed out by expired().
+    """
+
+    MAX_KEYS = 2048
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._windows = {}  # key -> [window_start, emitted, suppressed, context]
+        self._last_sweep = None
+
+    def allow(self, key, limit, window, now=None, context=None):
+        """
+        Returns (allowed, suppressed_count).
+        suppressed_count is the number of entries dropped in the previous window(s)
+        and is only non-zero on the first allowed entry after suppression.
+        `context` is kept with a suppressed key and returned by expired().
+        """
+        now = time.monotonic() if now is None else now
+
+        with self._lock:
+            state = self._windows.get(key)
+
+            if state is None or now - state[0] >= window:
+                suppressed = state[2] if state else 0
+                if state is None and len(self._windows) >= self.MAX_KEYS:
+                    self._prune(now, window)
+                self._windows[key] = [now, 1, 0, None]
+                return True, suppressed
+
+            if state[1] < limit:
+                state[1] += 1
+                suppressed, state[2] = state[2], 0
+                return True, suppressed
+
+            state[2] += 1
+            state[3] = context
+            return False, 0
+
+    def expired(self, window, now=None):
+        """
+        Removes keys whose window has passed with suppressed entries still pending
+        and returns them as (key, suppressed_count, context). Scans at most once per window.
+        """
+        now = time.monotonic() if now is None else now
+
+        with self._lock:
+            if self._last_sweep is not None and now - self._last_sweep < window:
+                return []
+            self._last_sweep = now
+            flushed = [
+                (key, state[2], state[3])
+                for key, state in self._windows.items()
+                if now - state[0] >= window and state[2]
+            ]
+            for key, _, _ in flushed:
+                del self._windows[key]
+            return flushed
+
+    def _prune(self, now, window):
+        """Drops expired keys with nothing pending so the table stays bounded."""
+        stale = [k for k, v in self._windows.items() if now - v[0] >= window and not v[2]]
+        for k in stale:
+            del self._windows[k]
+        if len(self._windows) >= self.MAX_KEYS:
+            self._windows.clear()
+
+    def reset(self):
+        with self._lock:
+            self._windows.clear()
+            self._last_sweep = None
+
+
+log_sampler = LogSampler()
+
+
+def _get_log_config(key, default):
+    """Reads a logging setting from the app config, falling back to a default."""
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+def _should_write(LogModel, info_message: str, level: int, client_context, user_details):
+    """
+    Applies the per-collection minimum level and the per-message rate sampler.
+    The sampler key includes the client IP and user, so suppressed entries are
+    always reported (and counted in the rollups) under their own source.
+    Returns (write, suppressed_count).
+    """
+    collection = LogModel._get_collection_name()
+
+    min_levels = _get_log_config("LOG_MIN_LEVELS", DEFAULT_MIN_LEVELS)
+    if level < min_levels.get(collection, 0):
+        return False, 0
+
+    limit = _get_log_config("LOG_SAMPLE_LIMIT", DEFAULT_SAMPLE_LIMIT)
+    max_level = _get_log_config("LOG_SAMPLE_MAX_LEVEL", DEFAULT_SAMPLE_MAX_LEVEL)
+    if limit <= 0 or level > max_level:
+        return True, 0
+
+    window = _get_log_config("LOG_SAMPLE_WINDOW_SECONDS", DEFAULT_SAMPLE_WINDOW_SECONDS)
+    key = (collection, level, info_message, client_context["client_ip"], user_details["name"])
+    return log_sampler.allow(key, limit, window, context=(LogModel, client_context, user_details))
+
+
+def _suppressed_message(info_message, suppressed):
+    """The one format both carried and flushed suppressed counts are written in."""
+    return f"{info_message} (+{suppressed} similar entries suppressed)"
+
+
+def _flush_expired_suppressed():
+    """
+    Writes one summary entry per sampled message whose window ended without a
+    further entry to carry its suppressed count, so the count is not lost.
+    """
+    if _get_log_config("LOG_SAMPLE_LIMIT", DEFAULT_SAMPLE_LIMIT) <= 0:
+        return
+
+    window = _get_log_config("LOG_SAMPLE_WINDOW_SECONDS", DEFAULT_SAMPLE_WINDOW_SECONDS)
+    for key, suppressed, (LogModel, client_context, user_details) in log_sampler.expired(window):
+        _, level, info_message, _, _ = key
+        try:
+            _save_log(
+                LogModel,
+                _suppressed_message(info_message, suppressed),
+                level,
+                client_context,
+                user_details,
+                rollup_count=suppressed,
+            )
+        except Exception as e:
+            # One failed summary must not cost the counts still waiting behind it
+            print(f"--- LOGGING FAILED ---: Could not save suppressed-count summary to {LogModel.__name__}: {e}")
 
 
 def _get_client_context():
-    """Internally extracts client IP and OS from the Flask request context."""
+    """
+    Internally extracts client IP and OS from the Flask request context.
+    Computed once per request and cached on flask.g (a request often logs several times).
+    """
+    if not has_request_context():
+        # Scripts and CLIs (e.g. Import_Patients.py) log without a request
+        return {"client_ip": "Local", "client_os": "Server"}
+
+    cached = g.get("_log_client_context")
+    if cached is not None:
+        return cached
 
     # IP Address
     client_ip = request.headers.get("X-Forwarded-For", request.remote_addr)
@@ -19,14 +186,17 @@ def _get_client_context():
     user_agent_str = request.headers.get("User-Agent", "")
     client_os = _parse_os_from_user_agent(user_agent_str)
 
-    return {
+    context = {
         "client_ip": client_ip,
         "client_os": client_os,
     }
+    g._log_client_context = context
+    return context
 
 
+@lru_cache(maxsize=256)
 def _parse_os_from_user_agent(ua_string):
-    """Parse OS from User-Agent string."""
+    """Parse OS from User-Agent string (memoized: clients send a handful of distinct UAs)."""
     if not ua_string:
         return "Unknown"
     
@@ -52,11 +222,56 @@ def _parse_os_from_user_agent(ua_string):
 
 
 def _get_user_details():
-    """Returns a dict with user name and role."""
+    """
+    Returns a dict with user name and role.
+    Cached on flask.g per user id, so a login/logout mid-request still logs the right identity.
+    """
     user = current_user
-    if user and user.is_authenticated:
-        return {"name": user.name, "role": user.role}
-    return {"name": "Anonymous", "role": "System"}
+    if not (user and user.is_authenticated):
+        return {"name": "Anonymous", "role": "System"}
+
+    cache = g.setdefault("_log_user_details", {})
+    user_id = user.get_id()
+    details = cache.get(user_id)
+    if details is None:
+        details = cache[user_id] = {"name": user.name, "role": user.role}
+    return details
+
+
+def _save_log(LogModel, info_message, level, client_context, user_details, rollup_count=1):
+    """Writes one log entry; SecurityLog writes also add `rollup_count` events to the rollups."""
+    now = datetime.now()
+    retention_days = _get_log_config("LOG_RETENTION_DAYS", DEFAULT_RETENTION_DAYS)
+    grace_days = _get_log_config("LOG_ARCHIVE_GRACE_DAYS", 0) if _get_log_config("LOG_ARCHIVE_DIR", None) else 0
+
+    log_entry = LogModel(
+        timestamp=now,
+        info=info_message,
+        log_level=level,
+        client_ip=client_context["client_ip"],
+        client_os=client_context["client_os"],
+        user_name=user_details["name"],
+        user_role=user_details["role"],
+        expire_at=compute_expire_at(now, level, retention_days, grace_days),
+    )
+
+    if _get_log_config("LOG_MONTHLY_COLLECTIONS", False):
+        # Raw insert into the monthly partition (switch_collection is not thread-safe)
+        log_entry.validate()
+        get_partition_collection(LogModel, now).insert_one(log_entry.to_mongo())
+    else:
+        log_entry.save()
+
+    # Keep the security dashboard rollups current (counts sampled-out entries too)
+    if LogModel is SecurityLog:
+        record_security_event(
+            now,
+            level,
+            client_context["client_ip"],
+            user_details["name"],
+            count=rollup_count,
+            flush_seconds=_get_log_config("LOG_ROLLUP_FLUSH_SECONDS", DEFAULT_ROLLUP_FLUSH_SECONDS),
+        )
 
 
 def _log_base(LogModel: Union[ActivityLog, SecurityLog], info_message: str, level: int):
@@ -73,15 +288,14 @@ def _log_base(LogModel: Union[ActivityLog, SecurityLog], info_message: str, leve
         client_context = _get_client_context()
         user_details = _get_user_details()
 
-        log_entry = LogModel(
-            info=info_message,
-            log_level=level,
-            client_ip=client_context["client_ip"],
-            client_os=client_context["client_os"],
-            user_name=user_details["name"],
-            user_role=user_details["role"],
-        )
-        log_entry.save()
+        write, suppressed = _should_write(LogModel, info_message, level, client_context, user_details)
+        _flush_expired_suppressed()
+        if not write:
+            return
+        if suppressed:
+            info_message = _suppressed_message(info_message, suppressed)
+
+        _save_log(LogModel, info_message, level, client_context, user_details, rollup_count=1 + suppressed)
 
     except Exception as e:
         # Log failure safety
@@ -0,0 +1,150 @@
+# app/utils/mongo_metrics.py
+import threading
+import time
+from importlib.util import find_spec
+from flask import has_request_context, request
+from pymongo import monitoring
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# Wire compressors in order of preference, with the package each one needs (zlib is stdlib)
+COMPRESSOR_PACKAGES = {"zstd": "zstandard", "snappy": "snappy", "zlib": None}
+
+# Handshake/session chatter, not issued by application code
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "endSessions", "saslStart", "saslContinue", "buildInfo"}
+
+
+def available_compressors(requested):
+    """The requested compressors (comma separated) whose Python package is installed."""
+    names = [name.strip() for name in (requested or "").split(",") if name.strip()]
+    return [
+        name for name in names
+        if name in COMPRESSOR_PACKAGES
+        and (COMPRESSOR_PACKAGES[name] is None or find_spec(COMPRESSOR_PACKAGES[name]) is not None)
+    ]
+
+
+def mongo_client_options(config):
+    """Keyword arguments for mongoengine.connect() (passed through to MongoClient)."""
+    options = {
+        "maxPoolSize": config["MONGO_MAX_POOL_SIZE"],
+        "minPoolSize": config["MONGO_MIN_POOL_SIZE"],
+        "maxIdleTimeMS": config["MONGO_MAX_IDLE_TIME_MS"],
+        "serverSelectionTimeoutMS": config["MONGO_SERVER_SELECTION_TIMEOUT_MS"],
+        "connectTimeoutMS": config["MONGO_CONNECT_TIMEOUT_MS"],
+        "readPreference": config["MONGO_READ_PREFERENCE"],
+        "appname": "StrokeVision",
+    }
+    compressors = available_compressors(config["MONGO_COMPRESSORS"])
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+    if config.get("MONGO_COMMAND_METRICS", True):
+        options["event_listeners"] = [mongo_metrics]
+    return options
+
+
+class _Histogram:
+    __slots__ = ("buckets", "count", "failures", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.failures = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, elapsed_ms, failed):
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if elapsed_ms <= bound), len(LATENCY_BUCKETS_MS))
+        self.buckets[index] += 1
+        self.count += 1
+        self.failures += failed
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of calls (max for the open bucket)."""
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= target and bucket_count:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return 0.0
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "failures": self.failures,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip([f"<={bound}" for bound in LATENCY_BUCKETS_MS] + ["inf"], self.buckets)),
+        }
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    pymongo command listener: latency histograms per (collection, command) and
+    per Flask endpoint, so the admin metrics endpoint shows which pages hammer
+    Mongo. Kept in process memory, so each worker reports its own traffic.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}  # (connection, request id) -> (collection, command, endpoint)
+        self._commands = {}
+        self._endpoints = {}
+        self._since = time.time()
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        collection = target if isinstance(target, str) else "-"
+        # started() runs on the calling thread, so the request is still visible here
+        endpoint = (request.endpoint or "-") if has_request_context() else "(no request)"
+        with self._lock:
+            self._inflight[(event.connection_id, event.request_id)] = (collection, event.command_name, endpoint)
+
+    def _finish(self, event, failed):
+        with self._lock:
+            key = self._inflight.pop((event.connection_id, event.request_id), None)
+            if key is None:
+                return
+            collection, command, endpoint = key
+            elapsed_ms = event.duration_micros / 1000
+            self._commands.setdefault((collection, command), _Histogram()).add(elapsed_ms, failed)
+            self._endpoints.setdefault(endpoint, _Histogram()).add(elapsed_ms, failed)
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def snapshot(self):
+        """Histograms ordered by total time spent, heaviest first."""
+        with self._lock:
+            commands = [
+                {"collection": collection, "command": command, **histogram.as_dict()}
+                for (collection, command), histogram in self._commands.items()
+            ]
+            endpoints = [{"endpoint": endpoint, **histogram.as_dict()} for endpoint, histogram in self._endpoints.items()]
+            since = self._since
+        commands.sort(key=lambda row: row["total_ms"], reverse=True)
+        endpoints.sort(key=lambda row: row["total_ms"], reverse=True)
+        return {"since": since, "commands": commands, "endpoints": endpoints}
+
+    def reset(self):
+        with self._lock:
+            self._commands.clear()
+            self._endpoints.clear()
+            self._since = time.time()
+
+
+mongo_metrics = MongoCommandMetrics()
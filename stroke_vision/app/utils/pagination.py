@@ -0,0 +1,38 @@
+# app/utils/pagination.py
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+def encode_cursor(sort_value: datetime, object_id) -> str:
+    """Builds an opaque cursor token from the last item's (sort datetime, _id)."""
+    payload = json.dumps({"t": sort_value.isoformat(), "id": str(object_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str):
+    """
+    Parses a cursor token back into (datetime, ObjectId).
+    Raises ValueError if the token is malformed.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return datetime.fromisoformat(payload["t"]), ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+def keyset_filter(field: str, sort_value: datetime, object_id) -> dict:
+    """
+    Mongo filter for "items after the cursor" when sorting by (field desc, _id desc).
+    Backed by a compound (-field, -_id) index.
+    """
+    return {
+        "$or": [
+            {field: {"$lt": sort_value}},
+            {field: sort_value, "_id": {"$lt": object_id}},
+        ]
+    }
@@ -0,0 +1,152 @@
+# app/utils/password_hasher.py
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# bcrypt releases the GIL, so a small pool verifies in parallel; more threads only queue on CPU
+DEFAULT_BCRYPT_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_BCRYPT_MAX_PENDING = 32
+DEFAULT_BCRYPT_QUEUE_TIMEOUT_SECONDS = 2.0
+
+QUEUE_TIME_SAMPLES = 500  # Recent queue waits kept for percentiles
+
+_COST_PATTERN = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the bcrypt pool is saturated; surfaced as 503 by the app error handler."""
+
+    def __init__(self, retry_after=1):
+        super().__init__("Password hashing capacity exceeded, please retry shortly.")
+        self.retry_after = retry_after
+
+
+def hash_cost(password_hash):
+    """Log rounds encoded in a bcrypt hash ($2b$12$... -> 12), or None if unrecognised."""
+    match = _COST_PATTERN.match(password_hash or "")
+    return int(match.group(1)) if match else None
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a bounded thread pool instead of the
+    request thread. At most `max_pending` calls are admitted (running or queued);
+    a call that cannot get a slot within `queue_timeout` seconds raises
+    PasswordHasherBusy, so a login burst sheds load instead of stalling every worker.
+    """
+
+    def __init__(self):
+        self.bcrypt = None
+        self.log_rounds = 12
+        self.workers = DEFAULT_BCRYPT_WORKERS
+        self.max_pending = DEFAULT_BCRYPT_MAX_PENDING
+        self.queue_timeout = DEFAULT_BCRYPT_QUEUE_TIMEOUT_SECONDS
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self._reset_metrics()
+
+    def init_app(self, app, bcrypt):
+        self.bcrypt = bcrypt
+        self.log_rounds = app.config.get("BCRYPT_LOG_ROUNDS", 12)
+        self.workers = max(1, app.config.get("BCRYPT_WORKERS", DEFAULT_BCRYPT_WORKERS))
+        self.max_pending = max(self.workers, app.config.get("BCRYPT_MAX_PENDING", DEFAULT_BCRYPT_MAX_PENDING))
+        self.queue_timeout = app.config.get("BCRYPT_QUEUE_TIMEOUT_SECONDS", DEFAULT_BCRYPT_QUEUE_TIMEOUT_SECONDS)
+        with self._lock:
+            self._slots = threading.BoundedSemaphore(self.max_pending)
+            self._shutdown_executor()
+            self._reset_metrics()
+
+    def _reset_metrics(self):
+        self._completed = 0
+        self._rejected = 0
+        self._in_flight = 0
+        self._queue_waits = deque(maxlen=QUEUE_TIME_SAMPLES)
+        self._run_times = deque(maxlen=QUEUE_TIME_SAMPLES)
+
+    def _shutdown_executor(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._executor = None
+
+    def _get_executor(self):
+        # Created lazily and per process, so forked workers do not share dead threads
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _run(self, func, *args):
+        slots = self._slots
+        if not slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordHasherBusy(retry_after=max(1, round(self.queue_timeout)))
+
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._queue_waits.append(started - submitted)
+                    self._run_times.append(finished - started)
+                    self._completed += 1
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self._get_executor().submit(task).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            slots.release()
+
+    def hash(self, password):
+        """bcrypt hash of `password` at the configured cost (str)."""
+        return self._run(self.bcrypt.generate_password_hash, password, self.log_rounds).decode("utf-8")
+
+    def verify(self, password_hash, password):
+        return self._run(self.bcrypt.check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when a stored hash was made with a different cost than BCRYPT_LOG_ROUNDS."""
+        cost = hash_cost(password_hash)
+        return cost is not None and cost != self.log_rounds
+
+    def stats(self):
+        """Pool usage and queue/run time percentiles (ms) over the recent calls."""
+        with self._lock:
+            waits, runs = sorted(self._queue_waits), sorted(self._run_times)
+            stats = {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "log_rounds": self.log_rounds,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+        for name, samples in (("queue_ms", waits), ("run_ms", runs)):
+            stats[name] = {
+                "p50": _percentile(samples, 0.50) * 1000,
+                "p95": _percentile(samples, 0.95) * 1000,
+                "max": (samples[-1] if samples else 0.0) * 1000,
+            }
+        return stats
+
+
+def _percentile(sorted_samples, fraction):
+    if not sorted_samples:
+        return 0.0
+    return sorted_samples[min(len(sorted_samples) - 1, int(fraction * len(sorted_samples)))]
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,60 @@
+# app/utils/patient_cache.py
+import threading
+import time
+from mongoengine import signals
+from app.models.patient import Patient
+
+# Safety net for writes this process never sees (other workers, scripts)
+COUNT_CACHE_TTL_SECONDS = 60
+
+
+class PatientCountCache:
+    """
+    Per-process cache of Patient.objects.count().
+    Invalidated by patient create/delete signals and refreshed lazily on the next read.
+    """
+
+    def __init__(self, ttl=COUNT_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._value = None
+        self._expires_at = 0.0
+        self._generation = 0  # Bumped on every invalidation
+
+    def get(self):
+        """Returns the cached total, recounting if it was invalidated or expired."""
+        with self._lock:
+            if self._value is not None and time.monotonic() < self._expires_at:
+                return self._value
+            generation = self._generation
+
+        value = Patient.objects.count()
+
+        with self._lock:
+            # Do not cache a count that raced with a write
+            if generation == self._generation:
+                self._value = value
+                self._expires_at = time.monotonic() + self.ttl
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._value = None
+            self._generation += 1
+
+
+patient_count_cache = PatientCountCache()
+
+
+def _on_patient_saved(sender, document, created=False, **kwargs):
+    # Updates do not change the total
+    if created:
+        patient_count_cache.invalidate()
+
+
+def _on_patient_deleted(sender, document, **kwargs):
+    patient_count_cache.invalidate()
+
+
+signals.post_save.connect(_on_patient_saved, sender=Patient)
+signals.post_delete.connect(_on_patient_deleted, sender=Patient)
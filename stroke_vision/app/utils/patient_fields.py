@@ -0,0 +1,43 @@
+# app/utils/patient_fields.py
+# Maps raw form values (as validated by InputSanitizer) to the values stored on Patient.
+
+def map_binary_to_yes_no(value):
+    return "Yes" if value == "1" else "No"
+
+def map_smoking_status(status):
+    mapping = {
+        "formerly smoked": "Formerly Smoked",
+        "never smoked": "Never Smoked",
+        "smokes": "Smokes",
+        "Unknown": "Unknown",
+    }
+    return mapping.get(status, status)
+
+def map_work_type(work):
+    mapping = {
+        "Private": "Private",
+        "Self-employed": "Self-Employed",
+        "Govt_job": "Govt Job",
+        "children": "Children",
+        "Never_worked": "Never Worked",
+    }
+    return mapping.get(work, work)
+
+def map_residence_type(residence):
+    return "Urban" if residence == "Urban" else "Rural"
+
+def map_gender(gender):
+    return "Other" if gender == "Other" else gender
+
+def get_risk_level(risk_percentage):
+    if risk_percentage < 20: return "Low"
+    elif risk_percentage < 40: return "Moderate"
+    elif risk_percentage < 60: return "High"
+    elif risk_percentage < 80: return "Very High"
+    else: return "Critical"
+
+def get_risk_class(risk_level):
+    if risk_level in ["Critical", "Very High"]: return "risk-critical"
+    elif risk_level == "High": return "risk-high"
+    elif risk_level == "Moderate": return "risk-moderate"
+    else: return "risk-low"
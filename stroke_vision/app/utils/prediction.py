@@ -31,6 +31,10 @@ class StrokePredictor:
 
     def _preprocess_data(self, data):
         """Preprocess patient data for prediction"""
+        return self._preprocess_batch([data])
+
+    def _preprocess_batch(self, rows):
+        """Preprocess many patient records into one model input frame"""
         try:
             df = pd.DataFrame([{
                 'gender': data['gender'],
@@ -43,7 +47,7 @@ class StrokePredictor:
                 'bmi': float(data['bmi']),
                 'work_type': data['work_type'],
                 'smoking_status': data['smoking_status']
-            }])
+            } for data in rows])
             
             df.loc[df['gender'] == 'Other', 'gender'] = 'Female'
             
@@ -112,6 +116,24 @@ class StrokePredictor:
         except ValueError as e:
             raise ValueError(f"Invalid numeric value: {str(e)}")
 
+    @staticmethod
+    def _round_risk(prediction):
+        """Converts a model output (0-1) to the stored risk percentage"""
+        risk_percentage = prediction * 100
+        
+        if risk_percentage > 90:
+            return 90.0
+        elif risk_percentage < 0.01:
+            return round(risk_percentage, 4)
+        elif risk_percentage < 0.1:
+            return round(risk_percentage, 3)
+        elif risk_percentage < 1:
+            return round(risk_percentage, 2)
+        elif risk_percentage < 10:
+            return round(risk_percentage, 1)
+        else:
+            return round(risk_percentage, 1)
+
     def predict_risk(self, patient_data):
         """Predict stroke risk for a patient"""
         try:
@@ -121,21 +143,26 @@ class StrokePredictor:
             
             prediction = self.model.predict(processed_data)[0][0]
             
-            risk_percentage = prediction * 100
-            
-            if risk_percentage > 90:
-                return 90.0
-            elif risk_percentage < 0.01:
-                return round(risk_percentage, 4)
-            elif risk_percentage < 0.1:
-                return round(risk_percentage, 3)
-            elif risk_percentage < 1:
-                return round(risk_percentage, 2)
-            elif risk_percentage < 10:
-                return round(risk_percentage, 1)
-            else:
-                return round(risk_percentage, 1)
+            return self._round_risk(prediction)
             
         except Exception as e:
             print(f"Prediction error details: {str(e)}")
-            raise ValueError(f"Prediction error: {str(e)}")
\ No newline at end of file
+            raise ValueError(f"Prediction error: {str(e)}")
+
+    def predict_risks(self, rows, batch_size=1024):
+        """
+        Predict stroke risk for many patients in one model call.
+        Rows must already pass validate_input(); returns risks in the same order.
+        """
+        if not rows:
+            return []
+        try:
+            processed_data = self._preprocess_batch(rows)
+            
+            predictions = self.model.predict(processed_data, batch_size=batch_size, verbose=0)
+            
+            return [float(self._round_risk(prediction[0])) for prediction in predictions]
+            
+        except Exception as e:
+            print(f"Batch prediction error details: {str(e)}")
+            raise ValueError(f"Prediction error: {str(e)}")
@@ -0,0 +1,300 @@
+# app/utils/shared_state.py
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+from limits import RateLimitItemPerSecond
+from limits.storage import MovingWindowSupport, SlidingWindowCounterSupport, Storage, storage_from_string
+from limits.storage.base import TimestampedSlidingWindow
+from limits.strategies import MovingWindowRateLimiter
+
+# Shared state backends (SHARED_STATE_URI / RATELIMIT_STORAGE_URI):
+#   memory://                   per process (single worker, development)
+#   sqlite:///shared_state.db   one WAL-mode file shared by every worker on the host
+#   redis://localhost:6379/0    any Redis-protocol server (needs the `redis` package)
+DEFAULT_SHARED_STATE_URI = "memory://"
+
+SQLITE_BUSY_TIMEOUT_SECONDS = 5.0
+# Seconds between sweeps of expired rows (sliding windows use a new key per window)
+SQLITE_SWEEP_INTERVAL_SECONDS = 60.0
+
+
+def sqlite_path_from_uri(uri):
+    """sqlite:///relative.db or sqlite:////absolute/path.db (SQLAlchemy convention) -> file path."""
+    path = urlparse(uri).path
+    return path[1:] if path.startswith("/") else path
+
+
+class SQLiteStorage(Storage, MovingWindowSupport, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """
+    `limits` storage on a local SQLite file in WAL mode, so every worker process
+    on one host shares the same counters without running a server.
+    Registered for sqlite:// URIs (Flask-Limiter and FailedLoginTracker).
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(
+        self,
+        uri,
+        wrap_exceptions=False,
+        busy_timeout=SQLITE_BUSY_TIMEOUT_SECONDS,
+        sweep_interval=SQLITE_SWEEP_INTERVAL_SECONDS,
+        **options,
+    ):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.path = sqlite_path_from_uri(uri)
+        self.busy_timeout = float(busy_timeout)
+        self.sweep_interval = float(sweep_interval)
+        self._local = threading.local()
+        self._sweep_lock = threading.Lock()
+        self._next_sweep = 0.0
+        self._max_expiry = 0.0  # Longest moving window seen by this process
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters (key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS window_entries (key TEXT NOT NULL, ts REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_window_entries_key_ts ON window_entries (key, ts)")
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; writes use explicit BEGIN IMMEDIATE transactions
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    class _Transaction:
+        def __init__(self, conn):
+            self.conn = conn
+
+        def __enter__(self):
+            self.conn.execute("BEGIN IMMEDIATE")
+            return self.conn
+
+        def __exit__(self, exc_type, exc, tb):
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+            return False
+
+    def _transaction(self):
+        return self._Transaction(self._connection())
+
+    # ----- fixed window -----
+    def incr(self, key, expiry, amount=1):
+        now = time.time()
+        self._maybe_sweep(now)
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM counters WHERE key = ? AND expires_at <= ?", (key, now))
+            conn.execute(
+                "INSERT INTO counters (key, value, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value",
+                (key, amount, now + expiry),
+            )
+            return conn.execute("SELECT value FROM counters WHERE key = ?", (key,)).fetchone()[0]
+
+    def get(self, key):
+        row = self._connection().execute(
+            "SELECT value FROM counters WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        row = self._connection().execute(
+            "SELECT expires_at FROM counters WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else time.time()
+
+    def clear(self, key):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM counters WHERE key = ?", (key,))
+            conn.execute("DELETE FROM window_entries WHERE key = ?", (key,))
+
+    def reset(self):
+        with self._transaction() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM counters").fetchone()[0]
+            conn.execute("DELETE FROM counters")
+            conn.execute("DELETE FROM window_entries")
+        return count
+
+    def _maybe_sweep(self, now):
+        """Opportunistically deletes expired rows of every key, at most once per sweep_interval."""
+        with self._sweep_lock:
+            if now < self._next_sweep:
+                return
+            self._next_sweep = now + self.sweep_interval
+        self.sweep(now)
+
+    def sweep(self, now=None):
+        """
+        Deletes expired counters and moving-window entries older than the longest
+        window this process has used (workers share one config, so one length).
+        """
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            removed = conn.execute("DELETE FROM counters WHERE expires_at <= ?", (now,)).rowcount
+            if self._max_expiry:
+                removed += conn.execute(
+                    "DELETE FROM window_entries WHERE ts <= ?", (now - self._max_expiry,)
+                ).rowcount
+        return removed
+
+    def check(self):
+        try:
+            self._connection().execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    # ----- moving window (exact sliding log) -----
+    def acquire_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+        self._max_expiry = max(self._max_expiry, expiry)
+        self._maybe_sweep(now)
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM window_entries WHERE key = ? AND ts <= ?", (key, now - expiry))
+            count = conn.execute("SELECT COUNT(*) FROM window_entries WHERE key = ?", (key,)).fetchone()[0]
+            if count + amount > limit:
+                return False
+            conn.executemany("INSERT INTO window_entries (key, ts) VALUES (?, ?)", [(key, now)] * amount)
+            return True
+
+    def get_moving_window(self, key, limit, expiry):
+        now = time.time()
+        oldest, count = self._connection().execute(
+            "SELECT MIN(ts), COUNT(*) FROM window_entries WHERE key = ? AND ts > ?", (key, now - expiry)
+        ).fetchone()
+        return (oldest if count else now), count
+
+    # ----- sliding window counter (two weighted fixed windows) -----
+    def _sliding_window_info(self, key, expiry, now):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count = self.get(previous_key)
+        current_count = self.get(current_key)
+        previous_ttl = 0.0 if previous_count == 0 else (1 - (((now - expiry) / expiry) % 1)) * expiry
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def acquire_sliding_window_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count, previous_ttl, current_count, _ = self._sliding_window_info(key, expiry, now)
+        if previous_count * previous_ttl / expiry + current_count + amount > limit:
+            return False
+
+        current_count = self.incr(current_key, 2 * expiry, amount=amount)
+        if previous_count * previous_ttl / expiry + current_count > limit:
+            # Another worker won the race for the last slot
+            self.incr(current_key, 2 * expiry, amount=-amount)
+            return False
+        return True
+
+    def get_sliding_window(self, key, expiry):
+        return self._sliding_window_info(key, expiry, time.time())
+
+    def clear_sliding_window(self, key, expiry):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self.clear(previous_key)
+        self.clear(current_key)
+
+
+class FailedLoginTracker:
+    """
+    Counts failed logins per user in a sliding window on the shared state backend,
+    so every worker sees the same count. The users table is no longer written on
+    every failure: counters are queued and flushed in batches, while reaching the
+    lockout threshold is persisted at once by the caller (User.lock()).
+    """
+
+    def __init__(self):
+        self.storage = None
+        self.limiter = None
+        self.window_seconds = 900
+        self.flush_batch_size = 20
+        self.flush_interval = 30.0
+        self._lock = threading.Lock()
+        self._pending = {}  # user id -> (failed attempts, last failure)
+        self._last_flush = time.monotonic()
+
+    def init_app(self, app):
+        uri = app.config.get("SHARED_STATE_URI") or DEFAULT_SHARED_STATE_URI
+        self.storage = storage_from_string(uri, **app.config.get("SHARED_STATE_OPTIONS", {}))
+        self.limiter = MovingWindowRateLimiter(self.storage)
+        self.window_seconds = app.config.get("ACCOUNT_LOCKOUT_WINDOW_SECONDS", 900)
+        self.flush_batch_size = app.config.get("LOCKOUT_FLUSH_BATCH_SIZE", 20)
+        self.flush_interval = app.config.get("LOCKOUT_FLUSH_INTERVAL_SECONDS", 30.0)
+
+    def _item(self, max_attempts):
+        # One slot per attempt we still tolerate, over the lockout window
+        return RateLimitItemPerSecond(max_attempts, self.window_seconds)
+
+    def current_count(self, user_id, max_attempts):
+        """Failures of a user in the current window, as every worker sees them."""
+        item = self._item(max_attempts)
+        return max_attempts - self.limiter.get_window_stats(item, "failed_login", str(user_id)).remaining
+
+    def record_failure(self, user, max_attempts):
+        """Adds one failure for `user` and returns the failures in the current window."""
+        self.limiter.hit(self._item(max_attempts), "failed_login", str(user.id))
+        count = self.current_count(user.id, max_attempts)
+
+        with self._lock:
+            self._pending[user.id] = (max_attempts, datetime.utcnow())
+        return count
+
+    def reset(self, user, max_attempts):
+        """Forgets the failures of `user` (successful login, lock or unlock)."""
+        self.limiter.clear(self._item(max_attempts), "failed_login", str(user.id))
+        with self._lock:
+            self._pending.pop(user.id, None)
+
+    def flush_due(self):
+        with self._lock:
+            return bool(self._pending) and (
+                len(self._pending) >= self.flush_batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+
+    def flush(self, session, user_model):
+        """
+        Writes the queued failure counters to the users table in one transaction.
+        Counts are re-read from the shared limiter, so a reset done by another
+        worker (successful login, unlock) is never overwritten by an older count:
+        users whose window was cleared are skipped.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+
+        written = 0
+        for user_id, (max_attempts, last_failed) in pending.items():
+            count = self.current_count(user_id, max_attempts)
+            if count <= 0:
+                continue
+            session.query(user_model).filter(user_model.id == user_id).update(
+                {"failed_login_attempts": count, "last_failed_login": last_failed},
+                synchronize_session=False,
+            )
+            written += 1
+        session.commit()
+        return written
+
+
+failed_login_tracker = FailedLoginTracker()
@@ -0,0 +1,82 @@
+# app/utils/sql_engine.py
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+_WRITES_KEY = "has_flushed_writes"
+
+
+def is_file_sqlite(uri):
+    """True for an on-disk SQLite database (in-memory ones keep Flask-SQLAlchemy's StaticPool)."""
+    if not uri:
+        return False
+    url = make_url(uri)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def sqlite_engine_options(config):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for the user store. A file database gets a sized
+    QueuePool shared by the worker's threads; sqlite3's own busy timeout makes a
+    writer wait for the lock instead of failing with "database is locked".
+    """
+    uri = config.get("SQLALCHEMY_DATABASE_URI")
+    if not is_file_sqlite(uri):
+        return {}
+    return {
+        "pool_size": config["SQLITE_POOL_SIZE"],
+        "max_overflow": config["SQLITE_POOL_MAX_OVERFLOW"],
+        "pool_timeout": config["SQLITE_POOL_TIMEOUT_SECONDS"],
+        "pool_pre_ping": False,  # Local file, a connection never goes stale
+        "connect_args": {
+            "timeout": config["SQLITE_BUSY_TIMEOUT_MS"] / 1000,
+            "check_same_thread": False,  # Pooled connections move between request threads
+        },
+    }
+
+
+def init_sqlite_engine(app, db):
+    """Applies the SQLite PRAGMAs to every new connection of the app's engine."""
+    if not is_file_sqlite(app.config.get("SQLALCHEMY_DATABASE_URI")):
+        return
+
+    pragmas = (
+        # Readers no longer block the writer (and vice versa); persists in the file
+        "PRAGMA journal_mode=WAL",
+        # Safe with WAL: a power loss can drop the last commits but never corrupts
+        f"PRAGMA synchronous={app.config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA busy_timeout={int(app.config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        "PRAGMA temp_store=MEMORY",
+    )
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def has_pending_writes(session):
+    """True when committing `session` would write anything (unflushed or already flushed changes)."""
+    return bool(session.new or session.dirty or session.deleted or session.info.get(_WRITES_KEY))
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flushed_writes(session, flush_context):
+    session.info[_WRITES_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_writes(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        orm_execute_state.session.info[_WRITES_KEY] = True
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _clear_writes(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_WRITES_KEY, None)
@@ -0,0 +1,92 @@
+# app/utils/user_cache.py
+import threading
+import time
+from flask import has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app import db
+from app.models.user import User
+
+# Short, so changes made by other workers (lock, role) are picked up quickly
+USER_CACHE_TTL_SECONDS = 30
+
+_PENDING_KEY = "user_cache_invalidate"
+
+
+class UserCache:
+    """
+    Per-process cache of the user loaded by Flask-Login on every request.
+    Keeps the decrypted column values, so a hit costs neither a SQLite query
+    nor Fernet decryption. Entries expire after a short TTL and are dropped
+    explicitly when a user is changed (user_manager, lockout).
+    """
+
+    def __init__(self, ttl=USER_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}  # user id -> (expires_at, column values)
+        self._generation = 0  # Bumped on every invalidation
+
+    def init_app(self, app):
+        self.ttl = app.config.get("USER_CACHE_TTL_SECONDS", USER_CACHE_TTL_SECONDS)
+        self.clear()  # A new app may point at a different database
+
+    def load(self, user_id):
+        """Returns the user bound to the current session, from the cache when possible."""
+        user_id = int(user_id)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            generation = self._generation
+        if entry and time.monotonic() < entry[0]:
+            return self._attach(entry[1])
+
+        user = db.session.get(User, user_id)
+        if user is None or self.ttl <= 0:
+            return user
+
+        values = {column.key: getattr(user, column.key) for column in User.__table__.columns}
+        with self._lock:
+            # Do not cache a row that raced with an invalidation
+            if generation == self._generation:
+                self._entries[user_id] = (time.monotonic() + self.ttl, values)
+        return user
+
+    @staticmethod
+    def _attach(values):
+        # Rebuild a detached instance and merge it without a SELECT
+        user = User(**values)
+        make_transient_to_detached(user)
+        return db.session.merge(user, load=False)
+
+    def invalidate(self, user_id):
+        """
+        Drops a user now and again once the current transaction commits, so a
+        request running in between cannot cache the old row.
+        """
+        self._drop(int(user_id))
+        if has_app_context():
+            db.session.info.setdefault(_PENDING_KEY, set()).add(int(user_id))
+
+    def _drop(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._generation += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+
+user_cache = UserCache()
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_after_commit(session):
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        user_cache._drop(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_pending(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,118 @@
+# app/utils/user_stats.py
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import event, extract, func
+from app import db
+from app.models.user import ROLES, User
+
+USER_STATS_CACHE_TTL_SECONDS = 30
+GROWTH_MONTHS = 6
+
+
+def month_starts(now, count=GROWTH_MONTHS):
+    """First day of the last `count` calendar months, oldest first (current month last)."""
+    year, month = now.year, now.month
+    starts = []
+    for _ in range(count):
+        starts.append(datetime(year, month, 1))
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return starts[::-1]
+
+
+def compute_user_stats(now=None):
+    """
+    Admin dashboard numbers from two GROUP BY queries (no User is loaded or decrypted):
+    counts per (role blind index, lock flag) and sign-ups per calendar month.
+    """
+    role_by_hash = {User.hash_role(role): role for role in ROLES}
+    roles = dict.fromkeys(ROLES, 0)
+    total = locked = 0
+
+    rows = (
+        db.session.query(User.role_hash, User.is_locked, func.count(User.id))
+        .group_by(User.role_hash, User.is_locked)
+        .all()
+    )
+    for role_hash, is_locked, count in rows:
+        total += count
+        if is_locked:
+            locked += count
+        role = role_by_hash.get(role_hash)
+        if role:
+            roles[role] += count
+
+    starts = month_starts(now or datetime.utcnow())  # created_at is stored in UTC
+    year = extract("year", User.created_at)
+    month = extract("month", User.created_at)
+    monthly = dict.fromkeys(((start.year, start.month) for start in starts), 0)
+    for row_year, row_month, count in (
+        db.session.query(year, month, func.count(User.id))
+        .filter(User.created_at >= starts[0])
+        .group_by(year, month)
+        .all()
+    ):
+        key = (int(row_year), int(row_month))
+        if key in monthly:
+            monthly[key] += count
+
+    return {
+        "kpis": {
+            "total": total,
+            "locked": locked,
+            "admins": roles["Admin"],
+            "doctors": roles["Doctor"],
+            "nurses": roles["Nurse"],
+        },
+        "charts": {
+            "roles": [roles[role] for role in ROLES],
+            "growth": {
+                "labels": [start.strftime("%b %Y") for start in starts],
+                "data": list(monthly.values()),
+            },
+        },
+    }
+
+
+class UserStatsCache:
+    """
+    Per-process, short-TTL cache of compute_user_stats().
+    Dropped on User inserts/updates/deletes made by this process.
+    """
+
+    def __init__(self, ttl=USER_STATS_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._value = None
+        self._expires_at = 0.0
+        self._generation = 0
+
+    def get(self):
+        with self._lock:
+            if self._value is not None and time.monotonic() < self._expires_at:
+                return self._value
+            generation = self._generation
+
+        value = compute_user_stats()
+
+        with self._lock:
+            if generation == self._generation:
+                self._value = value
+                self._expires_at = time.monotonic() + self.ttl
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._value = None
+            self._generation += 1
+
+
+user_stats_cache = UserStatsCache()
+
+
+def _on_user_changed(mapper, connection, target):
+    user_stats_cache.invalidate()
+
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(User, _event_name, _on_user_changed)
@@ -1,8 +1,13 @@
-from flask import Blueprint, jsonify, render_template
+import time
+from flask import Blueprint, current_app, jsonify, request
+from mongoengine.connection import get_db
 from flask_login import login_required, current_user
-from app.models.user import User
 from app.utils.log_utils import log_activity, log_security
-from datetime import datetime, timedelta
+from app.utils.log_rollup import get_security_stats
+from app.utils.http_cache import render_fragment
+from app.utils.user_stats import user_stats_cache
+from app.utils.mongo_metrics import available_compressors, mongo_metrics
+from app.utils.password_hasher import password_hasher
 
 # Security
 from app.security.auth_shield import AuthShield
@@ -10,73 +15,83 @@ from app.security.auth_shield import AuthShield
 admin_dashboard_bp = Blueprint("admin_dashboard", __name__)
 
 
-def _process_monthly_growth(users):
-    """
-    Groups users by Creation Date (Month/Year) for growth chart.
-    Returns: {labels: ["Jan 2024", ...], data: [5, 12, ...]}
-    """
-    # Initialize last 6 months buckets
-    today = datetime.now()
-    buckets = {}
-    labels = []
-    
-    # Generate labels for last 6 months
-    for i in range(5, -1, -1):
-        d = today - timedelta(days=i*30)
-        key = d.strftime("%b %Y")
-        buckets[key] = 0
-        labels.append(key)
-        
-    for u in users:
-        if u.created_at:
-            key = u.created_at.strftime("%b %Y")
-            if key in buckets:
-                buckets[key] += 1
-                
-    return {"labels": labels, "data": [buckets[l] for l in labels]}
-
-
 @admin_dashboard_bp.route("/admin/dashboard/view", methods=["GET"])
 @login_required
 @AuthShield.require_role(["Admin"])
 def view_dashboard_partial():
     """Renders the HTML partial for the admin dashboard (Admin Only)."""
-    return render_template("partials/admin_dashboard.html")
+    return render_fragment("partials/admin_dashboard.html")
 
 
 @admin_dashboard_bp.route("/admin/dashboard/api/stats", methods=["GET"])
 @login_required
 @AuthShield.require_role(["Admin"])
 def get_admin_stats():
-    """Returns analytics data for the admin dashboard (Admin Only)."""
+    """
+    Returns analytics data for the admin dashboard (Admin Only).
+    Served from SQL GROUP BY aggregates behind a short-TTL cache (app/utils/user_stats.py).
+    """
     try:
-        users = User.query.all()
-        
-        # 1. KPIs
-        total_users = len(users)
-        locked_accounts = sum(1 for u in users if u.is_locked)
-        admins = sum(1 for u in users if u.role == "Admin")
-        doctors = sum(1 for u in users if u.role == "Doctor")
-        nurses = sum(1 for u in users if u.role == "Nurse")
-        
-        # 2. Charts
-        role_data = [admins, doctors, nurses]
-        growth_data = _process_monthly_growth(users)
-        return jsonify({
-            "success": True,
-            "kpis": {
-                "total": total_users,
-                "locked": locked_accounts,
-                "admins": admins,
-                "doctors": doctors,
-                "nurses": nurses
-            },
-            "charts": {
-                "roles": role_data,
-                "growth": growth_data
-            }
-        })
-        
+        return jsonify({"success": True, **user_stats_cache.get()})
+
     except Exception as e:
         log_security(f"Error generating admin stats: {e}", level=4)
         return jsonify({"success": False, "message": "Server error"}), 500
+
+
+@admin_dashboard_bp.route("/admin/dashboard/api/security-stats", methods=["GET"])
+@login_required
+@AuthShield.require_role(["Admin"])
+def get_security_log_stats():
+    """Returns security event counts by level, IP and user from the pre-aggregated rollups (Admin Only)."""
+    window = request.args.get("window", "24h")
+
+    try:
+        stats = get_security_stats(window)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception as e:
+        log_security(f"Error generating security stats: {e}", level=4)
+        return jsonify({"success": False, "message": "Server error"}), 500
+
+    return jsonify({"success": True, **stats})
+
+
+@admin_dashboard_bp.route("/admin/dashboard/api/mongo-metrics", methods=["GET"])
+@login_required
+@AuthShield.require_role(["Admin"])
+def get_mongo_metrics():
+    """
+    Returns MongoDB health (ping round trip), the client pool settings and this
+    worker's command latency histograms by collection/command and by endpoint (Admin Only).
+    """
+    config = current_app.config
+    health = {"status": "up"}
+    try:
+        start = time.perf_counter()
+        get_db().client.admin.command("ping")
+        health["ping_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    except Exception as e:
+        log_security(f"MongoDB health check failed: {e}", level=3)
+        health = {"status": "down", "ping_ms": None}
+
+    pool = {
+        "max_pool_size": config["MONGO_MAX_POOL_SIZE"],
+        "min_pool_size": config["MONGO_MIN_POOL_SIZE"],
+        "server_selection_timeout_ms": config["MONGO_SERVER_SELECTION_TIMEOUT_MS"],
+        "read_preference": config["MONGO_READ_PREFERENCE"],
+        "compressors": available_compressors(config["MONGO_COMPRESSORS"]),
+        "command_metrics": config["MONGO_COMMAND_METRICS"],
+    }
+    return jsonify({"success": True, "health": health, "pool": pool, **mongo_metrics.snapshot()})
+
+
+@admin_dashboard_bp.route("/admin/dashboard/api/password-hasher-metrics", methods=["GET"])
+@login_required
+@AuthShield.require_role(["Admin"])
+def get_password_hasher_metrics():
+    """
+    Returns this worker's bcrypt pool usage: pool size, calls in flight, completed
+    and rejected (503) calls, and queue/run time percentiles in ms (Admin Only).
+    """
+    return jsonify({"success": True, **password_hasher.stats()})
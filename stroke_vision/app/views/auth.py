@@ -29,6 +29,8 @@ from sqlalchemy.exc import IntegrityError
 from app import db
 from app.models.user import User
 from app import db, limiter
+from app.utils.shared_state import failed_login_tracker
+from app.utils.user_cache import user_cache
 from app.utils.log_utils import log_security
 import logging
 import os
@@ -177,7 +179,8 @@ def register():
                     log_security(f"Unauthorized Admin registration attempt for email '{email}'.", 4)
                     return redirect(url_for("auth.register"))
             else:
-                existing_admin = User.query.filter_by(role="Admin").first()
+                # role is encrypted (non-deterministic), so match on its blind index
+                existing_admin = User.query.filter_by(role_hash=User.hash_role("Admin")).first()
                 if existing_admin:
                     flash("Admin account already exists.", MSG["ERROR"])
                     log_security(f"Attempt to create second Admin by email '{email}'.", 4)
@@ -255,6 +258,7 @@ def login():
             # Auto-unlock check
             if user.locked_for_seconds >= lock_period:
                 user.unlock()
+                user_cache.invalidate(user.id)
                 logger.info("Auto-unlocked user %s after lockout period", user.email)
             else:
                 # Still locked
@@ -266,8 +270,15 @@ def login():
 
         # 2. Check credentials
         if user and user.check_password(form.password.data):
-            # Success
-            user.reset_failed_attempts()
+            # Success (only touch the row if older failures were persisted)
+            failed_login_tracker.reset(user, max_attempts)
+            if user.failed_login_attempts or user.last_failed_login:
+                user.reset_failed_attempts()
+            # BCRYPT_LOG_ROUNDS changed since this hash was made: upgrade it while we have the password
+            if user.password_needs_rehash():
+                user.set_password(form.password.data)
+                user_cache.invalidate(user.id)
+                db.session.commit()
             login_user(user, remember=form.remember.data)
             log_security(f"Login successful for user '{user.email}'.", 3)
             # flash("Login successful.", MSG["SUCCESS"])
@@ -280,9 +291,13 @@ def login():
         # 3. Failure (Invalid password or User not found)
         # Avoid user enumeration: show same message for both cases
         if user:
-            user.increment_failed_attempts()
-            if user.failed_login_attempts >= max_attempts:
+            # Counted on the shared backend; the users table is updated in batches
+            attempts = failed_login_tracker.record_failure(user, max_attempts)
+            if attempts >= max_attempts:
+                failed_login_tracker.reset(user, max_attempts)
+                user.failed_login_attempts = attempts
                 user.lock()
+                user_cache.invalidate(user.id)
                 flash(
                     "Account locked due to failed attempts.",
                     MSG["ERROR"],
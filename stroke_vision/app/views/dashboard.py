@@ -1,8 +1,25 @@
 # app/views/dashboard.py
-from flask import Blueprint, abort, render_template, jsonify
+from datetime import datetime, timedelta
+from flask import Blueprint, abort, current_app, jsonify, request
 from flask_login import login_required, current_user
 from app.models.patient import Patient
 from app.utils.log_utils import log_activity, log_security
+from app.utils.http_cache import render_fragment
+from app.utils.dashboard_stats import (
+    DEFAULT_SAMPLE_POINTS,
+    DEFAULT_SCATTER_MODE,
+    MAX_SAMPLE_POINTS,
+    MAX_WINDOW_DAYS,
+    MIN_WINDOW_DATE,
+    RISK_LEVELS,
+    SCATTER_MODES,
+    filtered_scatter,
+    get_scatter,
+    get_stats,
+    patient_filter,
+    trend_series,
+    window_stats,
+)
 from app.security.auth_shield import AuthShield
 
 dashboard_bp = Blueprint("dashboard", __name__)
@@ -14,59 +31,86 @@ def view_dashboard():
     """Renders the dashboard HTML fragment."""
     if current_user.role not in ["Admin", "Doctor", "Nurse"]:
         abort(403)
-    return render_template("toolbar/dashboard.html")
+    return render_fragment("toolbar/dashboard.html")
+
+
+def _scatter_options():
+    """Reads ?scatter=grid|hex|sample and ?max_points=. Raises ValueError on unknown modes."""
+    mode = request.args.get("scatter", DEFAULT_SCATTER_MODE).lower()
+    if mode not in SCATTER_MODES:
+        raise ValueError(f"Unsupported scatter mode '{mode}'. Use one of: {', '.join(SCATTER_MODES)}.")
+    max_points = request.args.get("max_points", DEFAULT_SAMPLE_POINTS, type=int)
+    return mode, max(1, min(max_points, MAX_SAMPLE_POINTS))
+
+
+def _window_filters():
+    """
+    Reads ?since=YYYY-MM-DD, ?until=YYYY-MM-DD (inclusive) and ?created_by=. Raises ValueError on
+    bad dates, dates outside MIN_WINDOW_DATE..tomorrow or windows longer than MAX_WINDOW_DAYS.
+    """
+    dates = {}
+    for name in ("since", "until"):
+        value = request.args.get(name)
+        try:
+            dates[name] = datetime.strptime(value, "%Y-%m-%d") if value else None
+        except ValueError:
+            raise ValueError(f"Invalid '{name}' date '{value}'. Use YYYY-MM-DD.")
+    latest = datetime.now() + timedelta(days=1)
+    for name, value in dates.items():
+        if value and not MIN_WINDOW_DATE <= value <= latest:
+            raise ValueError(f"'{name}' must be between {MIN_WINDOW_DATE:%Y-%m-%d} and {latest:%Y-%m-%d}.")
+    if dates["since"] and dates["until"] and dates["since"] > dates["until"]:
+        raise ValueError("'since' must not be after 'until'.")
+    if dates["since"] and ((dates["until"] or datetime.now()) - dates["since"]).days >= MAX_WINDOW_DAYS:
+        raise ValueError(f"The date window must not span more than {MAX_WINDOW_DAYS} days.")
+    created_by = (request.args.get("created_by") or "").strip() or None
+    return dates["since"], dates["until"], created_by
 
 
 @dashboard_bp.route("/dashboard/api/stats", methods=["GET"])
 @login_required
 def get_dashboard_stats():
     """
-    Aggregates patient data for the dashboard charts and KPIs.
-    Optimized for MongoDB/MongoEngine.
+    Serves the dashboard charts and KPIs from the pre-aggregated stats document
+    (see app/utils/dashboard_stats.py) plus an indexed top-5 query.
+    The scatter is reduced server-side: ?scatter=grid (default) or hex binning,
+    or ?scatter=sample&max_points=N for a repeatable sample of individual patients.
+    ?since=/?until= (entry dates) and ?created_by= narrow everything to a cohort;
+    filtered KPIs, scatter cells and the trend series are summed from the daily rollups.
     """
     try:
         if current_user.role not in ["Admin", "Doctor", "Nurse"]:
             return jsonify({"success": False, "message": "Access denied."}), 403
 
-        # 1. Fetch patients
-        # We fetch all because we need them for scatter plot and stats on encrypted fields
-        patients = list(Patient.objects())
-        total_patients = len(patients)
-
-        high_risk_count = 0
-        smokers_count = 0
-        total_glucose = 0
-        work_counts = {}
-        scatter_data = []
-
-        for p in patients:
-            # 2. KPI & Stat Calculations (Python-side due to encryption)
-            if p.stroke_risk > 20:
-                high_risk_count += 1
-            
-            if p.smoking_status in ["Smokes", "Formerly Smoked"]:
-                smokers_count += 1
-            
-            total_glucose += p.avg_glucose_level
-
-            # Work Type Distribution
-            w_type = p.work_type
-            work_counts[w_type] = work_counts.get(w_type, 0) + 1
-
-            # Scatter Plot Data
-            scatter_data.append({
-                "x": p.bmi,
-                "y": p.avg_glucose_level,
-                "r": round(p.stroke_risk / 8, 2),
-                "risk": round(p.stroke_risk, 2),
-            })
-
-        # Calculate Average Glucose
-        avg_glucose = round(total_glucose / total_patients, 2) if total_patients > 0 else 0
+        try:
+            scatter_mode, max_points = _scatter_options()
+            since, until, created_by = _window_filters()
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        filtered = bool(since or until or created_by)
+
+        # 1. Aggregates come from the materialized stats document (no patient scan),
+        #    or from summing daily rollups when a window/creator filter is set
+        # A missing or outdated stats document is rebuilt off the request (empty until done)
+        stats = get_stats(background=current_app.config.get("STATS_RECONCILE_IN_BACKGROUND", True))
+        global_stats = stats
+        if filtered:
+            stats = window_stats(since, until, created_by)
+        total_patients = stats.get("total", 0)
+        avg_glucose = round(stats.get("glucose_sum", 0) / total_patients, 2) if total_patients > 0 else 0
+
+        # 2. Risk-level histogram, work type distribution and reduced BMI x glucose scatter
+        risk_levels = {level: stats.get("risk_levels", {}).get(level, 0) for level in RISK_LEVELS}
+        work_counts = {w_type: count for w_type, count in stats.get("work_counts", {}).items() if count > 0}
+        if filtered:
+            scatter_data = filtered_scatter(patient_filter(since, until, created_by), stats, scatter_mode, max_points)
+        else:
+            scatter_data = get_scatter(global_stats, scatter_mode, max_points)
+        trends = trend_series(since, until, created_by)
 
         # 3. Top 5 High Risk Patients
-        # stroke_risk is plain, so sorting still works at DB level
-        top_risk_patients = Patient.objects.order_by("-stroke_risk").limit(5)
+        # stroke_risk is plain and indexed (also per creator), so this reads a handful of index entries
+        top_risk_patients = Patient.objects(__raw__=patient_filter(since, until, created_by)).order_by("-stroke_risk").limit(5)
         risk_table_data = []
 
         for p in top_risk_patients:
@@ -97,12 +141,23 @@ def get_dashboard_stats():
             "success": True,
             "kpis": {
                 "total": total_patients,
-                "high_risk": high_risk_count,
+                "high_risk": stats.get("high_risk", 0),
                 "avg_glucose": avg_glucose,
-                "smokers": smokers_count,
+                "smokers": stats.get("smokers", 0),
             },
-            "charts": {"scatter": scatter_data, "work_distribution": work_counts},
+            "charts": {
+                "scatter": scatter_data,
+                "scatter_mode": scatter_mode,
+                "work_distribution": work_counts,
+                "risk_levels": risk_levels,
+            },
+            "trends": trends,
             "table": risk_table_data,
+            "filters": {
+                "since": since.date().isoformat() if since else None,
+                "until": until.date().isoformat() if until else None,
+                "created_by": created_by,
+            },
         })
 
     except Exception as e:
@@ -0,0 +1,99 @@
+# app/views/export_manager.py
+from datetime import datetime
+from flask import Blueprint, Response, jsonify, request, current_app, stream_with_context
+from flask_login import login_required
+from app.models.log import ActivityLog, SecurityLog
+from app.models.patient import Patient
+from app.utils.log_retention import log_collections
+from app.utils.log_utils import log_security
+from app.utils.export_stream import (
+    EXPORT_FORMATS,
+    LOG_EXPORT_FIELDS,
+    PATIENT_EXPORT_FIELDS,
+    build_stream,
+    log_rows,
+    patient_rows,
+)
+from app.views.log_manager import build_log_filter
+
+# Security
+from app.security.auth_shield import AuthShield
+
+export_bp = Blueprint("export_manager", __name__, url_prefix="/export")
+
+LOG_EXPORT_MODELS = {
+    "activity": ActivityLog,
+    "security": SecurityLog,
+}
+
+
+def _export_options():
+    """Reads ?format=ndjson|csv and ?gzip=1. Raises ValueError on unknown formats."""
+    fmt = request.args.get("format", "ndjson").lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}'. Use one of: {', '.join(EXPORT_FORMATS)}.")
+    compress = request.args.get("gzip", "0").lower() in ("1", "true", "yes")
+    return fmt, compress
+
+
+def _stream_response(row_chunks, fmt, fields, compress, basename):
+    """Wraps a row generator into a streaming download response."""
+    filename = f"{basename}_{datetime.now():%Y%m%d_%H%M%S}.{fmt}"
+    headers = {"Cache-Control": "no-store"}
+
+    if compress:
+        filename += ".gz"
+        mimetype = "application/gzip"
+    else:
+        mimetype = EXPORT_FORMATS[fmt]
+
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+    return Response(
+        stream_with_context(build_stream(row_chunks, fmt, fields, compress=compress)),
+        mimetype=mimetype,
+        headers=headers,
+    )
+
+
+@export_bp.route("/logs/<kind>", methods=["GET"])
+@login_required
+@AuthShield.require_role(["Admin"])
+def export_logs(kind):
+    """Streams every Activity or Security log (optionally filtered) as NDJSON/CSV (Admin only)."""
+    LogModel = LOG_EXPORT_MODELS.get(kind)
+    if LogModel is None:
+        return jsonify({"success": False, "message": "Unknown log type."}), 404
+
+    try:
+        fmt, compress = _export_options()
+        query = build_log_filter(request.args)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    collections = log_collections(
+        LogModel, include_partitions=current_app.config.get("LOG_MONTHLY_COLLECTIONS", False)
+    )
+
+    log_security(f"Exported {kind} logs ({fmt}{', gzip' if compress else ''}).", level=2)
+
+    return _stream_response(
+        log_rows(collections, query), fmt, LOG_EXPORT_FIELDS, compress, f"{kind}_logs"
+    )
+
+
+@export_bp.route("/patients", methods=["GET"])
+@login_required
+@AuthShield.require_role(["Admin"])
+def export_patients():
+    """Streams every patient record, decrypted in chunks, as NDJSON/CSV (Admin only)."""
+    try:
+        fmt, compress = _export_options()
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    log_security(f"Exported patient records ({fmt}{', gzip' if compress else ''}).", level=2)
+
+    return _stream_response(
+        patient_rows(Patient), fmt, PATIENT_EXPORT_FIELDS, compress, "patients"
+    )
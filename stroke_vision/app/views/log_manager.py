@@ -1,12 +1,169 @@
-from flask import Blueprint, render_template, jsonify, request, abort
+from datetime import datetime
+from flask import Blueprint, jsonify, request, abort, current_app
 from flask_login import login_required, current_user
 from app.models.log import ActivityLog, SecurityLog
+from app.utils.log_retention import log_collections
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_filter
+from app.utils.http_cache import render_fragment
 
 log_manager_bp = Blueprint("log_manager", __name__, url_prefix="/logs")
 
 # Pagination settings
 LOGS_PER_PAGE = 30
 
+# Filter settings
+MAX_FILTER_LENGTH = 100
+LOG_SORT = [("timestamp", -1), ("_id", -1)]
+
+
+def _parse_level(value, name):
+    try:
+        level = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer between 0 and 4.")
+    if not 0 <= level <= 4:
+        raise ValueError(f"{name} must be an integer between 0 and 4.")
+    return level
+
+
+def _parse_time(value, name):
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an ISO 8601 datetime.")
+
+
+def build_log_filter(args):
+    """
+    Translates query-string filters into a Mongo filter.
+    Supported: min_level, max_level, since, until, user_name, client_ip, q (text search on info).
+    Every combination is backed by an index on the log models.
+    Raises ValueError on invalid input.
+    """
+    query = {}
+
+    min_level = _parse_level(args["min_level"], "min_level") if args.get("min_level") else 0
+    max_level = _parse_level(args["max_level"], "max_level") if args.get("max_level") else 4
+    if min_level > max_level:
+        raise ValueError("min_level cannot be greater than max_level.")
+    if min_level == max_level:
+        query["log_level"] = min_level
+    elif (min_level, max_level) != (0, 4):
+        query["log_level"] = {"$gte": min_level, "$lte": max_level}
+
+    window = {}
+    if args.get("since"):
+        window["$gte"] = _parse_time(args["since"], "since")
+    if args.get("until"):
+        window["$lt"] = _parse_time(args["until"], "until")
+    if window:
+        query["timestamp"] = window
+
+    for field in ("user_name", "client_ip"):
+        value = (args.get(field) or "").strip()
+        if value:
+            if len(value) > MAX_FILTER_LENGTH:
+                raise ValueError(f"{field} is too long.")
+            query[field] = value
+
+    term = (args.get("q") or "").strip()
+    if term:
+        if len(term) > MAX_FILTER_LENGTH:
+            raise ValueError("Search term is too long.")
+        query["$text"] = {"$search": term}
+
+    return query
+
+
+def _fetch_log_page(LogModel, cursor=None, skip=0, filters=None):
+    """
+    Returns (logs, has_more) for one page, newest first, ordered by (timestamp, _id).
+
+    - cursor: decoded (timestamp, _id) of the last entry already shown (keyset pagination).
+    - skip: legacy offset for the `page` parameter.
+    - filters: Mongo filter from build_log_filter().
+
+    has_more is derived by fetching one extra entry instead of counting.
+    Monthly partitions (when enabled) and the base collection are walked newest first.
+    """
+    query = dict(filters or {})
+    if cursor:
+        query.update(keyset_filter("timestamp", *cursor))
+    wanted = LOGS_PER_PAGE + 1
+    logs = []
+
+    collections = log_collections(
+        LogModel, include_partitions=current_app.config.get("LOG_MONTHLY_COLLECTIONS", False)
+    )
+
+    for collection in collections:
+        docs = list(
+            collection.find(query)
+            .sort(LOG_SORT)
+            .skip(skip)
+            .limit(wanted - len(logs))
+        )
+
+        if skip:
+            if not docs:
+                # The offset lies beyond this collection; carry the remainder over
+                skip = max(0, skip - collection.count_documents(query))
+                continue
+            skip = 0
+
+        logs.extend(LogModel._from_son(doc) for doc in docs)
+        if len(logs) >= wanted:
+            break
+
+    return logs[:LOGS_PER_PAGE], len(logs) > LOGS_PER_PAGE
+
+
+def _log_page_response(LogModel):
+    """
+    Shared handler for both log APIs.
+    Accepts ?cursor=<token> (preferred) or the legacy ?page=<n>, plus the
+    filters understood by build_log_filter().
+    """
+    token = request.args.get("cursor")
+    page = request.args.get("page", 1, type=int)
+
+    try:
+        filters = build_log_filter(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if token:
+        try:
+            cursor = decode_cursor(token)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor."}), 400
+        logs, has_more = _fetch_log_page(LogModel, cursor=cursor, filters=filters)
+    else:
+        logs, has_more = _fetch_log_page(
+            LogModel, skip=(max(page, 1) - 1) * LOGS_PER_PAGE, filters=filters
+        )
+
+    next_cursor = encode_cursor(logs[-1].timestamp, logs[-1].id) if has_more and logs else None
+
+    return jsonify({
+        "logs": [_serialize_log(log) for log in logs],
+        "page": page,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
+    })
+
+
+def _serialize_log(log):
+    return {
+        "timestamp": log.timestamp.isoformat(),
+        "info": log.info,
+        "client_ip": log.client_ip,
+        "client_os": log.client_os,
+        "user_name": getattr(log, "user_name", None),
+        "user_role": getattr(log, "user_role", None),
+        "log_level": log.log_level,
+    }
+
 
 @log_manager_bp.route("/view/activity")
 @login_required
@@ -14,7 +171,7 @@ def view_activity():
     """Renders the Activity View (Security Logs)."""
     if current_user.role != "Admin":
         abort(403)
-    return render_template("partials/toolbar/activity.html")
+    return render_fragment("partials/toolbar/activity.html")
 
 
 @log_manager_bp.route("/view/changelog")
@@ -23,44 +180,18 @@ def view_changelog():
     """Renders the Change Log View (Activity Logs)."""
     if current_user.role not in ["Admin", "Doctor"]:
         abort(403)
-    return render_template("partials/toolbar/change_log.html")
+    return render_fragment("partials/toolbar/change_log.html")
 
 
 @log_manager_bp.route("/api/activity", methods=["GET"])
 @login_required
 def get_activity_logs():
-    """API to fetch Security Logs with pagination."""
+    """API to fetch Security Logs with cursor (or legacy page) pagination."""
     try:
         if current_user.role != "Admin":
             return jsonify({"error": "Admin privileges required."}), 403
 
-        page = request.args.get("page", 1, type=int)
-        skip = (page - 1) * LOGS_PER_PAGE
-
-        # Get total count for has_more calculation
-        total = SecurityLog.objects.count()
-        logs = SecurityLog.objects.order_by("-timestamp").skip(skip).limit(LOGS_PER_PAGE)
-
-        data = [
-            {
-                "timestamp": log.timestamp.isoformat(),
-                "info": log.info,
-                "client_ip": log.client_ip,
-                "client_os": log.client_os,
-                "user_name": getattr(log, "user_name", None),
-                "user_role": getattr(log, "user_role", None),
-                "log_level": log.log_level,
-            }
-            for log in logs
-        ]
-        
-        has_more = (skip + len(data)) < total
-        
-        return jsonify({
-            "logs": data,
-            "page": page,
-            "has_more": has_more
-        })
+        return _log_page_response(SecurityLog)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -68,36 +199,11 @@ def get_activity_logs():
 @log_manager_bp.route("/api/changelog", methods=["GET"])
 @login_required
 def get_change_logs():
-    """API to fetch Activity Logs with pagination."""
+    """API to fetch Activity Logs with cursor (or legacy page) pagination."""
     try:
         if current_user.role not in ["Admin", "Doctor"]:
             return jsonify({"error": "Access denied."}), 403
 
-        page = request.args.get("page", 1, type=int)
-        skip = (page - 1) * LOGS_PER_PAGE
-
-        total = ActivityLog.objects.count()
-        logs = ActivityLog.objects.order_by("-timestamp").skip(skip).limit(LOGS_PER_PAGE)
-
-        data = [
-            {
-                "timestamp": log.timestamp.isoformat(),
-                "info": log.info,
-                "client_ip": log.client_ip,
-                "client_os": log.client_os,
-                "user_name": getattr(log, "user_name", None),
-                "user_role": getattr(log, "user_role", None),
-                "log_level": log.log_level,
-            }
-            for log in logs
-        ]
-        
-        has_more = (skip + len(data)) < total
-        
-        return jsonify({
-            "logs": data,
-            "page": page,
-            "has_more": has_more
-        })
+        return _log_page_response(ActivityLog)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
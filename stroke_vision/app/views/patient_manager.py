@@ -1,15 +1,27 @@
 # views/patient_manager.py
-from flask import Blueprint, abort, render_template, url_for, request, jsonify, flash, redirect
+from flask import Blueprint, abort, render_template, url_for, request, jsonify, flash, redirect, current_app
 from app.forms.patient_form import PatientForm
 from app.models.patient import Patient
 from app.utils.prediction import StrokePredictor
 from app.utils.id_generator import IDGenerator
+from app.utils.bulk_import import detect_format, import_patients, parse_rows
+from app.utils.patient_fields import (
+    get_risk_class,
+    get_risk_level,
+    map_binary_to_yes_no,
+    map_gender,
+    map_residence_type,
+    map_smoking_status,
+    map_work_type,
+)
 from app.utils.log_utils import log_activity
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_filter
+from app.utils.patient_cache import patient_count_cache
+from app.utils.http_cache import make_etag, not_modified, render_fragment, with_etag
 from datetime import datetime
 from flask_login import current_user, login_required
+import time
 import traceback
-import numpy as np
-import json
 
 # Security
 from app.security.auth_shield import AuthShield
@@ -18,6 +30,8 @@ from app.security.input_sanitizer import InputSanitizer, ValidationError
 patient_bp = Blueprint("patient", __name__)
 stroke_predictor = StrokePredictor()
 
+PATIENTS_PER_PAGE = 20
+
 # =======================================================
 # UTILITIES AND HELPERS
 # =======================================================
@@ -26,56 +40,6 @@ def is_ajax_request():
     """Checks if the request is an AJAX request."""
     return request.headers.get("X-Requested-With") == "XMLHttpRequest"
 
-def map_binary_to_yes_no(value):
-    return "Yes" if value == "1" else "No"
-
-def map_smoking_status(status):
-    mapping = {
-        "formerly smoked": "Formerly Smoked",
-        "never smoked": "Never Smoked",
-        "smokes": "Smokes",
-        "Unknown": "Unknown",
-    }
-    return mapping.get(status, status)
-
-def map_work_type(work):
-    mapping = {
-        "Private": "Private",
-        "Self-employed": "Self-Employed",
-        "Govt_job": "Govt Job",
-        "children": "Children",
-        "Never_worked": "Never Worked",
-    }
-    return mapping.get(work, work)
-
-def map_residence_type(residence):
-    return "Urban" if residence == "Urban" else "Rural"
-
-def map_gender(gender):
-    return "Other" if gender == "Other" else gender
-
-def get_risk_level(risk_percentage):
-    if risk_percentage < 20: return "Low"
-    elif risk_percentage < 40: return "Moderate"
-    elif risk_percentage < 60: return "High"
-    elif risk_percentage < 80: return "Very High"
-    else: return "Critical"
-
-def get_risk_class(risk_level):
-    if risk_level in ["Critical", "Very High"]: return "risk-critical"
-    elif risk_level == "High": return "risk-high"
-    elif risk_level == "Moderate": return "risk-moderate"
-    else: return "risk-low"
-
-class NumpyEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, (np.int_, np.intc, np.intp, np.int8, np.int16, np.int32, np.int64, np.uint8, np.uint16, np.uint32, np.uint64)):
-            return int(obj)
-        elif isinstance(obj, (np.float_, np.float16, np.float32, np.float64)):
-            return float(obj)
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        return super().default(obj)
 
 # =======================================================
 # DATA API ENDPOINT (For client-side data fetching)
@@ -85,21 +49,39 @@ class NumpyEncoder(json.JSONEncoder):
 @login_required
 @AuthShield.require_role(["Doctor"])
 def api_patient_data():
-    """Fetches paginated patient data as JSON."""
+    """
+    Fetches paginated patient data as JSON.
+    Accepts ?cursor=<token> (keyset on record_entry_date, _id) or the legacy ?page=<n>.
+    """
     if not is_ajax_request():
         return jsonify({"error": "Unauthorized access to data API"}), 403
 
+    token = request.args.get("cursor")
+    page = request.args.get("page", 1, type=int)
+    limit = PATIENTS_PER_PAGE
+
+    query = {}
+    if token:
+        try:
+            query = keyset_filter("record_entry_date", *decode_cursor(token))
+        except ValueError:
+            return jsonify({"success": False, "message": "Invalid cursor."}), 400
+
     try:
-        page = request.args.get("page", 1, type=int)
-        limit = 20
-        skip = (page - 1) * limit
-        patients = Patient.objects.order_by("-record_entry_date").skip(skip).limit(limit)
-        total_count = Patient.objects.count()
+        # Fetch one extra row to know whether another page exists (no count needed)
+        patients = Patient.objects(__raw__=query).order_by("-record_entry_date", "-id").limit(limit + 1)
+        if not token:
+            patients = patients.skip((max(page, 1) - 1) * limit)
+        patients = list(patients)
+        has_next = len(patients) > limit
+        patients = patients[:limit]
+        total_count = patient_count_cache.get()
 
         log_activity(f"Accessed patient list via API (page={page}, limit={limit}).", level=1)
-        
-        import time
-        time.sleep(1.2)  # Artificial delay
+
+        # Optional loading simulation for UI demos (off by default)
+        if current_app.config.get("PATIENT_LIST_SIMULATE_LOADING"):
+            time.sleep(current_app.config.get("PATIENT_LIST_SIMULATED_DELAY", 0))
 
         patient_list = []
         for patient in patients:
@@ -114,11 +96,14 @@ def api_patient_data():
                 "stroke_risk": patient.stroke_risk,
             })
 
+        next_cursor = encode_cursor(patients[-1].record_entry_date, patients[-1].id) if has_next and patients else None
+
         return jsonify({
             "patients": patient_list,
             "page": page,
             "limit": limit,
-            "has_next": (page * limit) < total_count,
+            "has_next": has_next,
+            "next_cursor": next_cursor,
             "total_count": total_count,
         })
     except Exception as e:
@@ -132,7 +117,7 @@ def api_patient_data():
 @AuthShield.require_role(["Doctor"])
 def api_patient_list_view():
     """Renders the HTML container for the Patient List view."""
-    return render_template("patient/patient_list_fragment.html")
+    return render_fragment("patient/patient_list_fragment.html")
 
 
 @patient_bp.route("/views/details/<patient_id>", methods=["GET"])
@@ -146,14 +131,33 @@ def api_details_patient_view(patient_id):
     except ValidationError as e:
         return jsonify({"success": False, "message": str(e)}), 400
 
-    patient = Patient.objects(patient_id=patient_id).first()
+    # Cheap indexed lookup of the version fields only (no decryption)
+    version = (
+        Patient.objects(patient_id=patient_id)
+        .only("updated_at", "record_entry_date")
+        .as_pymongo()
+        .first()
+    )
 
-    if not patient:
+    if not version:
         log_activity(f"Patient details requested but not found: {patient_id}", level=2)
         return jsonify({"error": "Patient not found"}), 404
 
     log_activity(f"Viewed patient {patient_id}", level=1)
 
+    etag = make_etag(
+        "patient_details",
+        version["_id"],
+        version.get("updated_at") or version.get("record_entry_date"),
+    )
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    patient = Patient.objects(id=version["_id"]).first()
+    if not patient:
+        return jsonify({"error": "Patient not found"}), 404
+
     risk_level_str = patient.risk_level if hasattr(patient, "risk_level") else "Low"
     risk_class_str = get_risk_class(risk_level_str)
 
@@ -177,7 +181,7 @@ def api_details_patient_view(patient_id):
         "created_by": patient.created_by,
     }
 
-    return render_template("patient/patient_details_fragment.html", patient=patient_data)
+    return with_etag(render_template("patient/patient_details_fragment.html", patient=patient_data), etag)
 
 
 # --------------------Add/Edit Patients route----------------------
@@ -247,9 +251,12 @@ def patient_form(patient_id):
             patient = Patient.objects(patient_id=patient_id_from_form).first()
             if not patient:
                 return jsonify({"success": False, "message": "Patient not found for update"}), 404
+            # Also bumps the details view ETag
+            patient.updated_by = current_user.name
+            patient.updated_at = datetime.now()
         else:
             patient = Patient()
-            patient.patient_id = IDGenerator.generate_id()
+            patient.patient_id = IDGenerator.generate_patient_id()
             patient.record_entry_date = datetime.now()
             patient.created_by = current_user.name
 
@@ -368,14 +375,53 @@ def predict_risk():
 
     log_activity(f"{'Created' if is_new else 'Updated'} patient {patient.patient_id} via Predict API", level=1)
 
-    return json.dumps({
+    # jsonify's provider (app/utils/json_provider.py) handles NumPy scalars from the model
+    return jsonify({
         "success": True,
         "patient_id": patient.patient_id,
         "name": patient.name,
         "risk": risk_percentage,
         "risk_level": risk_level,
         "message": "Patient data saved."
-    }, cls=NumpyEncoder), 200, {"Content-Type": "application/json"}
+    }), 200
+
+
+@patient_bp.route("/api/import", methods=["POST"])
+@login_required
+@AuthShield.require_role(["Doctor", "Nurse"])
+@AuthShield.secure_transaction
+def import_patients_api():
+    """
+    Bulk import of patient records from CSV or NDJSON.
+    Accepts a multipart `file` upload or a raw request body; the format comes from
+    ?format=, the file name or the content type. Returns a per-row error report.
+    """
+    upload = request.files.get("file")
+    if upload:
+        raw = upload.read()
+        fmt = request.args.get("format") or detect_format(upload.filename, upload.mimetype)
+    else:
+        raw = request.get_data()
+        fmt = request.args.get("format") or detect_format(content_type=request.content_type)
+
+    if not raw:
+        return jsonify({"success": False, "message": "No import data received."}), 400
+
+    try:
+        text = raw.decode("utf-8-sig")
+        rows = parse_rows(text, (fmt or "").lower())
+    except UnicodeDecodeError:
+        return jsonify({"success": False, "message": "Import file must be UTF-8 encoded."}), 400
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    try:
+        report = import_patients(rows, stroke_predictor, current_user.name)
+    except ValueError as e:
+        log_activity(f"Bulk import failed: {str(e)}", level=3)
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    return jsonify({"success": True, **report})
 
 
 @patient_bp.route("/api/delete/<patient_id>", methods=["DELETE"])
@@ -403,7 +449,7 @@ def delete_patient(patient_id):
 @login_required
 def patients_count():
     try:
-        count = Patient.objects.count()
+        count = patient_count_cache.get()
         return jsonify({"count": count})
     except Exception as error:
         log_activity(f"Error counting patients: {str(error)}", level=3)
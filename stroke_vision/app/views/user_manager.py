@@ -3,6 +3,8 @@ from flask import Blueprint, render_template, request, jsonify
 from flask_login import login_required, current_user
 from app import db
 from app.models.user import User
+from app.utils.http_cache import render_fragment
+from app.utils.user_cache import user_cache
 import secrets
 import string
 
@@ -41,7 +43,7 @@ def view_users_panel():
         log_security("Opened user manager.", level=1)
     except Exception:
         pass
-    return render_template("toolbar/user_manager.html")
+    return render_fragment("toolbar/user_manager.html")
 
 
 # =============================================================================
@@ -80,6 +82,8 @@ def update_self_profile():
         user.email = new_email
         user.email_hash = new_hash
 
+    user_cache.invalidate(user.id)
+
     if not new_name and not new_email:
         return jsonify({"success": False, "message": "No new data provided."}), 400
 
@@ -122,6 +126,7 @@ def change_self_password_api():
         return jsonify({"success": False, "message": "Incorrect current password."}), 400
 
     user.set_password(new_password)
+    user_cache.invalidate(user.id)
     # Logging
     try:
         log_security("Password changed for user.", level=0)
@@ -187,6 +192,7 @@ def update_user_email():
     old_email = user.email
     user.email = new_email
     user.email_hash = new_hash
+    user_cache.invalidate(user.id)
     
     try:
         log_security(f"Admin updated email for user {user_id}. {old_email} -> {new_email}", level=1)
@@ -223,6 +229,7 @@ def update_user_role():
     
     old_role = user.role
     user.role = new_role
+    user_cache.invalidate(user.id)
     
     try:
         log_security(f"Admin changed role for user {user_id}: {old_role} -> {new_role}", level=0)
@@ -249,6 +256,7 @@ def unlock_user_api():
         return jsonify({"success": False, "message": "User not found."}), 404
 
     user.unlock() # This usually commits, but our decorator handles commit too. Double commit is fine.
+    user_cache.invalidate(user.id)
     
     try:
         log_security(f"Unlocked user {user.email}.", level=1)
@@ -271,6 +279,7 @@ def reset_password_api(user_id):
     new_password = "".join(secrets.choice(alphabet) for i in range(12))
 
     user.set_password(new_password)
+    user_cache.invalidate(user.id)
     
     try:
         log_security(f"Admin reset password for user {user_id}.", level=0)
@@ -302,6 +311,7 @@ def delete_user_api(user_id):
     user_name = user.name
     
     db.session.delete(user)
+    user_cache.invalidate(user_id)
     
     try:
         log_security(f"Deleted user {user_name} ({user_email}).", level=0)
@@ -340,6 +350,7 @@ def update_self_email_api():
 
     old_email = user.email
     user.email = new_email
+    user_cache.invalidate(user.id)
     
     try:
         log_security(f"Admin updated own email: {old_email} -> {new_email}", level=1)
@@ -363,6 +374,7 @@ def reset_self_password_api():
         return jsonify({"success": False, "message": "User not found."}), 404
 
     user.set_password(temp_password)
+    user_cache.invalidate(user.id)
     
     try:
         log_security("Admin reset own password (temporary password set).", level=0)
@@ -4,6 +4,7 @@ import sys
 import pytest
 from mongoengine import connect, disconnect
 import mongomock
+from mongomock.collection import BulkOperationBuilder
 from datetime import datetime
 import pickle
 from pathlib import Path
@@ -18,6 +19,17 @@ from app.models.user import User
 
 
 # MongoDB Mock Database Setup  --------------------------------
+# pymongo >= 4.11 passes `sort` to bulk updates, which mongomock 4.3 does not accept yet
+_mongomock_add_update = BulkOperationBuilder.add_update
+
+
+def _add_update_ignoring_sort(self, *args, sort=None, **kwargs):
+    return _mongomock_add_update(self, *args, **kwargs)
+
+
+BulkOperationBuilder.add_update = _add_update_ignoring_sort
+
+
 @pytest.fixture(scope="function", autouse=True)
 def setup_db():
     """Setup test database before each test"""
@@ -164,6 +176,7 @@ def app():
             "SECRET_KEY": "test-secret-key",
             "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
             "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "STATS_RECONCILE_IN_BACKGROUND": False,  # Build dashboard stats inside the request, deterministically
         }
     )
     return app
@@ -206,3 +219,52 @@ def doctor_user(app, _db):
         db.session.commit()
         return user
 
+
+
+@pytest.fixture
+def admin_user(app, _db):
+    """Create a test user with Admin role for admin-only routes."""
+    with app.app_context():
+        user = User(
+            name="Admin User",
+            email="admin@example.com",
+            email_hash=User.hash_email("admin@example.com"),
+            role="Admin",
+        )
+        user.set_password("AdminPass123!")
+        db.session.add(user)
+        db.session.commit()
+        return user
+
+
+@pytest.fixture
+def admin_client(client, admin_user):
+    """A test client logged in as the Admin user."""
+    client.post(
+        "/auth/login",
+        data={"email": "admin@example.com", "password": "AdminPass123!"},
+        follow_redirects=True,
+    )
+    return client
+
+
+@pytest.fixture
+def doctor_client(client, app, _db):
+    """A test client logged in as a Doctor (with email_hash, so login works)."""
+    with app.app_context():
+        user = User(
+            name="Doctor Client",
+            email="doctor.client@example.com",
+            email_hash=User.hash_email("doctor.client@example.com"),
+            role="Doctor",
+        )
+        user.set_password("DoctorPass123!")
+        db.session.add(user)
+        db.session.commit()
+
+    client.post(
+        "/auth/login",
+        data={"email": "doctor.client@example.com", "password": "DoctorPass123!"},
+        follow_redirects=True,
+    )
+    return client
@@ -0,0 +1,107 @@
+# unit_tests/test_admin_stats.py
+import sqlite3
+from datetime import datetime
+import pytest
+from sqlalchemy import text
+from app import create_app, db
+from app.models.user import User, upgrade_user_table
+from app.utils.user_stats import compute_user_stats, month_starts, user_stats_cache
+
+
+@pytest.fixture(autouse=True)
+def reset_user_stats_cache():
+    user_stats_cache.invalidate()
+    yield
+    user_stats_cache.invalidate()
+
+
+def _add_user(i, role, created_at, locked=False):
+    user = User(
+        name=f"User {i}",
+        email=f"user{i}@example.com",
+        email_hash=User.hash_email(f"user{i}@example.com"),
+        role=role,
+        created_at=created_at,
+        is_locked=locked,
+    )
+    user.set_password("UserPass123!")
+    db.session.add(user)
+    return user
+
+
+def test_month_starts_cross_year_boundary():
+    starts = month_starts(datetime(2025, 2, 28, 23, 0))
+    assert [(s.year, s.month) for s in starts] == [(2024, 9), (2024, 10), (2024, 11), (2024, 12), (2025, 1), (2025, 2)]
+
+
+def test_compute_user_stats_from_group_by(app, _db):
+    with app.app_context():
+        _add_user(0, "Admin", datetime(2025, 1, 31, 23, 59))
+        _add_user(1, "Doctor", datetime(2025, 3, 1, 0, 0), locked=True)
+        _add_user(2, "Doctor", datetime(2025, 3, 15))
+        _add_user(3, "Nurse", datetime(2024, 6, 1))  # Outside the growth window
+        db.session.add(User(name="Default", email="d@example.com", email_hash=User.hash_email("d@example.com"), password="x"))
+        db.session.commit()
+
+        stats = compute_user_stats(now=datetime(2025, 3, 20))
+
+    assert stats["kpis"] == {"total": 5, "locked": 1, "admins": 1, "doctors": 3, "nurses": 1}
+    assert stats["charts"]["roles"] == [1, 3, 1]
+    assert stats["charts"]["growth"]["labels"] == ["Oct 2024", "Nov 2024", "Dec 2024", "Jan 2025", "Feb 2025", "Mar 2025"]
+    # Jan 31 and Mar 1 land in their own calendar months
+    assert stats["charts"]["growth"]["data"][3:5] == [1, 0]
+
+
+def test_role_change_invalidates_cache(app, _db):
+    with app.app_context():
+        user = _add_user(0, "Nurse", datetime.utcnow())
+        db.session.commit()
+        assert user_stats_cache.get()["kpis"]["nurses"] == 1
+
+        user.role = "Doctor"
+        db.session.commit()
+        kpis = user_stats_cache.get()["kpis"]
+        assert (kpis["nurses"], kpis["doctors"]) == (0, 1)
+
+
+def test_upgrade_user_table_backfills_role_hash(app, _db):
+    with app.app_context():
+        _add_user(0, "Nurse", datetime.utcnow())
+        db.session.commit()
+        assert upgrade_user_table() is False
+
+        with db.engine.begin() as connection:
+            connection.execute(text("DROP INDEX ix_users_role_hash"))
+            connection.execute(text("ALTER TABLE users DROP COLUMN role_hash"))
+        db.session.expire_all()
+
+        assert upgrade_user_table() is True
+        assert User.query.filter_by(role_hash=User.hash_role("Nurse")).count() == 1
+
+
+def test_create_app_upgrades_existing_user_table(tmp_path, monkeypatch):
+    """Any entry point (gunicorn, scripts) gets the new columns, not only run.py."""
+    path = tmp_path / "old_users.db"
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL, email VARCHAR(255) NOT NULL, "
+        "email_hash VARCHAR(64) NOT NULL UNIQUE, password VARCHAR(255) NOT NULL, role VARCHAR(20) NOT NULL, "
+        "created_at DATETIME NOT NULL, failed_login_attempts INTEGER NOT NULL, last_failed_login DATETIME, "
+        "is_locked BOOLEAN NOT NULL, locked_at DATETIME)"
+    )
+    connection.close()
+    monkeypatch.setenv("SQLITE_DATABASE_URI", f"sqlite:///{path}")
+
+    app = create_app()
+
+    with app.app_context():
+        assert User.query.filter_by(role_hash=User.hash_role("Nurse")).count() == 0
+        db.engine.dispose()
+
+
+def test_admin_stats_endpoint(admin_client):
+    response = admin_client.get("/admin/dashboard/api/stats")
+    data = response.get_json()
+    assert response.status_code == 200
+    assert data["kpis"]["admins"] == 1
+    assert len(data["charts"]["growth"]["labels"]) == 6
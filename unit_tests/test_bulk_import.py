@@ -0,0 +1,89 @@
+# unit_tests/test_bulk_import.py
+import io
+import json
+from app.models.patient import Patient
+from app.utils.bulk_import import detect_format, parse_rows
+
+AJAX = {"X-Requested-With": "XMLHttpRequest"}
+
+CSV_HEADER = "name,age,gender,ever_married,work_type,residence_type,heart_disease,hypertension,avg_glucose_level,bmi,smoking_status\n"
+CSV_BODY = (
+    CSV_HEADER
+    + "Jane Doe,67,Female,Yes,Private,Urban,1,0,180.5,31.2,smokes\n"
+    + "John Roe,200,Male,No,Private,Rural,0,0,90,22,never smoked\n"  # invalid age
+    + "Amy Poe,34,Female,No,Govt_job,Rural,0,1,95.2,24.8,never smoked\n"
+)
+
+
+def test_detect_format():
+    assert detect_format("records.csv") == "csv"
+    assert detect_format("records.ndjson") == "ndjson"
+    assert detect_format(content_type="application/x-ndjson") == "ndjson"
+    assert detect_format("records.txt") is None
+
+
+def test_parse_ndjson_reports_bad_lines():
+    rows = parse_rows('{"name": "A"}\nnot json\n\n["list"]\n', "ndjson")
+    assert [number for number, _, _ in rows] == [1, 2, 3]
+    assert rows[0][1] == {"name": "A"}
+    assert rows[1][2].startswith("Invalid JSON")
+    assert rows[2][2].startswith("Invalid JSON")
+
+
+def test_import_csv_with_row_errors(doctor_client):
+    response = doctor_client.post(
+        "/patient/api/import?format=csv", data=CSV_BODY, content_type="text/csv", headers=AJAX
+    )
+    report = response.get_json()
+
+    assert response.status_code == 200
+    assert (report["total"], report["imported"], report["failed"]) == (3, 2, 1)
+    assert report["errors"][0]["row"] == 2
+    assert "age" in report["errors"][0]["message"].lower()
+
+    assert Patient.objects.count() == 2
+    jane = Patient.objects(name="Jane Doe").first()
+    assert jane.patient_id in {p["patient_id"] for p in report["patients"]}
+    assert jane.work_type == "Private" and jane.heart_disease == "Yes" and jane.smoking_status == "Smokes"
+    assert 0 <= jane.stroke_risk <= 100
+    # Stored encrypted like records saved through the form
+    assert Patient._get_collection().find_one({"name": "Jane Doe"})["gender"] != "Female"
+
+
+def test_import_ndjson_file_upload(doctor_client):
+    lines = "\n".join(json.dumps(row) for row in [
+        {"name": "Nia Lee", "age": 45, "gender": "Female", "ever_married": "Yes", "work_type": "Self-employed",
+         "residence_type": "Urban", "heart_disease": 0, "hypertension": 1, "avg_glucose_level": 120.4,
+         "bmi": 28.3, "smoking_status": "formerly smoked"},
+        {"name": "Missing Fields"},
+    ])
+    data = {"file": (io.BytesIO(lines.encode()), "records.ndjson")}
+
+    report = doctor_client.post(
+        "/patient/api/import", data=data, content_type="multipart/form-data", headers=AJAX
+    ).get_json()
+
+    assert (report["imported"], report["failed"]) == (1, 1)
+    assert report["errors"][0]["row"] == 2
+
+
+def test_import_rejects_unknown_format(doctor_client):
+    response = doctor_client.post("/patient/api/import", data="a,b\n1,2\n", content_type="text/plain", headers=AJAX)
+    assert response.status_code == 400
+
+
+def test_import_rejected_when_day_has_too_few_ids(doctor_client, current_date_portion):
+    from app.models.patient import PatientIDCounter
+    from app.utils.id_generator import IDS_PER_DAY, patient_id_allocator
+
+    patient_id_allocator.reset()
+    PatientIDCounter(prefix=current_date_portion, seq=IDS_PER_DAY - 1).save()
+
+    response = doctor_client.post(
+        "/patient/api/import?format=csv", data=CSV_BODY, content_type="text/csv", headers=AJAX
+    )
+
+    assert response.status_code == 400
+    assert "Only 1 patient IDs are left today" in response.get_json()["message"]
+    assert Patient.objects.count() == 0
+    assert PatientIDCounter.objects(prefix=current_date_portion).first().seq == IDS_PER_DAY - 1
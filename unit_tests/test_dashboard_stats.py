@@ -0,0 +1,326 @@
+# unit_tests/test_dashboard_stats.py
+import threading
+import time
+from datetime import datetime, timedelta
+from app.models.patient import Patient
+from app.models.stats import PatientDailyRollup, PatientScatterSample, PatientStats
+from app.utils import dashboard_stats
+from app.utils.dashboard_stats import (
+    MAX_WINDOW_DAYS,
+    REBUILD_LOCK_KEY,
+    SAMPLE_SIZES,
+    filtered_scatter,
+    get_scatter,
+    get_stats,
+    plaintext_kpis,
+    reconcile_stats,
+    reservoir_sample,
+    scatter_from_bins,
+    start_background_reconcile,
+    trend_series,
+    window_stats,
+)
+
+
+def _make_patient(i, risk=10.0, smoking="Never Smoked", work="Private", bmi=25.0, glucose=95.0):
+    return Patient(
+        patient_id=f"5030{i:05d}",
+        name=f"Patient {i}",
+        age=40,
+        gender="Male",
+        ever_married="Yes",
+        work_type=work,
+        residence_type="Urban",
+        heart_disease="No",
+        hypertension="No",
+        avg_glucose_level=glucose,
+        bmi=bmi,
+        smoking_status=smoking,
+        stroke_risk=risk,
+        record_entry_date=datetime(2025, 1, 1) + timedelta(hours=i),
+        created_by="Doctor Client",
+    ).save()
+
+
+def _comparable(stats):
+    keep = ("total", "high_risk", "smokers", "work_counts", "risk_levels")
+    result = {key: stats[key] for key in keep}
+    result["work_counts"] = {k: v for k, v in result["work_counts"].items() if v}
+    result["risk_levels"] = {k: v for k, v in result["risk_levels"].items() if v}
+    result["glucose_sum"] = round(stats["glucose_sum"], 6)
+    result["risk_sum"] = round(stats["risk_sum"], 6)
+    for bins in ("scatter_bins", "hex_bins"):
+        result[bins] = {
+            cell: (values["n"], round(values["risk_sum"], 6))
+            for cell, values in stats[bins].items()
+            if values["n"]
+        }
+    return result
+
+
+def test_incremental_updates_match_full_rebuild():
+    _make_patient(0)
+    reconcile_stats()  # First build
+
+    high = _make_patient(1, risk=35.0, smoking="Smokes", work="Self-Employed", bmi=31.0, glucose=180.0)
+    changed = _make_patient(2, risk=5.0)
+    gone = _make_patient(3, risk=22.0, work="Govt Job")
+
+    changed.stroke_risk = 28.0
+    changed.smoking_status = "Formerly Smoked"
+    changed.bmi = 40.0
+    changed.save()
+    gone.delete()
+
+    incremental = get_stats()
+    assert incremental["total"] == 3
+    assert incremental["high_risk"] == 2
+    assert incremental["smokers"] == 2
+    assert incremental["version"] > 1
+
+    assert _comparable(incremental) == _comparable(reconcile_stats())
+    assert high.work_type in incremental["work_counts"]
+
+
+def test_bulk_import_updates_stats(doctor_client):
+    reconcile_stats()
+    body = (
+        "name,age,gender,ever_married,work_type,residence_type,heart_disease,hypertension,avg_glucose_level,bmi,smoking_status\n"
+        "Ann Lee,61,Female,Yes,Private,Urban,0,1,140.5,27.3,never smoked\n"
+        "Bob Ray,70,Male,Yes,Self-employed,Rural,1,1,210.0,31.0,smokes\n"
+    )
+    response = doctor_client.post(
+        "/patient/api/import?format=csv", data=body, content_type="text/csv",
+        headers={"X-Requested-With": "XMLHttpRequest"},
+    )
+    assert response.get_json()["imported"] == 2
+
+    assert _comparable(get_stats()) == _comparable(reconcile_stats())
+
+
+def test_scatter_from_bins_uses_cell_centre_and_mean_risk():
+    points = scatter_from_bins({"12:9": {"n": 4, "risk_sum": 40.0}, "1:1": {"n": 0, "risk_sum": 0}})
+    assert points == [{"x": 25.0, "y": 95.0, "r": 5.0, "risk": 10.0, "count": 4}]
+
+
+def test_stats_endpoint_reads_materialized_stats(doctor_client):
+    _make_patient(0, risk=35.0)
+    _make_patient(1, risk=5.0, smoking="Smokes")
+
+    response = doctor_client.get("/dashboard/api/stats")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["kpis"] == {"total": 2, "high_risk": 1, "avg_glucose": 95.0, "smokers": 1}
+    assert data["charts"]["risk_levels"] == {"Low": 1, "Moderate": 1, "High": 0, "Very High": 0, "Critical": 0}
+    assert data["charts"]["work_distribution"] == {"Private": 2}
+    assert sum(point["count"] for point in data["charts"]["scatter"]) == 2
+    assert data["table"][0]["stroke_risk"] == 35.0
+
+
+def test_hex_bins_cover_every_patient():
+    for i in range(12):
+        _make_patient(i, bmi=18.0 + i * 1.7, glucose=80.0 + i * 9.5, risk=float(i))
+
+    points = get_scatter(get_stats(background=False), mode="hex")
+    assert sum(point["count"] for point in points) == 12
+    # Every hexagon centre lies close to the points it holds
+    assert all(15 <= point["x"] <= 42 and 70 <= point["y"] <= 200 for point in points)
+
+
+def test_reservoir_sample_is_deterministic_and_bounded():
+    assert reservoir_sample(range(10), 20) == list(range(10))
+
+    first = reservoir_sample(range(1000), 50)
+    assert len(first) == 50
+    assert first == reservoir_sample(range(1000), 50)
+
+
+def test_sample_mode_is_cached_at_fixed_sizes(doctor_client):
+    for i in range(8):
+        _make_patient(i, bmi=20.0 + i)
+
+    response = doctor_client.get("/dashboard/api/stats?scatter=sample&max_points=5")
+    charts = response.get_json()["charts"]
+    assert charts["scatter_mode"] == "sample"
+    assert len(charts["scatter"]) == 5
+
+    # Drawn once at the smallest fixed size, outside the stats document
+    cached = PatientScatterSample._get_collection().find_one({"_id": SAMPLE_SIZES[0]})
+    assert cached["points"][:5] == charts["scatter"]
+    assert "scatter_samples" not in get_stats()
+    again = doctor_client.get("/dashboard/api/stats?scatter=sample&max_points=7").get_json()
+    assert again["charts"]["scatter"][:5] == charts["scatter"]
+    assert PatientScatterSample.objects.count() == 1
+
+
+def test_unknown_scatter_mode_is_rejected(doctor_client):
+    response = doctor_client.get("/dashboard/api/stats?scatter=heatmap")
+    assert response.status_code == 400
+
+
+def test_plaintext_kpis_facet():
+    for i, (risk, glucose) in enumerate([(5.0, 90.0), (25.0, 110.0), (85.0, 200.0), (45.0, 120.0)]):
+        _make_patient(i, risk=risk, glucose=glucose)
+
+    kpis = plaintext_kpis()
+    assert (kpis["total"], kpis["high_risk"]) == (4, 3)
+    assert kpis["avg_glucose"] == 130.0
+    assert kpis["risk_levels"] == {"Low": 1, "Moderate": 1, "High": 1, "Critical": 1}
+
+    assert plaintext_kpis({"stroke_risk": {"$lt": 30}})["total"] == 2
+
+
+def _make_dated_patient(i, entry_date, created_by="Doctor Client", risk=10.0):
+    patient = _make_patient(i, risk=risk)
+    patient.record_entry_date = entry_date
+    patient.created_by = created_by
+    return patient.save()
+
+
+def test_window_stats_sum_rollups():
+    reconcile_stats()
+    _make_dated_patient(0, datetime(2025, 3, 3, 9), risk=30.0)
+    _make_dated_patient(1, datetime(2025, 3, 4, 15), created_by="Nurse One")
+    moved = _make_dated_patient(2, datetime(2025, 3, 10, 11))
+    _make_dated_patient(3, datetime(2025, 4, 1, 8))
+
+    moved.record_entry_date = datetime(2025, 3, 5, 11)  # Moves between rollups
+    moved.save()
+
+    march = window_stats(datetime(2025, 3, 1), datetime(2025, 3, 31))
+    assert (march["total"], march["high_risk"]) == (3, 1)
+    assert march["risk_levels"] == {"Moderate": 1, "Low": 2}
+
+    doctor = window_stats(created_by="Doctor Client")
+    assert doctor["total"] == 3
+
+    # Rollups built incrementally match a full rebuild
+    reconcile_stats()
+    assert window_stats(datetime(2025, 3, 1), datetime(2025, 3, 31)) == march
+
+
+def test_trend_series():
+    reconcile_stats()
+    _make_dated_patient(0, datetime(2025, 3, 3, 9), risk=30.0)  # Monday
+    _make_dated_patient(1, datetime(2025, 3, 4, 15), risk=10.0)
+    _make_dated_patient(2, datetime(2025, 3, 12, 11), risk=5.0)
+
+    trends = trend_series(datetime(2025, 3, 3), datetime(2025, 3, 16))
+    assert len(trends["daily_new"]["labels"]) == 14
+    assert trends["daily_new"]["counts"][:2] == [1, 1]
+    assert sum(trends["daily_new"]["counts"]) == 3
+    assert trends["weekly_risk"] == {"labels": ["2025-03-03", "2025-03-10"], "mean_risk": [20.0, 5.0]}
+
+
+def test_stats_endpoint_filters(doctor_client):
+    _make_dated_patient(0, datetime(2025, 3, 3, 9), risk=30.0)
+    _make_dated_patient(1, datetime(2025, 3, 4, 15), created_by="Nurse One", risk=50.0)
+    _make_dated_patient(2, datetime(2025, 5, 1, 8))
+
+    response = doctor_client.get("/dashboard/api/stats?since=2025-03-01&until=2025-03-31&created_by=Doctor%20Client")
+    data = response.get_json()
+    assert response.status_code == 200
+    assert data["kpis"]["total"] == 1
+    assert [row["stroke_risk"] for row in data["table"]] == [30.0]
+    assert sum(point["count"] for point in data["charts"]["scatter"]) == 1
+    assert data["filters"] == {"since": "2025-03-01", "until": "2025-03-31", "created_by": "Doctor Client"}
+    assert sum(data["trends"]["daily_new"]["counts"]) == 1
+
+    assert doctor_client.get("/dashboard/api/stats?since=March").status_code == 400
+
+
+def test_filtered_scatter_summed_from_rollups(doctor_client, monkeypatch):
+    _make_dated_patient(0, datetime(2025, 3, 3, 9), risk=30.0)
+    _make_dated_patient(1, datetime(2025, 3, 4, 15), risk=50.0)
+    _make_dated_patient(2, datetime(2025, 5, 1, 8))
+    reconcile_stats()
+
+    def no_patient_scan():
+        raise AssertionError("filtered grid/hex scatter must not read patients")
+
+    monkeypatch.setattr(Patient, "_get_collection", no_patient_scan)
+    march = window_stats(datetime(2025, 3, 1), datetime(2025, 3, 31))
+    for mode in ("grid", "hex"):
+        points = filtered_scatter({}, march, mode)
+        assert sum(point["count"] for point in points) == 2
+
+
+def test_rollups_rebuilt_by_swapping_collections():
+    _make_dated_patient(0, datetime(2025, 3, 3, 9))
+    _make_dated_patient(1, datetime(2025, 3, 3, 10))
+    reconcile_stats()
+
+    collection = PatientDailyRollup._get_collection()
+    assert collection.count_documents({}) == 1
+    assert collection.find_one()["count"] == 2
+    assert not [name for name in collection.database.list_collection_names() if "_rebuild" in name]
+    assert window_stats(datetime(2025, 3, 3), datetime(2025, 3, 3))["scatter_bins"]
+
+
+def test_window_span_and_range_are_limited(doctor_client):
+    assert doctor_client.get("/dashboard/api/stats?since=0001-01-01").status_code == 400
+    assert doctor_client.get("/dashboard/api/stats?since=1970-01-01").status_code == 400
+    assert doctor_client.get("/dashboard/api/stats?until=2999-01-01").status_code == 400
+    assert doctor_client.get("/dashboard/api/stats?since=2020-01-01&until=2025-01-01").status_code == 400
+    assert doctor_client.get("/dashboard/api/stats?since=2024-01-01&until=2025-01-01").status_code == 200
+
+    trends = trend_series(datetime(2000, 1, 1), datetime(2025, 1, 1))
+    assert len(trends["daily_new"]["labels"]) == MAX_WINDOW_DAYS
+
+
+def test_get_stats_rebuilds_in_background():
+    _make_patient(0, risk=35.0)
+
+    # Returns at once with empty stats; the rebuild runs on its own thread
+    assert get_stats()["total"] == 0
+    start_background_reconcile().join(timeout=10)
+    assert get_stats()["total"] == 1
+
+
+def test_reconcile_skipped_while_another_holds_the_lock():
+    _make_patient(0)
+    collection = PatientStats._get_collection()
+    collection.insert_one({"_id": REBUILD_LOCK_KEY, "owner": "other", "locked_until": datetime.now() + timedelta(minutes=5)})
+
+    assert reconcile_stats() is None
+    assert get_stats(background=False)["total"] == 0
+
+    # A lock left behind by a crashed rebuild expires
+    collection.update_one({"_id": REBUILD_LOCK_KEY}, {"$set": {"locked_until": datetime.now() - timedelta(seconds=1)}})
+    assert reconcile_stats()["total"] == 1
+    assert collection.find_one({"_id": REBUILD_LOCK_KEY}) is None
+
+
+def test_concurrent_reconciles_leave_complete_rollups(monkeypatch):
+    _make_dated_patient(0, datetime(2025, 3, 3, 9))
+    _make_dated_patient(1, datetime(2025, 3, 3, 10))
+    _make_dated_patient(2, datetime(2025, 3, 4, 10))
+    live = PatientDailyRollup._get_collection()
+    live.database[f"{live.name}_rebuild_leftover"].insert_one({"day": datetime(2025, 3, 3)})
+
+    rebuild_rollups = dashboard_stats._rebuild_rollups
+
+    def slow_rebuild(rollups):
+        time.sleep(0.2)  # Keeps the first rebuild running while the second one starts
+        rebuild_rollups(rollups)
+
+    monkeypatch.setattr(dashboard_stats, "_rebuild_rollups", slow_rebuild)
+    start = threading.Barrier(2)
+    results = []
+
+    def run():
+        start.wait()
+        results.append(reconcile_stats())
+
+    threads = [threading.Thread(target=run) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    # One rebuild ran, the other saw the lock and backed off
+    assert sorted(result is None for result in results) == [False, True]
+    assert live.count_documents({}) == 2
+    assert sum(doc["count"] for doc in live.find()) == 3
+    assert window_stats(datetime(2025, 3, 3), datetime(2025, 3, 3))["total"] == 2
+    assert not [name for name in live.database.list_collection_names() if "_rebuild" in name]
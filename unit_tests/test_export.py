@@ -0,0 +1,86 @@
+# unit_tests/test_export.py
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+from app.models.log import ActivityLog
+from app.models.patient import Patient
+from app.utils.export_stream import gzip_stream, iter_chunks
+
+
+def _make_patient(i):
+    return Patient(
+        patient_id=f"5010{i:05d}",
+        name=f"Patient {i}",
+        age=40 + i,
+        gender="Female",
+        ever_married="Yes",
+        work_type="Private",
+        residence_type="Urban",
+        heart_disease="No",
+        hypertension="No",
+        avg_glucose_level=90.5,
+        bmi=24.1,
+        smoking_status="Never Smoked",
+        stroke_risk=5.0,
+        record_entry_date=datetime(2025, 1, 1) + timedelta(days=i),
+        created_by="Doctor User",
+    ).save()
+
+
+def test_iter_chunks():
+    assert list(iter_chunks(range(5), batch_size=2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_gzip_stream_round_trip():
+    chunks = ["line one\n", "line two\n"]
+    data = b"".join(gzip_stream(iter(chunks)))
+    assert gzip.decompress(data).decode() == "".join(chunks)
+
+
+def test_export_logs_ndjson(admin_client):
+    for i in range(3):
+        ActivityLog(client_ip="127.0.0.1", info=f"entry {i}", log_level=1).save()
+
+    response = admin_client.get("/export/logs/activity?format=ndjson")
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert "attachment" in response.headers["Content-Disposition"]
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert sorted(row["info"] for row in rows) == ["entry 0", "entry 1", "entry 2"]
+
+
+def test_export_patients_csv_gzip(admin_client):
+    for i in range(3):
+        _make_patient(i)
+
+    response = admin_client.get("/export/patients?format=csv&gzip=1")
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/gzip"
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.data).decode())))
+    assert [row["patient_id"] for row in rows] == ["501000002", "501000001", "501000000"]
+    # Encrypted fields come out decrypted
+    assert rows[0]["gender"] == "Female"
+    assert rows[0]["age"] == "42"
+
+
+def test_export_rejects_unknown_format(admin_client):
+    assert admin_client.get("/export/patients?format=xml").status_code == 400
+    assert admin_client.get("/export/logs/unknown").status_code == 404
+
+
+def test_export_csv_escapes_formula_cells(admin_client):
+    patient = _make_patient(0)
+    patient.name = "=HYPERLINK(\"http://evil\")"
+    patient.created_by = "@SUM(A1)"
+    patient.save()
+
+    response = admin_client.get("/export/patients?format=csv")
+
+    row = next(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert row["name"] == "'=HYPERLINK(\"http://evil\")"
+    assert row["created_by"] == "'@SUM(A1)"
+    assert row["age"] == "40"
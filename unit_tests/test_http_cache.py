@@ -0,0 +1,91 @@
+# unit_tests/test_http_cache.py
+import gzip
+import json
+from datetime import datetime
+import numpy as np
+import pytest
+from app.utils import http_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_fragments():
+    http_cache.clear_fragment_cache()
+    yield
+    http_cache.clear_fragment_cache()
+
+
+def test_fragment_rendered_once_per_role(doctor_client, monkeypatch):
+    rendered = []
+    real_render = http_cache.render_template
+
+    def counting_render(name):
+        rendered.append(name)
+        return real_render(name)
+
+    monkeypatch.setattr(http_cache, "render_template", counting_render)
+
+    first = doctor_client.get("/dashboard/view")
+    second = doctor_client.get("/dashboard/view")
+
+    assert first.status_code == second.status_code == 200
+    assert first.data == second.data
+    assert rendered == ["toolbar/dashboard.html"]
+    assert first.headers["Vary"] == "Cookie"
+
+
+def test_fragment_etag_depends_on_role_and_asset_version(app):
+    with app.test_request_context("/"):
+        doctor = http_cache.make_etag("fragment", "toolbar/dashboard.html", "Doctor", "v1")
+        nurse = http_cache.make_etag("fragment", "toolbar/dashboard.html", "Nurse", "v1")
+        bumped = http_cache.make_etag("fragment", "toolbar/dashboard.html", "Doctor", "v2")
+
+    assert len({doctor, nurse, bumped}) == 3
+
+
+def test_fragment_not_modified(doctor_client):
+    etag = doctor_client.get("/dashboard/view").headers["ETag"]
+    response = doctor_client.get("/dashboard/view", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+
+def test_templates_precompiled(app):
+    assert any(name == "toolbar/dashboard.html" for _, name in app.jinja_env.cache.keys())
+
+
+def test_large_json_is_gzipped(doctor_client, app):
+    app.config["COMPRESS_MIN_SIZE"] = 64
+    plain = doctor_client.get("/dashboard/api/stats")
+    compressed = doctor_client.get("/dashboard/api/stats", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in plain.headers
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["Vary"]
+    assert gzip.decompress(compressed.data) == plain.data
+
+
+def test_small_responses_stay_uncompressed(doctor_client, app):
+    app.config["COMPRESS_MIN_SIZE"] = 10 ** 6
+    response = doctor_client.get("/dashboard/api/stats", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+
+def test_html_fragment_is_never_compressed(doctor_client, app):
+    app.config["COMPRESS_MIN_SIZE"] = 64
+    first = doctor_client.get("/dashboard/view", headers={"Accept-Encoding": "gzip, br"})
+    assert "Content-Encoding" not in first.headers
+    assert not first.headers["ETag"].endswith('-gzip"')
+
+    again = doctor_client.get(
+        "/dashboard/view", headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["ETag"]}
+    )
+    assert again.status_code == 304
+
+
+def test_json_provider_handles_numpy(app):
+    payload = {"risk": np.float32(12.5), "count": np.int64(3), "values": np.arange(3), 2: "int key"}
+    with app.app_context():
+        assert json.loads(app.json.dumps(payload)) == {"2": "int key", "count": 3, "risk": 12.5, "values": [0, 1, 2]}
+        response = app.json.response(when=datetime(2025, 1, 2, 3, 4, 5))
+    assert json.loads(response.data) == {"when": "Thu, 02 Jan 2025 03:04:05 GMT"}
@@ -1,5 +1,14 @@
+import threading
 import pytest
-from app.utils.id_generator import IDGenerator
+from app.models.patient import Patient, PatientIDCounter
+from app.utils.id_generator import (
+    ID_BLOCK_SIZE,
+    IDS_PER_DAY,
+    IDGenerator,
+    PatientIDAllocator,
+    patient_id_allocator,
+)
+
 
 def test_generate_patient_id_format(current_date_portion):
     """Test if generated ID has correct format"""
@@ -10,6 +19,7 @@ def test_generate_patient_id_format(current_date_portion):
     assert patient_id.isdigit(), "ID should only contain digits"
     assert patient_id[:5] == current_date_portion, "ID should start with current date"
 
+
 def test_validate_patient_id(sample_valid_id, sample_invalid_ids):
     """Test ID validation function"""
     # Test valid ID
@@ -19,16 +29,87 @@ def test_validate_patient_id(sample_valid_id, sample_invalid_ids):
     for invalid_id in sample_invalid_ids:
         assert not IDGenerator.validate_patient_id(invalid_id), f"Should reject invalid ID: {invalid_id}"
 
+
 def test_check_patient_id():
     """Test if patient ID exists in database"""
     # Test with a new ID that shouldn't exist
     test_id = "123456789"
     assert IDGenerator.check_patient_id(test_id), "Should return True for non-existent ID"
 
+
 def test_id_uniqueness():
     """Test if generated IDs are unique"""
     ids = set()
     for _ in range(5):  # Generate 5 IDs
         new_id = IDGenerator.generate_patient_id()
         assert new_id not in ids, "Generated IDs should be unique"
-        ids.add(new_id)
\ No newline at end of file
+        ids.add(new_id)
+
+
+def test_ids_come_from_reserved_blocks(current_date_portion):
+    """Sequential allocation from the atomic counter, one round trip per block."""
+    patient_id_allocator.reset()
+    ids = [IDGenerator.generate_patient_id() for _ in range(ID_BLOCK_SIZE + 1)]
+
+    assert len(set(ids)) == len(ids)
+    assert all(i.startswith(current_date_portion) for i in ids)
+    assert PatientIDCounter.objects(prefix=current_date_portion).first().seq == 2 * ID_BLOCK_SIZE
+
+
+def test_allocator_skips_existing_ids(current_date_portion):
+    """IDs created before the counter existed are never handed out again."""
+    Patient._get_collection().insert_one({"patient_id": f"{current_date_portion}0042"})
+    patient_id_allocator.reset()
+
+    assert IDGenerator.generate_patient_id() == f"{current_date_portion}0043"
+
+
+def test_concurrent_allocators_never_collide():
+    """Separate workers share only the counter document."""
+    workers = [PatientIDAllocator(block_size=7) for _ in range(4)]
+    results = []
+
+    def run(allocator):
+        for _ in range(25):
+            results.extend(allocator.allocate(2))
+
+    threads = [threading.Thread(target=run, args=(w,)) for w in workers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(results) == len(set(results)) == 200
+
+
+def test_allocator_raises_when_day_exhausted(current_date_portion):
+    PatientIDCounter(prefix=current_date_portion, seq=IDS_PER_DAY - 1).save()
+    allocator = PatientIDAllocator()
+
+    assert allocator.allocate(1) == [f"{current_date_portion}9999"]
+    with pytest.raises(ValueError):
+        allocator.allocate(1)
+
+
+def test_reserve_ids_single_operation(current_date_portion):
+    patient_id_allocator.reset()
+    first = IDGenerator.reserve_ids(500)
+    second = IDGenerator.reserve_ids(3)
+
+    assert len(set(first + second)) == 503
+    assert all(len(i) == 9 and i.isdigit() and i.startswith(current_date_portion) for i in first + second)
+    assert PatientIDCounter.objects(prefix=current_date_portion).first().seq == 503
+    assert IDGenerator.reserve_ids(0) == []
+
+
+def test_oversized_reservation_consumes_nothing(current_date_portion):
+    """A reservation that does not fit fails without advancing the counter."""
+    patient_id_allocator.reset()
+    IDGenerator.reserve_ids(10)
+
+    with pytest.raises(ValueError):
+        IDGenerator.reserve_ids(IDS_PER_DAY + 2000)
+
+    assert PatientIDCounter.objects(prefix=current_date_portion).first().seq == 10
+    assert patient_id_allocator.remaining() == IDS_PER_DAY - 10
+    assert IDGenerator.generate_patient_id() == f"{current_date_portion}0010"
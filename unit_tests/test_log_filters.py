@@ -0,0 +1,121 @@
+# unit_tests/test_log_filters.py
+import os
+from datetime import datetime, timedelta
+import pytest
+from pymongo import MongoClient
+from app.models.log import SecurityLog
+from app.utils.pagination import keyset_filter
+from app.views.log_manager import LOG_SORT, build_log_filter
+
+# Explain plans need a real MongoDB server (mongomock does not implement explain)
+MONGO_TEST_URI = os.getenv("MONGO_TEST_URI")
+
+FILTER_COMBINATIONS = [
+    {"min_level": "3"},
+    {"min_level": "4", "max_level": "4"},
+    {"since": "2025-01-01T00:00:00", "until": "2025-01-02T00:00:00"},
+    {"user_name": "Admin User"},
+    {"client_ip": "10.0.0.1"},
+    {"client_ip": "10.0.0.1", "min_level": "4", "max_level": "4"},
+    {"user_name": "Admin User", "since": "2025-01-01T00:00:00"},
+    {"q": "failure"},
+    {"q": "failure", "client_ip": "10.0.0.1"},
+]
+
+
+def test_build_log_filter():
+    query = build_log_filter({
+        "min_level": "2",
+        "max_level": "4",
+        "since": "2025-01-01T00:00:00",
+        "user_name": " Admin User ",
+        "q": "Login failure",
+    })
+
+    assert query == {
+        "log_level": {"$gte": 2, "$lte": 4},
+        "timestamp": {"$gte": datetime(2025, 1, 1)},
+        "user_name": "Admin User",
+        "$text": {"$search": "Login failure"},
+    }
+    assert build_log_filter({}) == {}
+    assert build_log_filter({"min_level": "0", "max_level": "4"}) == {}
+
+
+@pytest.mark.parametrize("args", [
+    {"min_level": "5"},
+    {"min_level": "abc"},
+    {"min_level": "3", "max_level": "1"},
+    {"since": "yesterday"},
+    {"q": "x" * 500},
+])
+def test_build_log_filter_rejects_invalid(args):
+    with pytest.raises(ValueError):
+        build_log_filter(args)
+
+
+def test_filter_by_ip_and_level(admin_client):
+    """Brute-force lookup: level-4 entries from one client IP."""
+    base = datetime(2025, 1, 1)
+    for i in range(6):
+        SecurityLog(
+            timestamp=base + timedelta(minutes=i),
+            client_ip="10.0.0.1" if i % 2 else "10.0.0.2",
+            info="Login failure",
+            log_level=4 if i < 4 else 1,
+        ).save()
+
+    data = admin_client.get("/logs/api/activity?client_ip=10.0.0.1&min_level=4").get_json()
+
+    assert [log["client_ip"] for log in data["logs"]] == ["10.0.0.1", "10.0.0.1"]
+    assert all(log["log_level"] == 4 for log in data["logs"])
+
+
+def test_invalid_filter_rejected(admin_client):
+    response = admin_client.get("/logs/api/activity?min_level=9")
+    assert response.status_code == 400
+
+
+def _plan_stages(plan):
+    """Yields every stage name in an explain plan tree."""
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+@pytest.mark.skipif(not MONGO_TEST_URI, reason="Set MONGO_TEST_URI to a real MongoDB to check explain plans")
+@pytest.mark.parametrize("args", FILTER_COMBINATIONS)
+@pytest.mark.parametrize("with_cursor", [False, True])
+def test_filters_use_indexes(args, with_cursor):
+    """Every supported filter combination is answered from an index, never a COLLSCAN."""
+    client = MongoClient(MONGO_TEST_URI)
+    collection = client.get_default_database("strokevision_explain_test")["security_logs"]
+    collection.drop()
+
+    for spec in SecurityLog._meta["index_specs"]:
+        spec = spec.copy()
+        fields = spec.pop("fields")
+        collection.create_index(fields, **spec)
+
+    collection.insert_many([
+        {"timestamp": datetime(2025, 1, 1) + timedelta(minutes=i), "client_ip": f"10.0.0.{i % 5}",
+         "user_name": "Admin User" if i % 3 else "Doctor User", "info": "Login failure" if i % 2 else "Viewed settings",
+         "log_level": i % 5}
+        for i in range(500)
+    ])
+
+    query = build_log_filter(args)
+    if with_cursor:
+        last = collection.find_one(sort=LOG_SORT)
+        query.update(keyset_filter("timestamp", last["timestamp"], last["_id"]))
+
+    plan = collection.find(query).sort(LOG_SORT).limit(31).explain()
+    stages = set(_plan_stages(plan["queryPlanner"]["winningPlan"]))
+
+    client.drop_database(collection.database.name)
+
+    assert "COLLSCAN" not in stages
+    assert stages & {"IXSCAN", "TEXT", "TEXT_MATCH", "TEXT_OR"}
@@ -0,0 +1,63 @@
+# unit_tests/test_log_manager.py
+from datetime import datetime, timedelta
+from app.models.log import SecurityLog
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.views.log_manager import LOGS_PER_PAGE
+
+
+def _seed_security_logs(count):
+    base = datetime(2025, 1, 1)
+    for i in range(count):
+        SecurityLog(
+            # Pairs of identical timestamps make the _id tie-breaker matter
+            timestamp=base + timedelta(seconds=i // 2),
+            client_ip="127.0.0.1",
+            info=f"entry {i}",
+            log_level=1,
+        ).save()
+
+
+def test_cursor_round_trip():
+    stamp = datetime(2025, 1, 1, 12, 30, 15, 123000)
+    oid = SecurityLog(client_ip="x", info="x", log_level=1).save().id
+
+    assert decode_cursor(encode_cursor(stamp, oid)) == (stamp, oid)
+
+
+def test_cursor_pagination_walks_all_logs(admin_client):
+    """Following next_cursor returns every entry exactly once, newest first."""
+    _seed_security_logs(LOGS_PER_PAGE * 2 + 5)
+    total = SecurityLog.objects.count()
+
+    seen = []
+    url = "/logs/api/activity"
+    while True:
+        data = admin_client.get(url).get_json()
+        seen.extend(log["info"] for log in data["logs"])
+        if not data["has_more"]:
+            assert data["next_cursor"] is None
+            break
+        url = f"/logs/api/activity?cursor={data['next_cursor']}"
+
+    assert len(seen) == total
+    assert len(set(seen)) == total
+
+
+def test_legacy_page_parameter(admin_client):
+    """?page=N keeps working and reports has_more without a count."""
+    _seed_security_logs(LOGS_PER_PAGE + 3)
+    total = SecurityLog.objects.count()
+
+    first = admin_client.get("/logs/api/activity?page=1").get_json()
+    last_page = (total - 1) // LOGS_PER_PAGE + 1
+    last = admin_client.get(f"/logs/api/activity?page={last_page}").get_json()
+
+    assert len(first["logs"]) == LOGS_PER_PAGE
+    assert first["has_more"] is True
+    assert last["has_more"] is False
+    assert len(last["logs"]) == total - (last_page - 1) * LOGS_PER_PAGE
+
+
+def test_invalid_cursor_rejected(admin_client):
+    response = admin_client.get("/logs/api/activity?cursor=not-a-cursor")
+    assert response.status_code == 400
@@ -0,0 +1,108 @@
+# unit_tests/test_log_retention.py
+import gzip
+import json
+from datetime import datetime, timedelta
+from app.models.log import ActivityLog, SecurityLog
+from app.utils.log_retention import (
+    DEFAULT_RETENTION_DAYS,
+    archive_expired_logs,
+    compute_expire_at,
+    log_collections,
+    parse_retention_days,
+    partition_name,
+)
+from app.utils.log_utils import log_activity
+
+
+def _make_log(LogModel, level, age_days, now):
+    LogModel(
+        timestamp=now - timedelta(days=age_days),
+        client_ip="127.0.0.1",
+        info=f"level {level} entry, {age_days} days old",
+        log_level=level,
+    ).save()
+
+
+def test_parse_retention_days():
+    assert parse_retention_days("1,2,3,4,0") == {0: 1, 1: 2, 2: 3, 3: 4, 4: 0}
+    assert parse_retention_days(None) == DEFAULT_RETENTION_DAYS
+    assert parse_retention_days("1,2,3") == DEFAULT_RETENTION_DAYS
+    assert parse_retention_days("a,b,c,d,e") == DEFAULT_RETENTION_DAYS
+
+
+def test_compute_expire_at():
+    now = datetime(2025, 1, 1)
+    retention = {0: 7, 1: 30, 2: 90, 3: 365, 4: 0}
+
+    assert compute_expire_at(now, 1, retention) == now + timedelta(days=30)
+    assert compute_expire_at(now, 1, retention, grace_days=7) == now + timedelta(days=37)
+    assert compute_expire_at(now, 4, retention) is None
+
+
+def test_log_entries_get_expire_at(app):
+    app.config["LOG_RETENTION_DAYS"] = {0: 7, 1: 30, 2: 90, 3: 365, 4: 0}
+    app.config["LOG_ARCHIVE_DIR"] = None
+
+    with app.test_request_context("/"):
+        log_activity("Short lived", level=1)
+        log_activity("Kept forever", level=4)
+
+    short = ActivityLog.objects(log_level=1).first()
+    kept = ActivityLog.objects(log_level=4).first()
+    assert short.expire_at == short.timestamp + timedelta(days=30)
+    assert kept.expire_at is None
+
+
+def test_archive_expired_logs(tmp_path):
+    """Expired entries are written to gzip JSONL and removed; fresh entries stay."""
+    now = datetime.now()
+    retention = {0: 7, 1: 30, 2: 90, 3: 365, 4: 365}
+
+    _make_log(SecurityLog, 1, 40, now)  # expired
+    _make_log(SecurityLog, 1, 10, now)  # fresh
+    _make_log(SecurityLog, 2, 100, now)  # expired
+    _make_log(SecurityLog, 4, 100, now)  # fresh
+
+    archived = archive_expired_logs(SecurityLog, retention, str(tmp_path), now=now)
+
+    assert archived == 2
+    assert SecurityLog.objects.count() == 2
+
+    files = list(tmp_path.glob("security_logs_*.jsonl.gz"))
+    assert len(files) == 1
+    with gzip.open(files[0], "rt", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert sorted(r["log_level"] for r in rows) == [1, 2]
+
+
+def test_monthly_partitions(app, tmp_path):
+    """Entries go to the month's partition and empty past partitions are dropped."""
+    app.config["LOG_MONTHLY_COLLECTIONS"] = True
+
+    with app.test_request_context("/"):
+        log_activity("Partitioned entry", level=3)
+
+    now = datetime.now()
+    names = [c.name for c in log_collections(ActivityLog, include_partitions=True)]
+    assert names == [partition_name(ActivityLog, now), "activity_logs"]
+
+    old = ActivityLog._get_db()[partition_name(ActivityLog, datetime(2020, 1, 1))]
+    old.insert_one({"timestamp": datetime(2020, 1, 1), "client_ip": "1.1.1.1", "info": "old", "log_level": 1})
+
+    archive_expired_logs(ActivityLog, DEFAULT_RETENTION_DAYS, str(tmp_path), now=now)
+
+    names = [c.name for c in log_collections(ActivityLog, include_partitions=True)]
+    assert partition_name(ActivityLog, datetime(2020, 1, 1)) not in names
+    assert partition_name(ActivityLog, now) in names
+
+
+def test_log_collections_ranked_by_newest_entry(app):
+    """After monthly collections are turned off, the base collection holds the newest entries."""
+    partition = ActivityLog._get_db()[partition_name(ActivityLog, datetime(2024, 5, 1))]
+    partition.insert_one({"timestamp": datetime(2024, 5, 20), "client_ip": "1.1.1.1", "info": "old", "log_level": 1})
+
+    with app.test_request_context("/"):
+        log_activity("Written after partitioning was disabled", level=1)
+
+    names = [c.name for c in log_collections(ActivityLog, include_partitions=True)]
+    assert names == ["activity_logs", partition_name(ActivityLog, datetime(2024, 5, 1))]
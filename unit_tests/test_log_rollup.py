@@ -0,0 +1,119 @@
+# unit_tests/test_log_rollup.py
+from datetime import datetime
+import pytest
+from pymongo.errors import BulkWriteError
+from app.models.log import SecurityLogRollup
+from app.utils.log_rollup import get_security_stats, record_security_event, security_rollups, truncate_bucket
+from app.utils.log_utils import log_sampler, log_security
+
+
+@pytest.fixture(autouse=True)
+def reset_buffers():
+    security_rollups.reset()
+    log_sampler.reset()
+    yield
+    security_rollups.reset()
+    log_sampler.reset()
+
+
+def test_truncate_bucket():
+    stamp = datetime(2025, 3, 4, 10, 42, 17, 500)
+    assert truncate_bucket(stamp, "minute") == datetime(2025, 3, 4, 10, 42)
+    assert truncate_bucket(stamp, "hour") == datetime(2025, 3, 4, 10, 0)
+
+
+def test_record_security_event_increments_both_granularities():
+    # Recent timestamps only: mongomock applies the TTL index on expire_at
+    stamp = datetime.now()
+    for _ in range(3):
+        record_security_event(stamp, 4, "10.0.0.1", "Anonymous")
+
+    assert SecurityLogRollup.objects.count() == 2
+    assert {r.granularity: r.count for r in SecurityLogRollup.objects} == {"minute": 3, "hour": 3}
+
+
+def test_security_stats_from_rollups():
+    now = datetime.now()
+    for _ in range(7):
+        record_security_event(now, 4, "10.0.0.1", "Anonymous")
+    record_security_event(now, 4, "10.0.0.2", "Anonymous")
+    record_security_event(now, 1, "10.0.0.3", "Admin User")
+
+    stats = get_security_stats("1h", now=now)
+
+    assert stats["granularity"] == "minute"
+    assert len(stats["labels"]) == 60
+    assert stats["levels"]["4"][-1] == 8
+    assert stats["levels"]["1"][-1] == 1
+    assert stats["top_ips"][0] == {"client_ip": "10.0.0.1", "count": 7}
+    assert all(item["client_ip"] != "10.0.0.3" for item in stats["top_ips"])
+
+
+def test_security_stats_rejects_unknown_window():
+    with pytest.raises(ValueError):
+        get_security_stats("1y")
+
+
+def test_log_security_updates_rollup(app):
+    with app.test_request_context("/", environ_base={"REMOTE_ADDR": "10.0.0.9"}):
+        log_security("Login failure", level=4)
+
+    stats = get_security_stats("24h")
+    assert stats["levels"]["4"][-1] == 1
+    assert stats["top_ips"] == [{"client_ip": "10.0.0.9", "count": 1}]
+
+
+def test_buffered_events_are_written_in_one_flush(app):
+    stamp = datetime.now()
+    for _ in range(5):
+        record_security_event(stamp, 4, "10.0.0.1", "Anonymous", flush_seconds=60)
+
+    assert SecurityLogRollup.objects.count() == 0
+    # Reading the stats flushes this worker's buffer first
+    assert get_security_stats("1h", now=stamp)["levels"]["4"][-1] == 5
+    assert {r.granularity: r.count for r in SecurityLogRollup.objects} == {"minute": 5, "hour": 5}
+
+
+def test_flush_is_one_bulk_write_and_keeps_failed_ops(monkeypatch):
+    stamp = datetime.now()
+    record_security_event(stamp, 4, "10.0.0.1", "Anonymous", flush_seconds=60)
+    record_security_event(stamp, 3, "10.0.0.2", "Anonymous", flush_seconds=60)
+    calls = []
+
+    class FailingCollection:
+        def bulk_write(self, operations, ordered=True):
+            calls.append((len(operations), ordered))
+            raise BulkWriteError({"writeErrors": [{"index": 0, "code": 11000, "errmsg": "duplicate"}]})
+
+    monkeypatch.setattr(SecurityLogRollup, "_get_collection", classmethod(lambda cls: FailingCollection()))
+    with pytest.raises(BulkWriteError):
+        security_rollups.flush()
+    assert calls == [(4, False)]
+
+    # Only the failed operation is retried
+    monkeypatch.undo()
+    assert security_rollups.flush() == 1
+    assert SecurityLogRollup.objects.count() == 1
+
+
+def test_suppressed_entries_counted_under_their_own_source(app):
+    app.config.update({"LOG_SAMPLE_LIMIT": 1, "LOG_SAMPLE_MAX_LEVEL": 4, "LOG_SAMPLE_WINDOW_SECONDS": 60})
+
+    for _ in range(3):
+        with app.test_request_context("/", environ_base={"REMOTE_ADDR": "10.0.0.1"}):
+            log_security("Login failure", level=4)
+    with app.test_request_context("/", environ_base={"REMOTE_ADDR": "10.0.0.2"}):
+        log_security("Login failure", level=4)
+
+    # 10.0.0.2 has its own sampler window, so its first entry is written and carries nothing from 10.0.0.1
+    stats = get_security_stats("24h")
+    assert stats["top_ips"] == [{"client_ip": "10.0.0.1", "count": 1}, {"client_ip": "10.0.0.2", "count": 1}]
+
+
+def test_security_stats_endpoint(admin_client):
+    data = admin_client.get("/admin/dashboard/api/security-stats?window=24h").get_json()
+    assert data["success"] is True
+    assert len(data["labels"]) == 24
+
+    response = admin_client.get("/admin/dashboard/api/security-stats?window=bogus")
+    assert response.status_code == 400
@@ -0,0 +1,142 @@
+# unit_tests/test_log_utils.py
+import pytest
+from app.models.log import ActivityLog, SecurityLog
+import app.utils.log_utils as log_utils
+from app.utils.log_utils import LogSampler, log_sampler, log_activity, log_security
+
+
+@pytest.fixture(autouse=True)
+def reset_sampler():
+    log_sampler.reset()
+    yield
+    log_sampler.reset()
+
+
+def test_sampler_limits_identical_messages():
+    """Only `limit` identical entries pass per window; the rest are counted."""
+    sampler = LogSampler()
+    key = ("activity_logs", 1, "Viewed patient list")
+
+    results = [sampler.allow(key, limit=2, window=1.0, now=0.1 * i) for i in range(5)]
+
+    assert [allowed for allowed, _ in results] == [True, True, False, False, False]
+
+
+def test_sampler_reports_suppressed_count_in_next_window():
+    """The first entry after the window rolls over carries the suppressed count."""
+    sampler = LogSampler()
+    key = ("security_logs", 1, "Viewed settings.")
+
+    for i in range(4):
+        sampler.allow(key, limit=1, window=1.0, now=0.1 * i)
+
+    assert sampler.allow(key, limit=1, window=1.0, now=1.5) == (True, 3)
+    assert sampler.allow(key, limit=1, window=1.0, now=3.0) == (True, 0)
+
+
+def test_sampler_hands_out_expired_suppressed_counts():
+    """Keys that are never logged again give up their count once the window has passed."""
+    sampler = LogSampler()
+    key = ("security_logs", 1, "Viewed settings.", "10.0.0.1", "Admin User")
+
+    for i in range(3):
+        sampler.allow(key, limit=1, window=1.0, now=0.1 * i, context="ctx")
+
+    assert sampler.expired(window=1.0, now=0.5) == []
+    assert sampler.expired(window=1.0, now=1.5) == [(key, 2, "ctx")]
+    # Handed out once: the key is gone, so the next entry carries nothing
+    assert sampler.expired(window=1.0, now=3.0) == []
+    assert sampler.allow(key, limit=1, window=1.0, now=3.0) == (True, 0)
+
+
+def test_suppressed_count_written_when_message_stops(app, monkeypatch):
+    """A message that is never logged again still gets a summary entry for its suppressed count."""
+    clock = [100.0]
+    monkeypatch.setattr(log_utils.time, "monotonic", lambda: clock[0])
+    app.config.update({"LOG_SAMPLE_LIMIT": 1, "LOG_SAMPLE_MAX_LEVEL": 1, "LOG_SAMPLE_WINDOW_SECONDS": 1})
+
+    with app.test_request_context("/"):
+        for _ in range(4):
+            log_activity("Viewed patient list", level=1)
+        clock[0] += 2
+        log_activity("Opened settings", level=1)
+
+    assert sorted(log.info for log in ActivityLog.objects) == [
+        "Opened settings",
+        "Viewed patient list",
+        "Viewed patient list (+3 similar entries suppressed)",
+    ]
+
+
+def test_failed_summary_does_not_lose_other_counts(app, monkeypatch):
+    """Each flushed summary is saved on its own, so one failure keeps the rest."""
+    clock = [100.0]
+    monkeypatch.setattr(log_utils.time, "monotonic", lambda: clock[0])
+    app.config.update({"LOG_SAMPLE_LIMIT": 1, "LOG_SAMPLE_MAX_LEVEL": 1, "LOG_SAMPLE_WINDOW_SECONDS": 1})
+
+    with app.test_request_context("/"):
+        for message in ("First message", "Second message"):
+            for _ in range(3):
+                log_activity(message, level=1)
+        clock[0] += 2
+
+        save_log = log_utils._save_log
+        failed = []
+
+        def failing_first_summary(LogModel, info_message, *args, **kwargs):
+            if "suppressed" in info_message and not failed:
+                failed.append(info_message)
+                raise RuntimeError("write failed")
+            return save_log(LogModel, info_message, *args, **kwargs)
+
+        monkeypatch.setattr(log_utils, "_save_log", failing_first_summary)
+        log_activity("Opened settings", level=1)
+
+    summaries = [log.info for log in ActivityLog.objects if "suppressed" in log.info]
+    assert len(failed) == 1
+    assert len(summaries) == 1 and summaries[0] != failed[0]
+    assert ActivityLog.objects(info="Opened settings").count() == 1
+
+
+def test_min_level_filters_collection(app):
+    """Entries below the configured minimum level are not written."""
+    app.config["LOG_MIN_LEVELS"] = {"activity_logs": 2, "security_logs": 0}
+
+    with app.test_request_context("/"):
+        log_activity("Low level activity", level=1)
+        log_activity("Warning activity", level=2)
+        log_security("Low level security", level=1)
+
+    assert ActivityLog.objects.count() == 1
+    assert ActivityLog.objects.first().info == "Warning activity"
+    assert SecurityLog.objects.count() == 1
+
+
+def test_sampling_never_drops_warnings(app):
+    """Levels above LOG_SAMPLE_MAX_LEVEL bypass the sampler."""
+    app.config.update({"LOG_SAMPLE_LIMIT": 1, "LOG_SAMPLE_MAX_LEVEL": 1, "LOG_SAMPLE_WINDOW_SECONDS": 60})
+
+    with app.test_request_context("/"):
+        for _ in range(5):
+            log_security("Viewed settings.", level=1)
+            log_security("Login failure", level=4)
+
+    assert SecurityLog.objects(log_level=1).count() == 1
+    assert SecurityLog.objects(log_level=4).count() == 5
+
+
+def test_client_context_cached_per_request(app):
+    """IP/OS are parsed once per request and reused for every log call."""
+    from app.utils.log_utils import _get_client_context, _parse_os_from_user_agent
+
+    _parse_os_from_user_agent.cache_clear()
+    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)", "X-Forwarded-For": "10.0.0.9, 10.0.0.1"}
+
+    with app.test_request_context("/", headers=headers):
+        first = _get_client_context()
+        assert _get_client_context() is first
+        assert first == {"client_ip": "10.0.0.9", "client_os": "Windows"}
+
+    with app.test_request_context("/", headers=headers):
+        assert _get_client_context() is not first
+        assert _parse_os_from_user_agent.cache_info().hits == 1
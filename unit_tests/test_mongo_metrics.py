@@ -0,0 +1,80 @@
+# unit_tests/test_mongo_metrics.py
+from types import SimpleNamespace
+from pymongo import MongoClient
+from app.utils.mongo_metrics import MongoCommandMetrics, available_compressors, mongo_client_options, mongo_metrics
+
+AJAX = {"X-Requested-With": "XMLHttpRequest"}
+
+
+def _started(name, command, request_id, connection=("localhost", 27017)):
+    return SimpleNamespace(command_name=name, command=command, request_id=request_id, connection_id=connection)
+
+
+def _finished(request_id, micros, connection=("localhost", 27017)):
+    return SimpleNamespace(request_id=request_id, connection_id=connection, duration_micros=micros)
+
+
+def test_only_installed_compressors_are_offered(monkeypatch):
+    monkeypatch.setattr("app.utils.mongo_metrics.find_spec", lambda name: None)
+    assert available_compressors("zstd, snappy,zlib,bogus") == ["zlib"]
+    assert available_compressors("") == []
+
+
+def test_client_options_are_valid_mongo_client_kwargs(app):
+    options = mongo_client_options(app.config)
+
+    assert options["maxPoolSize"] == 50
+    assert options["event_listeners"] == [mongo_metrics]
+    client = MongoClient("mongodb://localhost:27017/test", connect=False, **options)
+    client.close()
+
+
+def test_metrics_can_be_disabled(app):
+    app.config["MONGO_COMMAND_METRICS"] = False
+    assert "event_listeners" not in mongo_client_options(app.config)
+
+
+def test_listener_histograms_by_command_and_endpoint(app):
+    metrics = MongoCommandMetrics()
+
+    with app.test_request_context("/dashboard/api/stats"):
+        metrics.started(_started("find", {"find": "patients"}, 1))
+        metrics.started(_started("find", {"find": "patients"}, 2))
+    metrics.succeeded(_finished(1, 800))
+    metrics.failed(_finished(2, 30000))
+
+    metrics.started(_started("getMore", {"getMore": 9, "collection": "activity_logs"}, 3))
+    metrics.succeeded(_finished(3, 1500))
+    metrics.started(_started("hello", {"hello": 1}, 4))
+    metrics.succeeded(_finished(4, 100))
+
+    snapshot = metrics.snapshot()
+    find = snapshot["commands"][0]
+    assert (find["collection"], find["command"]) == ("patients", "find")
+    assert find["count"] == 2 and find["failures"] == 1
+    assert find["buckets"]["<=1"] == 1 and find["buckets"]["<=50"] == 1
+    assert find["p50_ms"] == 1 and find["p95_ms"] == 50
+    assert snapshot["commands"][1]["collection"] == "activity_logs"
+    assert len(snapshot["commands"]) == 2  # hello is handshake chatter
+
+    endpoints = {row["endpoint"]: row["count"] for row in snapshot["endpoints"]}
+    assert endpoints == {"dashboard.get_dashboard_stats": 2, "(no request)": 1}
+
+    metrics.reset()
+    assert metrics.snapshot()["commands"] == []
+
+
+def test_admin_metrics_endpoint(admin_client):
+    response = admin_client.get("/admin/dashboard/api/mongo-metrics", headers=AJAX)
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert data["success"]
+    assert data["pool"]["max_pool_size"] == 50
+    assert "commands" in data and "endpoints" in data
+    assert data["health"]["status"] in ("up", "down")
+
+
+def test_metrics_endpoint_is_admin_only(doctor_client):
+    response = doctor_client.get("/admin/dashboard/api/mongo-metrics", headers=AJAX)
+    assert response.status_code in (302, 401, 403)
@@ -0,0 +1,124 @@
+# unit_tests/test_password_hasher.py
+import threading
+import pytest
+from app import bcrypt, db
+from app.models.user import User
+from app.utils.password_hasher import PasswordHasherBusy, hash_cost, password_hasher
+
+
+@pytest.fixture
+def cheap_rounds():
+    """bcrypt at its minimum cost so the tests stay fast."""
+    password_hasher.log_rounds = 4
+    yield
+
+
+def test_hash_and_verify_on_pool(app, cheap_rounds):
+    hashed = password_hasher.hash("Secret123!")
+
+    assert hash_cost(hashed) == 4
+    assert password_hasher.verify(hashed, "Secret123!")
+    assert not password_hasher.verify(hashed, "wrong")
+
+    stats = password_hasher.stats()
+    assert stats["completed"] == 3
+    assert stats["rejected"] == 0
+    assert stats["in_flight"] == 0
+
+
+def test_needs_rehash_when_cost_changes(app, cheap_rounds):
+    hashed = password_hasher.hash("Secret123!")
+    assert not password_hasher.needs_rehash(hashed)
+
+    password_hasher.log_rounds = 5
+    assert password_hasher.needs_rehash(hashed)
+    assert not password_hasher.needs_rehash("not-a-bcrypt-hash")
+
+
+def test_saturated_pool_raises_busy(app, cheap_rounds):
+    password_hasher._slots = threading.BoundedSemaphore(1)
+    password_hasher._slots.acquire()
+    password_hasher.queue_timeout = 0.01
+
+    with pytest.raises(PasswordHasherBusy):
+        password_hasher.hash("Secret123!")
+    assert password_hasher.stats()["rejected"] == 1
+
+
+def test_login_sheds_with_503_when_saturated(app, client, _db, cheap_rounds):
+    with app.app_context():
+        user = User(name="Nurse", email="nurse@example.com", email_hash=User.hash_email("nurse@example.com"), role="Nurse")
+        user.set_password("NursePass123!")
+        db.session.add(user)
+        db.session.commit()
+
+    password_hasher._slots = threading.BoundedSemaphore(1)
+    password_hasher._slots.acquire()
+    password_hasher.queue_timeout = 0.01
+
+    response = client.post("/auth/login", data={"email": "nurse@example.com", "password": "NursePass123!"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_login_rehashes_when_cost_changes(app, client, _db, cheap_rounds):
+    with app.app_context():
+        user = User(name="Nurse", email="nurse@example.com", email_hash=User.hash_email("nurse@example.com"), role="Nurse")
+        user.password = bcrypt.generate_password_hash("NursePass123!", 4).decode("utf-8")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    password_hasher.log_rounds = 5
+    client.post("/auth/login", data={"email": "nurse@example.com", "password": "NursePass123!"})
+
+    with app.app_context():
+        stored = db.session.get(User, user_id).password
+    assert hash_cost(stored) == 5
+    assert password_hasher.verify(stored, "NursePass123!")
+
+
+def test_admin_reset_sheds_with_503_when_saturated(app, admin_client, cheap_rounds):
+    with app.app_context():
+        user = User(name="Nurse", email="nurse@example.com", email_hash=User.hash_email("nurse@example.com"), role="Nurse")
+        user.password = "unchanged"
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    password_hasher._slots = threading.BoundedSemaphore(1)
+    password_hasher._slots.acquire()
+    password_hasher.queue_timeout = 0.01
+
+    response = admin_client.post(f"/admin/api/users/reset-password/{user_id}", headers={"X-Requested-With": "XMLHttpRequest"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    with app.app_context():
+        assert db.session.get(User, user_id).password == "unchanged"
+
+
+def test_admin_metrics_expose_queue_and_rejections(app, admin_client, cheap_rounds):
+    password_hasher.init_app(app, bcrypt)  # Drops the login's own call from the metrics
+    password_hasher.log_rounds = 4
+    password_hasher.verify(password_hasher.hash("Secret123!"), "Secret123!")
+    password_hasher._slots = threading.BoundedSemaphore(1)
+    password_hasher._slots.acquire()
+    password_hasher.queue_timeout = 0.01
+    with pytest.raises(PasswordHasherBusy):
+        password_hasher.hash("Secret123!")
+
+    response = admin_client.get("/admin/dashboard/api/password-hasher-metrics", headers={"X-Requested-With": "XMLHttpRequest"})
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert data["success"]
+    assert (data["completed"], data["rejected"], data["in_flight"]) == (2, 1, 0)
+    assert set(data["queue_ms"]) == {"p50", "p95", "max"}
+    assert data["run_ms"]["max"] > 0
+
+
+def test_password_hasher_metrics_are_admin_only(doctor_client):
+    response = doctor_client.get("/admin/dashboard/api/password-hasher-metrics", headers={"X-Requested-With": "XMLHttpRequest"})
+    assert response.status_code in (302, 401, 403)
@@ -0,0 +1,130 @@
+# unit_tests/test_patient_api.py
+from datetime import datetime, timedelta
+import pytest
+from app.models.patient import Patient
+from app.utils.patient_cache import patient_count_cache
+
+AJAX = {"X-Requested-With": "XMLHttpRequest"}
+
+
+@pytest.fixture(autouse=True)
+def reset_count_cache():
+    patient_count_cache.invalidate()
+    yield
+    patient_count_cache.invalidate()
+
+
+def _make_patient(i, entry_date=None):
+    return Patient(
+        patient_id=f"5020{i:05d}",
+        name=f"Patient {i}",
+        age=40,
+        gender="Male",
+        ever_married="Yes",
+        work_type="Private",
+        residence_type="Urban",
+        heart_disease="No",
+        hypertension="No",
+        avg_glucose_level=95.0,
+        bmi=25.0,
+        smoking_status="Never Smoked",
+        stroke_risk=10.0,
+        record_entry_date=entry_date or datetime(2025, 1, 1) + timedelta(hours=i),
+        created_by="Doctor Client",
+    ).save()
+
+
+def test_count_cache_refreshed_by_writes():
+    _make_patient(0)
+    assert patient_count_cache.get() == 1
+
+    patient = _make_patient(1)
+    assert patient_count_cache.get() == 2
+
+    patient.name = "Renamed"
+    patient.save()
+    assert patient_count_cache.get() == 2
+
+    patient.delete()
+    assert patient_count_cache.get() == 1
+
+
+def test_cursor_pagination_walks_all_patients(doctor_client):
+    same_time = datetime(2025, 2, 1)
+    for i in range(45):
+        # Ties on record_entry_date are broken by _id
+        _make_patient(i, entry_date=same_time if i % 3 == 0 else None)
+
+    seen, token = [], None
+    while True:
+        url = "/patient/api/data" + (f"?cursor={token}" if token else "")
+        data = doctor_client.get(url, headers=AJAX).get_json()
+        seen.extend(p["patient_id"] for p in data["patients"])
+        token = data["next_cursor"]
+        if not data["has_next"]:
+            break
+
+    assert len(seen) == len(set(seen)) == 45
+    assert data["total_count"] == 45
+
+
+def test_invalid_cursor_rejected(doctor_client):
+    response = doctor_client.get("/patient/api/data?cursor=not-a-cursor", headers=AJAX)
+    assert response.status_code == 400
+
+
+def test_loading_simulation_off_by_default(app, doctor_client, monkeypatch):
+    calls = []
+    monkeypatch.setattr("app.views.patient_manager.time.sleep", calls.append)
+
+    doctor_client.get("/patient/api/data", headers=AJAX)
+    assert calls == []
+
+    app.config["PATIENT_LIST_SIMULATE_LOADING"] = True
+    doctor_client.get("/patient/api/data", headers=AJAX)
+    assert calls == [app.config["PATIENT_LIST_SIMULATED_DELAY"]]
+
+
+def test_has_next_from_extra_row(doctor_client):
+    """Exactly two full pages: the second page must not claim another one."""
+    for i in range(40):
+        _make_patient(i)
+
+    first = doctor_client.get("/patient/api/data", headers=AJAX).get_json()
+    second = doctor_client.get(f"/patient/api/data?cursor={first['next_cursor']}", headers=AJAX).get_json()
+
+    assert first["has_next"] is True
+    assert len(second["patients"]) == 20
+    assert second["has_next"] is False
+    assert second["next_cursor"] is None
+
+
+def test_list_ordering_is_indexed():
+    keys = [spec["fields"] for spec in Patient._meta["index_specs"]]
+    assert [("record_entry_date", -1), ("_id", -1)] in keys
+
+
+def test_details_conditional_get(doctor_client):
+    patient = _make_patient(0)
+    url = f"/patient/views/details/{patient.patient_id}"
+
+    first = doctor_client.get(url, headers=AJAX)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert not etag.startswith("W/")
+
+    again = doctor_client.get(url, headers={**AJAX, "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+
+    patient.updated_at = datetime.now()
+    patient.save()
+
+    changed = doctor_client.get(url, headers={**AJAX, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_list_fragment_conditional_get(doctor_client):
+    etag = doctor_client.get("/patient/views/list").headers["ETag"]
+    assert doctor_client.get("/patient/views/list", headers={"If-None-Match": etag}).status_code == 304
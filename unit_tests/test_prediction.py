@@ -15,4 +15,11 @@ def test_invalid_input(invalid_patient):
     predictor = StrokePredictor()
     with pytest.raises(ValueError) as exc_info:
         predictor.predict_risk(invalid_patient)
-    assert "Age must be between 0 and 120" in str(exc_info.value)
\ No newline at end of file
+    assert "Age must be between 0 and 120" in str(exc_info.value)
+
+
+def test_batch_prediction_matches_single(high_risk_patient, low_risk_patient):
+    predictor = StrokePredictor()
+    rows = [high_risk_patient, low_risk_patient, high_risk_patient]
+    risks = predictor.predict_risks(rows)
+    assert risks == pytest.approx([predictor.predict_risk(row) for row in rows], abs=0.05)
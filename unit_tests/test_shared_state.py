@@ -0,0 +1,146 @@
+# unit_tests/test_shared_state.py
+from types import SimpleNamespace
+import pytest
+from limits import RateLimitItemPerMinute
+from limits.storage import storage_from_string
+from limits.strategies import (
+    FixedWindowRateLimiter,
+    MovingWindowRateLimiter,
+    SlidingWindowCounterRateLimiter,
+)
+from app.models.user import User
+from app.utils.shared_state import FailedLoginTracker, SQLiteStorage, sqlite_path_from_uri
+
+
+@pytest.fixture
+def sqlite_uri(tmp_path):
+    return f"sqlite:///{tmp_path}/shared_state.db"
+
+
+def test_sqlite_path_from_uri():
+    assert sqlite_path_from_uri("sqlite:///shared.db") == "shared.db"
+    assert sqlite_path_from_uri("sqlite:////var/run/shared.db") == "/var/run/shared.db"
+
+
+@pytest.mark.parametrize("strategy", [FixedWindowRateLimiter, MovingWindowRateLimiter, SlidingWindowCounterRateLimiter])
+def test_limits_shared_between_workers(sqlite_uri, strategy):
+    # Two storages on one file behave like two gunicorn workers
+    worker_a = strategy(storage_from_string(sqlite_uri))
+    worker_b = strategy(storage_from_string(sqlite_uri))
+    assert isinstance(worker_a.storage, SQLiteStorage)
+
+    item = RateLimitItemPerMinute(3)
+    assert worker_a.hit(item, "login", "203.0.113.7")
+    assert worker_b.hit(item, "login", "203.0.113.7")
+    assert worker_a.hit(item, "login", "203.0.113.7")
+    assert not worker_b.hit(item, "login", "203.0.113.7")
+    assert worker_b.hit(item, "login", "198.51.100.1")
+
+    worker_a.clear(item, "login", "203.0.113.7")
+    assert worker_b.hit(item, "login", "203.0.113.7")
+
+
+def test_failed_logins_counted_across_workers_and_flushed_in_batches(app, _db, sqlite_uri):
+    app.config.update(SHARED_STATE_URI=sqlite_uri, LOCKOUT_FLUSH_BATCH_SIZE=2, LOCKOUT_FLUSH_INTERVAL_SECONDS=3600)
+    worker_a, worker_b = FailedLoginTracker(), FailedLoginTracker()
+    worker_a.init_app(app)
+    worker_b.init_app(app)
+
+    with app.app_context():
+        user = User(name="U", email="u@example.com", email_hash=User.hash_email("u@example.com"), role="Nurse")
+        user.set_password("UserPass123!")
+        _db.session.add(user)
+        _db.session.commit()
+
+        assert worker_a.record_failure(user, 5) == 1
+        assert worker_b.record_failure(user, 5) == 2
+        assert worker_a.record_failure(user, 5) == 3
+
+        # Nothing is written per failure until a batch is due
+        assert not worker_a.flush_due()
+        worker_a.record_failure(SimpleNamespace(id=user.id + 1), 5)
+        assert worker_a.flush_due()
+        assert worker_a.flush(_db.session, User) == 2
+        _db.session.refresh(user)
+        assert user.failed_login_attempts == 3
+
+        worker_b.reset(user, 5)
+        assert worker_a.record_failure(user, 5) == 1
+
+
+def test_login_lockout_uses_shared_counter(app, client, _db):
+    app.config["ACCOUNT_LOCKOUT_ATTEMPTS"] = 2
+    with app.app_context():
+        user = User(name="L", email="l@example.com", email_hash=User.hash_email("l@example.com"), role="Nurse")
+        user.set_password("UserPass123!")
+        _db.session.add(user)
+        _db.session.commit()
+
+    for _ in range(2):
+        client.post("/auth/login", data={"email": "l@example.com", "password": "WrongPass123!"})
+
+    with app.app_context():
+        locked = User.query.filter_by(email_hash=User.hash_email("l@example.com")).first()
+        assert locked.is_locked
+        assert locked.failed_login_attempts == 2
+
+
+def test_expired_rows_are_swept(sqlite_uri, monkeypatch):
+    clock = [1_000_000.0]
+    monkeypatch.setattr("app.utils.shared_state.time.time", lambda: clock[0])
+    storage = storage_from_string(sqlite_uri, sweep_interval=30)
+    sliding = SlidingWindowCounterRateLimiter(storage)
+    moving = MovingWindowRateLimiter(storage)
+    item = RateLimitItemPerMinute(5)
+
+    def rows(table):
+        return storage._connection().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    for _ in range(50):
+        sliding.hit(item, "login", "203.0.113.7")
+        moving.hit(item, "once", str(clock[0]))  # A key never hit again
+        clock[0] += 60
+
+    # Only the live windows are left: the current and previous sliding counters, the last minute of entries
+    assert rows("counters") <= 2
+    assert rows("window_entries") <= 1
+
+
+def test_flush_skips_users_reset_by_another_worker(app, _db, sqlite_uri):
+    app.config.update(SHARED_STATE_URI=sqlite_uri)
+    worker_a, worker_b = FailedLoginTracker(), FailedLoginTracker()
+    worker_a.init_app(app)
+    worker_b.init_app(app)
+
+    with app.app_context():
+        user = User(name="U", email="u@example.com", email_hash=User.hash_email("u@example.com"), role="Nurse")
+        user.set_password("UserPass123!")
+        _db.session.add(user)
+        _db.session.commit()
+
+        worker_a.record_failure(user, 5)
+        worker_a.record_failure(user, 5)
+        worker_b.reset(user, 5)  # Successful login handled by the other worker
+
+        assert worker_a.flush(_db.session, User) == 0
+        _db.session.refresh(user)
+        assert user.failed_login_attempts == 0
+
+
+def test_queued_failures_flushed_at_request_teardown(app, client, _db):
+    app.config["ACCOUNT_LOCKOUT_ATTEMPTS"] = 5
+    with app.app_context():
+        user = User(name="T", email="t@example.com", email_hash=User.hash_email("t@example.com"), role="Nurse")
+        user.set_password("UserPass123!")
+        _db.session.add(user)
+        _db.session.commit()
+        user_id = user.id
+
+    from app.utils.shared_state import failed_login_tracker
+
+    failed_login_tracker.flush_interval = 0  # Every request end is due
+    client.post("/auth/login", data={"email": "t@example.com", "password": "WrongPass123!"})
+    client.get("/auth/login")
+
+    with app.app_context():
+        assert _db.session.get(User, user_id).failed_login_attempts == 1
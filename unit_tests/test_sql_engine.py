@@ -0,0 +1,85 @@
+# unit_tests/test_sql_engine.py
+import pytest
+from sqlalchemy import event, text
+from app import create_app, db
+from app.models.user import User
+from app.security.auth_shield import AuthShield
+from app.utils.sql_engine import has_pending_writes, sqlite_engine_options
+
+CONFIG = {
+    "SQLITE_BUSY_TIMEOUT_MS": 5000,
+    "SQLITE_POOL_SIZE": 5,
+    "SQLITE_POOL_MAX_OVERFLOW": 10,
+    "SQLITE_POOL_TIMEOUT_SECONDS": 10,
+}
+
+
+def test_memory_database_keeps_default_options():
+    assert sqlite_engine_options({**CONFIG, "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:"}) == {}
+
+
+def test_file_database_gets_pool_and_busy_timeout():
+    options = sqlite_engine_options({**CONFIG, "SQLALCHEMY_DATABASE_URI": "sqlite:///users.db"})
+
+    assert options["pool_size"] == 5
+    assert options["max_overflow"] == 10
+    assert options["connect_args"]["timeout"] == 5
+    assert options["connect_args"]["check_same_thread"] is False
+
+
+def test_file_database_connections_use_wal(monkeypatch, tmp_path):
+    monkeypatch.setenv("SQLITE_DATABASE_URI", f"sqlite:///{tmp_path / 'users.db'}")
+    app = create_app()
+
+    with app.app_context():
+        with db.engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        db.engine.dispose()
+
+
+@pytest.fixture
+def commits(app, _db):
+    counted = []
+
+    def on_commit(session):
+        counted.append(session)
+
+    event.listen(db.session, "after_commit", on_commit)
+    yield counted
+    event.remove(db.session, "after_commit", on_commit)
+
+
+def _add_user():
+    user = User(name="Nurse", email="nurse@example.com", email_hash=User.hash_email("nurse@example.com"), role="Nurse")
+    user.password = "x"
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+def test_secure_transaction_skips_commit_without_writes(app, commits):
+    with app.test_request_context():
+        user_id = _add_user()
+        commits.clear()
+
+        read_only = AuthShield.secure_transaction(lambda: db.session.get(User, user_id).role)
+        assert read_only() == "Nurse"
+        assert commits == []
+
+
+def test_secure_transaction_commits_writes(app, commits):
+    with app.test_request_context():
+        user_id = _add_user()
+        commits.clear()
+
+        def rename():
+            user = db.session.get(User, user_id)
+            user.name = "Renamed"
+            db.session.flush()  # Already flushed: session.dirty is empty again
+            assert has_pending_writes(db.session)
+
+        AuthShield.secure_transaction(rename)()
+        assert len(commits) == 1
+        assert not has_pending_writes(db.session)
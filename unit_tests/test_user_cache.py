@@ -0,0 +1,101 @@
+# unit_tests/test_user_cache.py
+import pytest
+from sqlalchemy import event
+from app import db
+from app.models.user import User
+from app.utils.user_cache import user_cache
+
+AJAX = {"X-Requested-With": "XMLHttpRequest"}
+
+
+@pytest.fixture
+def user_selects(app, _db):
+    """Records every SELECT on the users table."""
+    selects = []
+
+    def on_execute(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM users" in statement:
+            selects.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", on_execute)
+    yield selects
+    event.remove(db.engine, "before_cursor_execute", on_execute)
+
+
+@pytest.fixture
+def nurse(app, _db):
+    with app.app_context():
+        user = User(name="Nurse", email="nurse@example.com", email_hash=User.hash_email("nurse@example.com"), role="Nurse")
+        user.set_password("NursePass123!")
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+def _load(user_id):
+    """Loads a user the way Flask-Login does at the start of a new request."""
+    db.session.remove()
+    return user_cache.load(user_id)
+
+
+def test_hit_skips_query(app, nurse, user_selects):
+    with app.test_request_context():
+        assert _load(1).email == "nurse@example.com"
+        assert len(user_selects) == 1
+
+        user = _load(1)
+        assert len(user_selects) == 1
+        assert user in db.session
+        assert user.role == "Nurse"
+        assert user.email == "nurse@example.com"
+
+
+def test_zero_ttl_disables_cache(app, nurse, user_selects):
+    user_cache.ttl = 0
+    with app.test_request_context():
+        _load(1)
+        _load(1)
+    assert len(user_selects) == 2
+
+
+def test_lock_is_seen_after_invalidation(app, nurse):
+    with app.test_request_context():
+        assert not _load(1).is_locked
+
+        user = db.session.get(User, 1)
+        user.lock()
+        user_cache.invalidate(user.id)
+
+        assert _load(1).is_locked
+
+
+def test_pending_invalidation_dropped_after_commit(app, nurse):
+    with app.test_request_context():
+        user = _load(1)
+        user.role = "Doctor"
+        user_cache.invalidate(user.id)
+
+        # A request running before the commit caches the old row again
+        user_cache._entries[1] = (float("inf"), {"id": 1, "role": "Nurse"})
+        db.session.commit()
+
+        assert 1 not in user_cache._entries
+        assert _load(1).role == "Doctor"
+
+
+def test_role_change_invalidates(app, admin_client):
+    with app.test_request_context():
+        user = User(name="N", email="n@example.com", email_hash=User.hash_email("n@example.com"), role="Nurse")
+        user.set_password("NursePass123!")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        assert user_cache.load(user_id).role == "Nurse"
+        assert user_id in user_cache._entries
+
+    response = admin_client.patch(
+        "/admin/api/users/update-role", json={"user_id": user_id, "role": "Doctor"}, headers=AJAX
+    )
+    assert response.get_json()["success"]
+
+    assert user_id not in user_cache._entries